@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Per-stage dispatch cost of the compiled engine as the mapping tables grow.
+
+Usage: python benchmarks/bench_dispatch.py
+"""
+
+import os
+import sys
+import timeit
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.common import grown_tables
+from shellrosetta.engine import TranslationEngine
+
+STAGES = [
+    ["ls", "-la"],
+    ["grep", "-i", "error"],
+    ["rm", "-rf", "build"],
+    ["ps", "aux"],
+    ["wc", "-l"],
+    ["cat", "notes.txt"],
+    ["find", ".", "-name", "*.py"],
+    ["unknowncmd", "--flag"],
+]
+
+
+def per_stage_ns(engine, number=20000):
+    """Best-of-5 average cost of translating one stage, in nanoseconds"""
+    translate = engine.translate_linux_stage
+
+    def run():
+        for tokens in STAGES:
+            translate(tokens)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(STAGES)) * 1e9
+
+
+def main():
+    print("Compiled dispatch: per-stage cost vs. mapping table size")
+    print("=" * 60)
+    results = {}
+    for factor in (1, 10, 100):
+        tables = grown_tables(factor)
+        engine = TranslationEngine(*tables)
+        results[factor] = per_stage_ns(engine)
+        print(
+            f"  {factor:>3}x tables ({len(tables[0]):>6} entries): "
+            f"{results[factor]:8.1f} ns/stage"
+        )
+    print(f"\n  10x / 1x ratio:  {results[10] / results[1]:.2f}")
+    print(f"  100x / 1x ratio: {results[100] / results[1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
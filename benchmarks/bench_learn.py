@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+learn_pattern latency against pattern store size. Learning replaces only
+the changed pattern, so the cost should stay flat as the store grows; the
+old copy-on-write update copied the whole store on every call.
+
+Usage: python benchmarks/bench_learn.py [SIZE ...]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.common import populated_engine
+from shellrosetta.ml_engine import CommandPattern
+
+
+def synthetic_patterns(size):
+    for i in range(size):
+        yield CommandPattern(f"cmd{i} --flag value{i}", f"Invoke-Cmd{i}", "lnx2ps", 1, 0)
+
+
+def copy_on_write(engine, command):
+    """What every learn used to cost on top of the update: a full copy"""
+    with engine._write_lock:
+        patterns = dict(engine.patterns)
+        engine.patterns = patterns
+
+
+def latencies_ms(func, engine, rounds=200):
+    samples = []
+    for i in range(rounds):
+        # Alternate existing and new commands
+        command = f"cmd{i} --flag value{i}" if i % 2 else f"new{i}"
+        start = time.perf_counter()
+        func(engine, command)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def learn(engine, command):
+    engine.learn_pattern(command, "Out", "lnx2ps")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    print("learn_pattern latency (ms, median / max over 200 calls)")
+    print("=" * 64)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = populated_engine(data_dir, synthetic_patterns(size))
+            with mock.patch.object(engine, "_schedule_flush"):
+                median, worst = latencies_ms(learn, engine)
+                copy_median, _ = latencies_ms(copy_on_write, engine, rounds=20)
+            print(f"  {size:9,} patterns: learn {median:7.3f} / {worst:7.3f}"
+                  f"   old whole-store copy alone {copy_median:8.3f}")
+            engine.close()
+
+
+if __name__ == "__main__":
+    main()
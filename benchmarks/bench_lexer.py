@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tokenizer throughput: shlex.split against the parser's fast-path lexer,
+on typical unquoted commands and on commands that need quote handling.
+
+Usage: python benchmarks/bench_lexer.py
+"""
+
+import os
+import shlex
+import sys
+import timeit
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from shellrosetta.parser import split_words
+
+CORPORA = {
+    "unquoted": [
+        f"grep -rin error{i} /var/log/app{i % 7} --include *.log" for i in range(500)
+    ],
+    "quoted": [
+        f"grep -ri 'error {i}' \"/var/log/app {i % 7}\" --include *.log" for i in range(500)
+    ],
+}
+
+
+def stages_per_second(func, corpus, number=20):
+    def run():
+        for stage in corpus:
+            func(stage)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return number * len(corpus) / best
+
+
+def main():
+    print("Tokenizer throughput (stages/second)")
+    print("=" * 60)
+    for name, corpus in CORPORA.items():
+        assert all(split_words(s) == shlex.split(s) for s in corpus)
+        before = stages_per_second(shlex.split, corpus)
+        after = stages_per_second(split_words, corpus)
+        print(f"  {name:9} shlex.split: {before:12,.0f}  split_words: {after:12,.0f}"
+              f"  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Memory and load time of the ML pattern store at 100k and 1M patterns: the
+previous CommandPattern (instance __dict__, two datetimes, dict-per-pattern
+JSON with ISO timestamps) against the slotted one (epoch ints, interned
+strings, row-per-pattern JSON).
+
+Usage: python benchmarks/bench_memory.py [SIZE ...]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from shellrosetta.ml_engine import CommandPattern
+
+WORDS = ["ls", "grep", "find", "git", "docker", "kubectl", "-la", "-r", "status", "logs"]
+
+
+class LegacyPattern:
+    """CommandPattern as it was: a plain object with datetime timestamps"""
+
+    def __init__(self, command, translation, direction, success_count=0, failure_count=0):
+        self.command = command
+        self.translation = translation
+        self.direction = direction
+        self.success_count = success_count
+        self.failure_count = failure_count
+        self.last_used = datetime.now()
+        self.created = datetime.now()
+
+    @classmethod
+    def from_dict(cls, data):
+        pattern = cls(data["command"], data["translation"], data["direction"],
+                      data["success_count"], data["failure_count"])
+        pattern.last_used = datetime.fromisoformat(data["last_used"])
+        pattern.created = datetime.fromisoformat(data["created"])
+        return pattern
+
+
+def legacy_file(size, rng):
+    """patterns.json in the old layout; translations repeat, as learned ones do"""
+    data = {}
+    for i in range(size):
+        command = f"{rng.choice(WORDS)} {rng.choice(WORDS)} arg{i}"
+        data[f"lnx2ps:{command}"] = {
+            "command": command,
+            "translation": f"Invoke-{rng.choice(WORDS)} -Path arg{i % 1000}",
+            "direction": "lnx2ps",
+            "success_count": rng.randint(0, 9),
+            "failure_count": rng.randint(0, 9),
+            "last_used": datetime.now().isoformat(),
+            "created": datetime.now().isoformat(),
+        }
+    return data
+
+
+def load_legacy(path):
+    with open(path) as f:
+        data = json.load(f)
+    return {key: LegacyPattern.from_dict(d) for key, d in data.items()}
+
+
+def load_rows(path):
+    with open(path) as f:
+        data = json.load(f)
+    patterns = {}
+    for row in data["rows"]:
+        pattern = CommandPattern.from_row(row)
+        patterns[f"{pattern.direction}:{pattern.command}"] = pattern
+    return patterns
+
+
+def measure(load, path):
+    """Peak-free retained memory (MB) and wall time (s) of loading the store"""
+    gc.collect()
+    start = time.perf_counter()
+    load(path)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    patterns = load(path)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del patterns
+    return retained / 1e6, elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    print("Pattern store: retained memory and load time")
+    print("=" * 70)
+    for size in sizes:
+        rng = random.Random(size)
+        data = legacy_file(size, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_path = os.path.join(tmp, "legacy.json")
+            rows_path = os.path.join(tmp, "rows.json")
+            with open(legacy_path, "w") as f:
+                json.dump(data, f)
+            with open(rows_path, "w") as f:
+                rows = [CommandPattern.from_dict(d).to_row() for d in data.values()]
+                json.dump({"rows": rows}, f)
+            del data, rows
+
+            for name, load, path in (("legacy", load_legacy, legacy_path),
+                                     ("slotted", load_rows, rows_path)):
+                memory, elapsed = measure(load, path)
+                file_mb = os.path.getsize(path) / 1e6
+                print(f"  {size:9,} {name:8} {memory:8.1f} MB in memory  "
+                      f"{elapsed:6.2f} s load  {file_mb:7.1f} MB file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Cost of persisting one learning event with a large pattern store: the old
+full JSON rewrite against learn_pattern, whose journal append and
+compaction now run on the background writer.
+
+Usage: python benchmarks/bench_persistence.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.common import populated_engine
+from shellrosetta.ml_engine import CommandPattern
+
+
+def synthetic_patterns(size):
+    for i in range(size):
+        yield CommandPattern(
+            f"cmd{i} --flag value{i}", f"Invoke-Cmd{i} -Flag value{i}", "lnx2ps", 1, 0
+        )
+
+
+def full_rewrite(engine):
+    """What every tenth learn_pattern call used to do"""
+    with open(engine.patterns_file, "w") as f:
+        json.dump({k: p.to_dict() for k, p in engine.patterns.items()}, f, indent=2)
+    with open(engine.context_file, "w") as f:
+        json.dump([r.to_dict() for r in engine.context_history], f, indent=2)
+
+
+def timed_ms(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print("Persisting one learning event")
+    print("=" * 60)
+    for size in (10_000, 100_000):
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = populated_engine(data_dir, synthetic_patterns(size))
+            engine.journal_compact_bytes = float("inf")
+            rewrite = timed_ms(lambda: full_rewrite(engine))
+            append = timed_ms(lambda: engine.learn_pattern("ls -la", "Get-ChildItem", "lnx2ps"), 50)
+            compact = timed_ms(engine.compact, 3)
+            engine.close()
+        print(f"  {size:7,} patterns: full rewrite {rewrite:8.1f} ms  "
+              f"learn_pattern {append:6.2f} ms  (background compaction {compact:7.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
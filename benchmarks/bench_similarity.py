@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Recall and latency of similar-command search in MLEngine: the old
+brute-force Jaccard scan against the inverted index, MinHash LSH and the
+matrix index (NumPy when installed, and its pure-Python fallback), one
+query at a time and as a batch.
+
+Usage: python benchmarks/bench_similarity.py [SIZE ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.common import populated_engine
+from shellrosetta import similarity
+from shellrosetta.ml_engine import CommandPattern
+from shellrosetta.similarity import command_words
+
+COMMANDS = ["ls", "grep", "find", "git", "docker", "kubectl", "tar", "cp", "mv", "rm"]
+FLAGS = ["-la", "-r", "-f", "-v", "-n", "--all", "--force", "-i", "-x", "-z"]
+
+
+def random_command(rng):
+    words = [rng.choice(COMMANDS)]
+    words += rng.sample(FLAGS, rng.randint(0, 2))
+    words += [f"path{rng.randrange(5000)}" for _ in range(rng.randint(1, 3))]
+    return " ".join(words)
+
+
+def synthetic_patterns(size):
+    rng = random.Random(size)
+    for i in range(size):
+        yield CommandPattern(random_command(rng), f"Out-{i}", "lnx2ps", 1, 0)
+
+
+def brute_force(engine, query):
+    """The old similarity pass: Jaccard against every stored pattern"""
+    return {
+        p.command for key, p in engine.patterns.items()
+        if key.startswith("lnx2ps:") and engine._similar_commands(query, p.command)
+    }
+
+
+def indexed(engine, query):
+    return engine._similarity_index.similar("lnx2ps", command_words(query))
+
+
+def run(func, engine, queries):
+    start = time.perf_counter()
+    results = [func(engine, q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run_batch(engine, queries):
+    start = time.perf_counter()
+    results = engine._similarity_index.similar_many(
+        "lnx2ps", [command_words(q) for q in queries]
+    )
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def index_kinds():
+    """(label, kind, options) for every index to measure"""
+    kinds = [("inverted", "inverted", {}), ("minhash", "minhash", {})]
+    if similarity.np is not None:
+        kinds.append(("matrix/numpy", "matrix", {"use_numpy": True}))
+    kinds.append(("matrix/python", "matrix", {"use_numpy": False}))
+    return kinds
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    rng = random.Random(0)
+    queries = [random_command(rng) for _ in range(50)]
+    print("Similar-command search (ms per query, recall against brute force)")
+    print("=" * 72)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = populated_engine(data_dir, synthetic_patterns(size))
+            truth, brute_ms = run(brute_force, engine, queries[:10])
+            print(f"  {size:9,} patterns: brute force {brute_ms:8.2f} ms")
+            for label, kind, options in index_kinds():
+                start = time.perf_counter()
+                engine.set_similarity_index(kind, **options)
+                build_s = time.perf_counter() - start
+                found, ms = run(indexed, engine, queries)
+                expected = sum(len(t) for t in truth)
+                hits = sum(len(t & f) for t, f in zip(truth, found))
+                recall = hits / expected if expected else 1.0
+                print(f"  {'':19} {label:19} {ms:8.3f} ms  recall {recall:.3f}"
+                      f"  (index built in {build_s:.1f} s)")
+                if kind == "matrix":
+                    batch, batch_ms = run_batch(engine, queries)
+                    assert batch == found
+                    print(f"  {'':19} {label + ' batch':19} {batch_ms:8.3f} ms")
+            engine.close()
+    if similarity.np is None:
+        print("NumPy is not installed: matrix/numpy was skipped")
+
+
+if __name__ == "__main__":
+    main()
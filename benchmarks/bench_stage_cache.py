@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Cost of translating new pipelines built from a small vocabulary of known
+stages, with and without the stage cache.
+
+Usage: python benchmarks/bench_stage_cache.py
+"""
+
+import itertools
+import os
+import sys
+import timeit
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from shellrosetta import core
+from shellrosetta.engine import get_engine
+from shellrosetta.parser import parser
+
+STAGES = ["ls -la", "ps aux", "cat app.log", "grep -i error", "grep -v debug",
+          "sort", "uniq", "wc -l", "head -n 20", "find . -name *.py"]
+
+# Every ordered three-stage pipeline over the vocabulary: 720 distinct commands
+PIPELINES = [" | ".join(p) for p in itertools.permutations(STAGES, 3)]
+
+
+def without_stage_cache(command):
+    """Tokenize and dispatch every stage of every pipeline"""
+    engine = get_engine()
+    return " | ".join(
+        engine.translate_linux_stage(parser.tokenize(stage))
+        for stage in parser.split_stages(command)
+    )
+
+
+def with_stage_cache(command):
+    """The current lnx2ps stage path, backed by the stage cache"""
+    return core._translate_linux_stages(command, core._stage_cache)
+
+
+def per_call_us(func, number=20):
+    def run():
+        for command in PIPELINES:
+            func(command)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(PIPELINES)) * 1e6
+
+
+def main():
+    assert all(without_stage_cache(c) == with_stage_cache(c) for c in PIPELINES)
+    print(f"{len(PIPELINES)} distinct pipelines over {len(STAGES)} stages")
+    print("=" * 60)
+    before = per_call_us(without_stage_cache)
+    after = per_call_us(with_stage_cache)
+    print(f"  per-stage translation:  {before:8.1f} us/call")
+    print(f"  stage cache:            {after:8.1f} us/call ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
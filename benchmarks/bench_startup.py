@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Engine startup cost: compiling the mapping tables versus loading the
+precompiled marshal snapshot, as the tables grow.
+
+Usage: python benchmarks/bench_startup.py
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.common import grown_tables
+from shellrosetta.engine import TranslationEngine, load_snapshot, save_snapshot, source_hash
+
+
+def best_ms(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    print("Engine startup: compile vs. snapshot load")
+    print("=" * 60)
+    print(f"  source hash:            {best_ms(source_hash, 50):8.3f} ms")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = Path(cache_dir) / "engine.marshal"
+        for factor in (1, 10, 100):
+            tables = grown_tables(factor)
+            engine = TranslationEngine(*tables)
+            save_snapshot(engine, path, digest="bench")
+            assert load_snapshot(path, digest="bench").linux_handlers == engine.linux_handlers
+            compile_ms = best_ms(lambda: TranslationEngine(*tables))
+            load_ms = best_ms(lambda: load_snapshot(path, digest="bench"))
+            size = path.stat().st_size
+            print(f"  {factor:3}x tables ({size:9,} bytes): compile {compile_ms:8.2f} ms"
+                  f"  load {load_ms:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
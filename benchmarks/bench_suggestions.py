@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Latency of MLEngine prefix suggestions with a large pattern store: a
+binary search in the sorted command index against the old scan of every
+pattern key.
+
+Usage: python benchmarks/bench_suggestions.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks.common import populated_engine
+from shellrosetta.ml_engine import CommandPattern
+
+WORDS = ["ls", "grep", "find", "git", "docker", "kubectl", "tar", "cp", "mv", "rm",
+         "-la", "-r", "-f", "status", "log", "push", "ps", "logs", "apply", "get"]
+
+
+def synthetic_patterns(size):
+    rng = random.Random(size)
+    for i in range(size):
+        command = f"{' '.join(rng.choice(WORDS) for _ in range(3))} arg{i}"
+        direction = "lnx2ps" if i % 2 else "ps2lnx"
+        yield CommandPattern(
+            command, f"Out-{i}", direction, rng.randint(0, 9), rng.randint(0, 9)
+        )
+
+
+def linear_prefix(engine, prefix, direction):
+    """The old prefix pass: every key is checked on every call"""
+    return [
+        (p.translation, p.get_success_rate())
+        for key, p in engine.patterns.items()
+        if key.startswith(f"{direction}:") and p.command.startswith(prefix)
+    ]
+
+
+def indexed_prefix(engine, prefix, direction):
+    patterns = engine.patterns
+    return [
+        (patterns[f"{direction}:{c}"].translation, patterns[f"{direction}:{c}"].get_success_rate())
+        for c in engine._commands_with_prefix(prefix, direction)
+    ]
+
+
+def timed_ms(func, queries, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            func(query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1000
+
+
+def main():
+    queries = ["git status push", "docker logs ls", "kubectl get -la", "tar -f cp"]
+    print("Prefix suggestions (ms per query)")
+    print("=" * 60)
+    for size in (100_000, 1_000_000):
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = populated_engine(data_dir, synthetic_patterns(size))
+            linear = timed_ms(lambda q: linear_prefix(engine, q, "lnx2ps"), queries, 1)
+            indexed = timed_ms(lambda q: indexed_prefix(engine, q, "lnx2ps"), queries)
+            engine.close()
+        print(f"  {size:9,} patterns: scan {linear:8.2f} ms  index {indexed:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Multi-threaded stress test: reader threads translate with ML lookups
+while a writer thread learns a batch of patterns every millisecond. Reports throughput per
+thread count and checks that no learning update was lost.
+
+Usage: python benchmarks/bench_threads.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from shellrosetta import core
+
+COMMANDS = [f"ls -la dir{i % 50} | grep x{i % 7}" for i in range(500)]
+DURATION = 1.0
+WRITES_PER_BATCH = 10
+WRITE_INTERVAL = 0.001
+
+
+def fresh_engine(data_dir):
+    """Point the shared ML engine at an empty store in a temp directory"""
+    engine = core._get_ml_engine()
+    engine.data_dir = Path(data_dir)
+    engine.patterns_file = engine.data_dir / "patterns.json"
+    engine.context_file = engine.data_dir / "context.json"
+    engine.suggestions_file = engine.data_dir / "suggestions.json"
+    engine.patterns = {}
+    engine.context_history = []
+    core.clear_translation_cache()
+    return engine
+
+
+def run(threads, engine):
+    stop = threading.Event()
+    counts = [0] * threads
+    written = [0]
+
+    def reader(index):
+        n = 0
+        while not stop.is_set():
+            for command in COMMANDS[index::threads]:
+                core.lnx2ps(command, use_plugins=False)
+                engine.get_best_translation(command, "lnx2ps")
+            n += 2 * len(COMMANDS[index::threads])
+        counts[index] = n
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            engine.learn_patterns(
+                (f"stress{(i + j) % 40}", "Invoke-Stress", "lnx2ps", True)
+                for j in range(WRITES_PER_BATCH)
+            )
+            written[0] += WRITES_PER_BATCH
+            i += 1
+            time.sleep(WRITE_INTERVAL)
+
+    # Warm the translation cache and pattern store before timing
+    for command in COMMANDS:
+        core.lnx2ps(command, use_plugins=False)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(DURATION)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - start), written[0]
+
+
+def main():
+    print("Concurrent reads with a background writer")
+    print("=" * 60)
+    for threads in (1, 2, 4, 8):
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = fresh_engine(data_dir)
+            with mock.patch.object(engine, "save_data"):
+                ops, written = run(threads, engine)
+            stress = [p for p in engine.patterns.values() if p.command.startswith("stress")]
+            learned = sum(p.success_count for p in stress)
+            status = "ok" if learned == written else f"LOST {written - learned}"
+            print(f"  {threads} reader(s): {ops:10,.0f} reads/s  {written:7,} writes"
+                  f"  state {status}")
+    print(f"  (CPU count: {os.cpu_count()})")
+
+
+if __name__ == "__main__":
+    main()
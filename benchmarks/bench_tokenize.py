@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of translating multi-stage pipelines with a single
+tokenization pass, compared to the previous parse-then-resplit path.
+
+Usage: python benchmarks/bench_tokenize.py
+"""
+
+import os
+import shlex
+import sys
+import timeit
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from shellrosetta import core
+from shellrosetta.engine import get_engine
+from shellrosetta.parser import parser
+
+CORPUS = [
+    f"ls -la dir{i} | grep -i error{i % 13} | sort | uniq | wc -l" for i in range(200)
+] + [
+    f"cat log{i}.txt | grep -v debug | head -n 20 | sort" for i in range(200)
+]
+
+
+def double_tokenized(command):
+    """The previous lnx2ps pipeline: parse() for the AST, then split and shlex again"""
+    parser.parse(command)
+    engine = get_engine()
+    translated = []
+    for stage in (part.strip() for part in command.split("|")):
+        if stage:
+            translated.append(engine.translate_linux_stage(shlex.split(stage)))
+    return " | ".join(translated)
+
+
+def single_pass(command):
+    """The current lnx2ps pipeline: translation consumes the parser's tokens"""
+    return core._translate_linux_stages(command)
+
+
+def per_call_us(func, number=20):
+    def run():
+        for command in CORPUS:
+            func(command)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(CORPUS)) * 1e6
+
+
+def main():
+    assert all(double_tokenized(c) == single_pass(c) for c in CORPUS)
+    print("Pipeline translation: double vs. single tokenization")
+    print("=" * 60)
+    before = per_call_us(double_tokenized)
+    after = per_call_us(single_pass)
+    print(f"  parse + re-split:  {before:8.1f} us/call")
+    print(f"  single pass:       {after:8.1f} us/call")
+    print(f"  saving:            {before - after:8.1f} us/call ({(1 - after / before):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Helpers shared by the benchmarks and tests.
+
+Import after the benchmark has put the project root on sys.path.
+"""
+
+from shellrosetta.mappings import LINUX_TO_PS, PS_TO_LINUX, FLAG_TRANSLATIONS
+from shellrosetta.ml_engine import MLEngine
+
+
+def grown_tables(factor):
+    """
+    The mapping tables padded with synthetic commands up to factor x their size.
+
+    Returns (linux_to_ps, ps_to_linux, flag_translations), the arguments of
+    TranslationEngine. The real entries are unchanged.
+    """
+    linux_to_ps = dict(LINUX_TO_PS)
+    ps_to_linux = dict(PS_TO_LINUX)
+    flag_translations = dict(FLAG_TRANSLATIONS)
+    for i in range(len(LINUX_TO_PS) * (factor - 1)):
+        linux_to_ps[f"synth{i}"] = (f"Invoke-Synth{i}", None)
+        linux_to_ps[f"synth{i} -x"] = (f"Invoke-Synth{i} -Extra", None)
+        ps_to_linux[f"Invoke-Synth{i} -Extra"] = (f"synth{i} -x", None)
+        flag_translations[f"synth{i}"] = (f"Invoke-Synth{i}", {"-v": "-Verbose", "-q": "-Quiet"})
+    return linux_to_ps, ps_to_linux, flag_translations
+
+
+def populated_engine(data_dir, patterns):
+    """An engine in data_dir holding patterns, loaded without journaling them"""
+    engine = MLEngine(data_dir=data_dir)
+    engine.load_patterns(patterns)
+    return engine
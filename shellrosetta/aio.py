@@ -0,0 +1,101 @@
+# shellrosetta/aio.py
+
+"""
+asyncio entry points for ShellRosetta.
+
+Translations that may block (ML lookups and persistence, plugin code,
+whole batches) run on a small thread pool so the event loop never waits on
+a JSON rewrite. Pure translations write no shared state or files and run
+directly on the loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+from . import core
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers = DEFAULT_MAX_WORKERS
+_executor_lock = threading.Lock()
+
+
+def configure_executor(max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """Bound how many blocking translations may run at once"""
+    global _max_workers
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    shutdown_executor()
+    _max_workers = max_workers
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared executor, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers, thread_name_prefix="shellrosetta"
+            )
+        return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shut down the shared executor; the next call creates a new one"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def _offload(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on the shared executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def _is_pure(pure: Optional[bool]) -> bool:
+    return core.is_pure_mode() if pure is None else pure
+
+
+async def alnx2ps(
+    command: str, use_ml: bool = True, use_plugins: bool = True, pure: Optional[bool] = None
+) -> str:
+    """Async version of core.lnx2ps"""
+    if _is_pure(pure):
+        return core.lnx2ps(command, pure=True)
+    return await _offload(core.lnx2ps, command, use_ml, use_plugins, pure=False)
+
+
+async def aps2lnx(
+    command: str, use_ml: bool = True, use_plugins: bool = True, pure: Optional[bool] = None
+) -> str:
+    """Async version of core.ps2lnx"""
+    if _is_pure(pure):
+        return core.ps2lnx(command, pure=True)
+    return await _offload(core.ps2lnx, command, use_ml, use_plugins, pure=False)
+
+
+async def alnx2ps_many(
+    commands: Iterable[str],
+    use_ml: bool = True,
+    use_plugins: bool = True,
+    pure: Optional[bool] = None,
+) -> List[str]:
+    """Async version of core.lnx2ps_many; the whole batch runs on the executor"""
+    return await _offload(core.lnx2ps_many, list(commands), use_ml, use_plugins, pure)
+
+
+async def aps2lnx_many(
+    commands: Iterable[str],
+    use_ml: bool = True,
+    use_plugins: bool = True,
+    pure: Optional[bool] = None,
+) -> List[str]:
+    """Async version of core.ps2lnx_many; the whole batch runs on the executor"""
+    return await _offload(core.ps2lnx_many, list(commands), use_ml, use_plugins, pure)
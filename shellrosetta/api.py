@@ -8,7 +8,7 @@ except ImportError:
     FLASK_AVAILABLE = False
 
 from .core import lnx2ps, ps2lnx
-from .ml_engine import ml_engine
+from .ml_engine import get_ml_engine
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -136,7 +136,7 @@ def run_api_server(host="0.0.0.0", port=5000, debug=False):
     @app.route("/api/stats")
     def stats():
         try:
-            analysis = ml_engine.analyze_patterns()
+            analysis = get_ml_engine().analyze_patterns()
             return jsonify({
                 "total_translations": analysis.get("total_patterns", 0),
                 "success_rate": analysis.get("success_rate", 0)
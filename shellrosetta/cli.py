@@ -3,11 +3,12 @@
 This module provides the CLI interface for translating between
 Linux and PowerShell commands.
 """
+import argparse
 import sys
 
 from .config import config
-from .plugins import plugin_manager
-from .ml_engine import ml_engine
+from .plugins import get_plugin_manager
+from .ml_engine import get_ml_engine
 from .utils import (
     print_header,
     print_translation,
@@ -23,6 +24,8 @@ except ImportError:
     pass
 
 from .core import lnx2ps, ps2lnx
+from .script import translate_script, direction_for_path
+from .parallel import translate_corpus
 
 
 def show_help():
@@ -37,11 +40,16 @@ def show_help():
     print("  shellrosetta api      # Start web API server")
     print("  shellrosetta plugins  # List available plugins")
     print("  shellrosetta ml       # Show ML insights")
+    print("  shellrosetta translate-file <script> [lnx2ps|ps2lnx]")
+    print("                        # Translate a whole .sh/.ps1 script")
+    print("  shellrosetta batch [--workers N] [--direction ps2lnx] [file]")
+    print("                        # Translate one command per line in parallel")
     print("")
     print("Examples:")
     print('  shellrosetta lnx2ps "ls -alh | grep foo"')
     print('  shellrosetta ps2lnx "Get-ChildItem -Force | Select-String foo"')
     print("  shellrosetta api --port 8080  # Start API on port 8080")
+    print("  shellrosetta translate-file deploy.sh > deploy.ps1")
     print("=" * 65)
 
 
@@ -159,7 +167,7 @@ def show_config():
 def show_plugins():
     """Show available plugins"""
     print("\nAvailable Plugins:")
-    plugins = plugin_manager.list_plugins()
+    plugins = get_plugin_manager().list_plugins()
     if plugins:
         for plugin in plugins:
             print(f"  {plugin['name']} v{plugin['version']}")
@@ -175,7 +183,7 @@ def show_plugins():
 def show_ml_insights():
     """Show machine learning insights"""
     print("\nMachine Learning Insights:")
-    analysis = ml_engine.analyze_patterns()
+    analysis = get_ml_engine().analyze_patterns()
 
     if analysis:
         print(f"  Total Patterns: {analysis.get('total_patterns', 0)}")
@@ -192,6 +200,57 @@ def show_ml_insights():
     print()
 
 
+def run_translate_file(path, direction=None):
+    """Translate a script file (or '-' for stdin) and print the result."""
+    if direction is None:
+        direction = direction_for_path(path)
+    if direction not in ("lnx2ps", "ps2lnx"):
+        print(
+            "Cannot infer translation direction; "
+            "pass lnx2ps or ps2lnx after the file name"
+        )
+        sys.exit(1)
+
+    try:
+        if path == "-":
+            for line in translate_script(sys.stdin, direction):
+                print(line.translation)
+        else:
+            with open(path, "r", encoding="utf-8") as script:
+                for line in translate_script(script, direction):
+                    print(line.translation)
+    except OSError as e:
+        print(f"Failed to read {path}: {e}")
+        sys.exit(1)
+
+
+def run_batch(argv):
+    """Translate a corpus of commands, one per line, across worker processes."""
+    arg_parser = argparse.ArgumentParser(
+        prog="shellrosetta batch",
+        description="Translate one command per line from a file or stdin.",
+    )
+    arg_parser.add_argument("file", nargs="?", default="-")
+    arg_parser.add_argument(
+        "--direction", choices=("lnx2ps", "ps2lnx"), default="lnx2ps"
+    )
+    arg_parser.add_argument("--workers", type=int, default=None)
+    args = arg_parser.parse_args(argv)
+
+    try:
+        if args.file == "-":
+            commands = [line.rstrip("\r\n") for line in sys.stdin]
+        else:
+            with open(args.file, "r", encoding="utf-8") as corpus:
+                commands = [line.rstrip("\r\n") for line in corpus]
+    except OSError as e:
+        print(f"Failed to read {args.file}: {e}")
+        sys.exit(1)
+
+    for translation in translate_corpus(commands, args.direction, args.workers):
+        print(translation)
+
+
 def main():
     """Main entry point for the CLI application."""
     # If no args, drop into interactive mode
@@ -199,6 +258,10 @@ def main():
         run_interactive()
         return
 
+    if sys.argv[1] == "batch":
+        run_batch(sys.argv[2:])
+        return
+
     # Handle special commands
     if len(sys.argv) == 2:
         if sys.argv[1] in ("-h", "--help", "help"):
@@ -227,6 +290,11 @@ def main():
         show_help()
         sys.exit(1)
 
+    if sys.argv[1] == "translate-file":
+        direction = sys.argv[3].lower() if len(sys.argv) > 3 else None
+        run_translate_file(sys.argv[2], direction)
+        return
+
     mode = sys.argv[1].lower()
     if mode not in ["lnx2ps", "ps2lnx"]:
         print("Unknown mode:", mode)
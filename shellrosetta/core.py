@@ -1,23 +1,17 @@
 # shellrosetta/core.py
-import shlex
-from typing import Optional, Tuple
-
-from .mappings import (
-    LINUX_TO_PS,
-    PS_TO_LINUX,
-    LS_FLAGS_MAP,
-    RM_FLAGS_MAP,
-    CP_FLAGS_MAP,
-    MV_FLAGS_MAP,
-    GREP_FLAGS_MAP,
-    FIND_FLAGS_MAP,
-    CAT_FLAGS_MAP,
-)
-
-from .plugins import plugin_manager
-from .ml_engine import ml_engine
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import LRUCache
+from .engine import get_engine, reset_engine
 from .parser import parser
 
+if TYPE_CHECKING:
+    from .learning import AsyncLearningSink
+    from .ml_engine import PatternStore
+    from .plugins import PluginManager
+
 
 def extract_flags_and_targets(args):
     """
@@ -52,186 +46,400 @@ def fallback_flag_translate(cmd, args):
     If no exact mapping is found, try to reconstruct a translation using per-command flag maps.
     This covers most real-life flag combos (e.g. ls -alh, rm -rf).
     """
-    flags, targets = extract_flags_and_targets(args)
-    flagkey = "".join(sorted(flags))
-    base = ""
-    flagmap = None
-
-    # Pick the right flag mapping for the command
-    if cmd == "ls":
-        base = "Get-ChildItem"
-        flagmap = LS_FLAGS_MAP
-    elif cmd == "rm":
-        base = "Remove-Item"
-        flagmap = RM_FLAGS_MAP
-    elif cmd == "cp":
-        base = "Copy-Item"
-        flagmap = CP_FLAGS_MAP
-    elif cmd == "mv":
-        base = "Move-Item"
-        flagmap = MV_FLAGS_MAP
-    elif cmd == "grep":
-        base = "Select-String"
-        flagmap = GREP_FLAGS_MAP
-    elif cmd == "find":
-        base = "Get-ChildItem -Recurse"
-        flagmap = FIND_FLAGS_MAP
-    elif cmd == "cat":
-        base = "Get-Content"
-        flagmap = CAT_FLAGS_MAP
-
-    # If we have a flag map, try to find a translation for these flags
-    if flagmap is not None:
-        flags_out = flagmap.get(flagkey, None)
-        out = base
-        if flags_out:
-            out += f" {flags_out}"
-        if targets:
-            out += " " + " ".join(targets)
-        if not flags_out and flags:
-            out += f" # [No direct PowerShell equivalent for flags: {', '.join(flags)}]"
-        return out.strip()
-
-    # No flag map, so we just have to say we don't know
-    return f"# [No translation available for '{cmd}' with args '{' '.join(args)}']"
-
-
-def lnx2ps(command: str, use_ml: bool = True, use_plugins: bool = True) -> str:
-    """
-    Translates a Linux command (possibly piped) to PowerShell.
+    return get_engine().flag_translate(cmd, args)
 
-    Args:
-        command: The Linux command to translate
-        use_ml: Whether to use machine learning suggestions
-        use_plugins: Whether to use plugin translations
 
-    Returns:
-        The PowerShell equivalent command
+# (command, translation, direction, success) as accepted by PatternStore.learn_patterns
+LearnEvent = Tuple[str, str, str, bool]
+
+# Whole-command translation cache, keyed on (direction, command, use_ml, use_plugins)
+_translation_cache = LRUCache(maxsize=4096)
+
+# Pipeline stage cache, keyed on (direction, stage). Stage results depend only
+# on the mapping tables, so ML and plugin changes leave it valid.
+_stage_cache = LRUCache(maxsize=8192)
+
+
+def reload_mappings():
+    """Recompile the translation engine after the mapping tables were modified"""
+    reset_engine()
+    _translation_cache.clear()
+    _stage_cache.clear()
+
+
+def _on_patterns_changed(direction: Optional[str] = None, command: Optional[str] = None):
+    """Drop cached ML-assisted translations affected by a pattern change"""
+    if direction is None:
+        _translation_cache.clear()
+        return
+    for use_plugins in (True, False):
+        _translation_cache.pop((direction, command, True, use_plugins))
+
+
+# The ML engine and plugin manager load data from ~/.shellrosetta, so they are
+# only created (and hooked up to the cache) when a translation needs them
+_ml_engine: Optional["PatternStore"] = None
+_plugin_manager: Optional["PluginManager"] = None
+_init_lock = threading.Lock()
+
+
+def _get_ml_engine() -> "PatternStore":
+    """Return the global ML engine, subscribing the cache to its changes"""
+    global _ml_engine
+    if _ml_engine is None:
+        with _init_lock:
+            if _ml_engine is None:
+                from .ml_engine import get_ml_engine
+
+                engine = get_ml_engine()
+                engine.add_change_listener(_on_patterns_changed)
+                _ml_engine = engine
+    return _ml_engine
+
+
+def _get_plugin_manager() -> "PluginManager":
+    """Return the global plugin manager, subscribing the cache to its changes"""
+    global _plugin_manager
+    if _plugin_manager is None:
+        with _init_lock:
+            if _plugin_manager is None:
+                from .plugins import get_plugin_manager
+
+                manager = get_plugin_manager()
+                manager.add_change_listener(_translation_cache.clear)
+                _plugin_manager = manager
+    return _plugin_manager
+
+
+# Process-wide default for pure (mapping-only, side-effect-free) translation
+_pure_mode = os.environ.get("SHELLROSETTA_PURE", "").lower() in ("1", "true", "yes")
+
+# Optional background sink that receives learning events instead of the ML engine
+_learning_sink: Optional["AsyncLearningSink"] = None
+
+
+def set_pure_mode(enabled: bool) -> None:
+    """Make pure translation the default for this process"""
+    global _pure_mode
+    _pure_mode = bool(enabled)
+
+
+def is_pure_mode() -> bool:
+    """Whether pure translation is the process-wide default"""
+    return _pure_mode
+
+
+def set_learning_sink(sink: Optional["AsyncLearningSink"]) -> None:
+    """Route learning events to an asynchronous sink (None to learn inline again)"""
+    global _learning_sink
+    _learning_sink = sink
+
+
+def __getattr__(name: str) -> Any:
+    # core.ml_engine and core.plugin_manager resolve to the lazy instances
+    if name == "ml_engine":
+        return _get_ml_engine()
+    if name == "plugin_manager":
+        return _get_plugin_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _translate_linux_stages(command: str, stage_cache: Optional[LRUCache] = None) -> str:
+    """Translate a Linux pipeline stage by stage using the compiled engine"""
+    engine = get_engine()
+    translated = []
+    for stage in parser.split_stages(command):
+        key = ("lnx2ps", stage)
+        result = stage_cache.get(key) if stage_cache is not None else None
+        if result is None:
+            # The parser's tokens drive translation directly; nothing is re-split
+            tokens = parser.tokenize(stage)
+            # Direct mapping first, then flag-aware fallback, in one dispatch
+            result = engine.translate_linux_stage(tokens) if tokens else ""
+            if stage_cache is not None:
+                stage_cache.set(key, result)
+        if result:
+            translated.append(result)
+    return " | ".join(translated)
+
+
+def _translate_ps_stages(command: str, stage_cache: Optional[LRUCache] = None) -> str:
+    """Translate a PowerShell pipeline stage by stage using the compiled engine"""
+    engine = get_engine()
+    translated = []
+    for stage in parser.split_stages(command):
+        key = ("ps2lnx", stage)
+        result = stage_cache.get(key) if stage_cache is not None else None
+        if result is None:
+            result = engine.translate_ps_stage(stage)
+            if stage_cache is not None:
+                stage_cache.set(key, result)
+        translated.append(result)
+    return " | ".join(translated)
+
+
+_STAGE_TRANSLATORS = {
+    "lnx2ps": _translate_linux_stages,
+    "ps2lnx": _translate_ps_stages,
+}
+
+
+def _translate(
+    command: str,
+    direction: str,
+    use_ml: bool,
+    use_plugins: bool,
+    learned: Optional[List[LearnEvent]] = None,
+) -> str:
+    """
+    Translate a command without consulting the translation cache.
+
+    If ``learned`` is given, ML learning events are appended to it instead
+    of being applied, so callers can learn a whole batch at once.
     """
     if not command.strip():
         return ""
 
+    def learn(translation: str) -> None:
+        if learned is not None:
+            learned.append((command, translation, direction, True))
+        elif _learning_sink is not None:
+            _learning_sink.submit((command, translation, direction, True))
+        else:
+            _get_ml_engine().learn_pattern(command, translation, direction, success=True)
+
     # Try plugin translation first
     if use_plugins:
-        plugin_translation = plugin_manager.translate_with_plugins(command, "lnx2ps")
+        plugin_translation = _get_plugin_manager().translate_with_plugins(command, direction)
         if plugin_translation:
-            ml_engine.learn_pattern(command, plugin_translation, "lnx2ps", success=True)
+            learn(plugin_translation)
             return plugin_translation
 
     # Try ML translation
     if use_ml:
-        ml_translation = ml_engine.get_best_translation(command, "lnx2ps")
+        ml_translation = _get_ml_engine().get_best_translation(command, direction)
         if ml_translation:
             return ml_translation
 
-    # Parse command with AST
-    ast_root = parser.parse(command)
+    result = _STAGE_TRANSLATORS[direction](command, _stage_cache)
 
-    stages = [stage.strip() for stage in command.split("|")]
-    translated = []
-    for stage in stages:
-        if not stage:
-            continue
-        tokens = shlex.split(stage)
-        if not tokens:
+    # Learn the pattern
+    if use_ml:
+        learn(result)
+
+    return result
+
+
+def _translate_pure(command: str, direction: str) -> str:
+    """
+    Translate from the mapping tables alone.
+
+    No ML lookup or learning, no plugins, and nothing is written to disk or
+    shared state, so this is safe to call concurrently from request handlers.
+    The first translation of the process may read the compiled engine
+    snapshot, but never writes it. If a learning sink is installed, the
+    event is handed to it instead.
+    """
+    if not command.strip():
+        return ""
+    get_engine(save=False)
+    result = _STAGE_TRANSLATORS[direction](command)
+    if _learning_sink is not None:
+        _learning_sink.submit((command, result, direction, True))
+    return result
+
+
+def _cached_translate(
+    command: str, direction: str, use_ml: bool, use_plugins: bool, pure: Optional[bool]
+) -> str:
+    """Translate a command through the LRU translation cache"""
+    if _pure_mode if pure is None else pure:
+        return _translate_pure(command, direction)
+    key = (direction, command, use_ml, use_plugins)
+    result = _translation_cache.get(key)
+    if result is None:
+        result = _translate(command, direction, use_ml, use_plugins)
+        _translation_cache.set(key, result)
+    elif use_ml:
+        # Keep hot commands from looking unused to the pattern store's eviction
+        _get_ml_engine().record_hit(command, direction)
+    return result
+
+
+def _translate_many(
+    commands: Iterable[str],
+    direction: str,
+    use_ml: bool,
+    use_plugins: bool,
+    pure: Optional[bool],
+) -> List[str]:
+    """Translate a batch, sharing stage results and learning once at the end"""
+    commands = list(commands)
+    if _pure_mode if pure is None else pure:
+        pure_results: Dict[str, str] = {}
+        for command in commands:
+            if command not in pure_results:
+                pure_results[command] = _translate_pure(command, direction)
+        return [pure_results[command] for command in commands]
+
+    results: Dict[str, str] = {}
+    misses: List[str] = []
+    hits: List[Tuple[str, str]] = []
+    learned: List[LearnEvent] = []
+
+    for command in commands:
+        if command in results:
             continue
-        cmd = tokens[0].lower()
-        args = tokens[1:]
-        # Try a direct mapping first (whole command)
-        trymap = " ".join([cmd] + args) if args else cmd
-        direct = try_direct_mapping(trymap, LINUX_TO_PS)
-        if direct:
-            translated.append(direct)
+        result = _translation_cache.get((direction, command, use_ml, use_plugins))
+        if result is None:
+            result = _translate(command, direction, use_ml, use_plugins, learned)
+            misses.append(command)
+        elif use_ml:
+            hits.append((command, direction))
+        results[command] = result
+
+    if hits:
+        _get_ml_engine().record_hits(hits)
+
+    if learned:
+        if _learning_sink is not None:
+            for event in learned:
+                _learning_sink.submit(event)
         else:
-            # Fallback to flag-aware translation
-            fallback = fallback_flag_translate(cmd, args)
-            translated.append(fallback)
+            _get_ml_engine().learn_patterns(learned)
 
-    result = " | ".join(translated)
+    # Cache after learning, since learning invalidates the entries it touches
+    for command in misses:
+        _translation_cache.set((direction, command, use_ml, use_plugins), results[command])
 
-    # Learn the pattern
-    if use_ml:
-        ml_engine.learn_pattern(command, result, "lnx2ps", success=True)
+    return [results[command] for command in commands]
 
-    return result
 
+def lnx2ps(
+    command: str, use_ml: bool = True, use_plugins: bool = True, pure: Optional[bool] = None
+) -> str:
+    """
+    Translates a Linux command (possibly piped) to PowerShell.
+
+    Repeated commands are served from the translation cache; a cache hit
+    skips ML learning because the pattern was learned when it was stored.
+
+    Args:
+        command: The Linux command to translate
+        use_ml: Whether to use machine learning suggestions
+        use_plugins: Whether to use plugin translations
+        pure: Translate from the mapping tables only, with no ML, plugins,
+            caches or disk writes (defaults to the process-wide setting)
 
-def ps2lnx(command: str, use_ml: bool = True, use_plugins: bool = True) -> str:
+    Returns:
+        The PowerShell equivalent command
+    """
+    return _cached_translate(command, "lnx2ps", use_ml, use_plugins, pure)
+
+
+def ps2lnx(
+    command: str, use_ml: bool = True, use_plugins: bool = True, pure: Optional[bool] = None
+) -> str:
     """
     Translates a PowerShell command (possibly piped) to Linux.
 
+    Repeated commands are served from the translation cache; a cache hit
+    skips ML learning because the pattern was learned when it was stored.
+
     Args:
         command: The PowerShell command to translate
         use_ml: Whether to use machine learning suggestions
         use_plugins: Whether to use plugin translations
+        pure: Translate from the mapping tables only, with no ML, plugins,
+            caches or disk writes (defaults to the process-wide setting)
 
     Returns:
         The Linux equivalent command
     """
-    if not command.strip():
-        return ""
+    return _cached_translate(command, "ps2lnx", use_ml, use_plugins, pure)
 
-    # Try plugin translation first
-    if use_plugins:
-        plugin_translation = plugin_manager.translate_with_plugins(command, "ps2lnx")
-        if plugin_translation:
-            ml_engine.learn_pattern(command, plugin_translation, "ps2lnx", success=True)
-            return plugin_translation
 
-    # Try ML translation
-    if use_ml:
-        ml_translation = ml_engine.get_best_translation(command, "ps2lnx")
-        if ml_translation:
-            return ml_translation
+def lnx2ps_many(
+    commands: Iterable[str],
+    use_ml: bool = True,
+    use_plugins: bool = True,
+    pure: Optional[bool] = None,
+) -> List[str]:
+    """
+    Translates many Linux commands to PowerShell, returning results in input order.
 
-    # Parse command with AST
-    ast_root = parser.parse(command)
+    Identical commands are translated once, pipeline stages shared between
+    commands are translated once, and ML learning is applied and persisted
+    once for the whole batch.
 
-    stages = [stage.strip() for stage in command.split("|")]
-    translated = []
-    for stage in stages:
-        if not stage:
-            continue
-        direct = try_direct_mapping(stage, PS_TO_LINUX)
-        if direct:
-            translated.append(direct)
-        else:
-            # fallback: try base command match
-            words = stage.split()
-            if words:
-                first_word = words[0]
-                base_direct = try_direct_mapping(first_word, PS_TO_LINUX)
-                if base_direct:
-                    translated.append(base_direct)
-                else:
-                    translated.append(f"# [No Linux equivalent for: {stage}]")
-            else:
-                translated.append(f"# [No Linux equivalent for: {stage}]")
-
-    result = " | ".join(translated)
+    Args:
+        commands: The Linux commands to translate
+        use_ml: Whether to use machine learning suggestions
+        use_plugins: Whether to use plugin translations
+        pure: Translate from the mapping tables only (see lnx2ps)
 
-    # Learn the pattern
-    if use_ml:
-        ml_engine.learn_pattern(command, result, "ps2lnx", success=True)
+    Returns:
+        The PowerShell equivalents, one per input command
+    """
+    return _translate_many(commands, "lnx2ps", use_ml, use_plugins, pure)
 
-    return result
 
+def ps2lnx_many(
+    commands: Iterable[str],
+    use_ml: bool = True,
+    use_plugins: bool = True,
+    pure: Optional[bool] = None,
+) -> List[str]:
+    """
+    Translates many PowerShell commands to Linux, returning results in input order.
+
+    Identical commands are translated once, pipeline stages shared between
+    commands are translated once, and ML learning is applied and persisted
+    once for the whole batch.
+
+    Args:
+        commands: The PowerShell commands to translate
+        use_ml: Whether to use machine learning suggestions
+        use_plugins: Whether to use plugin translations
+        pure: Translate from the mapping tables only (see ps2lnx)
+
+    Returns:
+        The Linux equivalents, one per input command
+    """
+    return _translate_many(commands, "ps2lnx", use_ml, use_plugins, pure)
+
+
+def configure_translation_cache(maxsize: Optional[int] = None, ttl: Optional[float] = None):
+    """Set the size bound and default TTL (in seconds) of the translation cache"""
+    if maxsize is not None:
+        _translation_cache.resize(maxsize)
+    _translation_cache.ttl = ttl
+
+
+def configure_stage_cache(maxsize: Optional[int] = None, ttl: Optional[float] = None):
+    """Set the size bound and default TTL (in seconds) of the pipeline stage cache"""
+    if maxsize is not None:
+        _stage_cache.resize(maxsize)
+    _stage_cache.ttl = ttl
 
-# Cache functions for testing compatibility
-_translation_cache = {}
 
 def clear_translation_cache():
-    """Clear the translation cache"""
-    global _translation_cache
+    """Clear the translation cache and the pipeline stage cache"""
     _translation_cache.clear()
+    _stage_cache.clear()
+    return True
+
 
 def get_translation_stats():
     """Get translation statistics"""
     return {
         'cache_size': len(_translation_cache),
         'cache_enabled': True,
+        'cache_stats': _translation_cache.get_stats(),
+        'stage_cache_stats': _stage_cache.get_stats(),
     }
 
+
 def validate_command_security(command: str, security_level=None):
     """Basic security validation for testing compatibility"""
     # Simple security check
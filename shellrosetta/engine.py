@@ -0,0 +1,349 @@
+# shellrosetta/engine.py
+
+"""
+Compiled translation engine for ShellRosetta.
+
+The tables in mappings.py are compiled once into per-command handlers, so
+translating a pipeline stage costs a single hash dispatch on the command
+name no matter how many commands are mapped.
+
+The compiled tables are plain dicts, lists and tuples, so they are also
+saved as a marshal snapshot in a cache directory. Later processes load the
+snapshot in one read instead of importing and compiling mappings.py; it is
+rebuilt whenever the hash of the sources it was compiled from changes.
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .parser import split_words
+
+# Bump when the layout of the compiled tables changes
+SNAPSHOT_VERSION = 2
+
+# Sources whose contents determine the compiled tables
+SNAPSHOT_SOURCES = ("mappings.py", "engine.py", "parser.py")
+
+# Compiled flags: (bit per flag token, bit per single letter, fragment per bit)
+FlagTable = Tuple[Dict[str, int], Dict[str, int], Tuple[str, ...]]
+
+# A compiled Linux handler: (base cmdlet, flag table, direct entries keyed by args)
+LinuxHandler = Tuple[Optional[str], Optional[FlagTable], Dict[Tuple[str, ...], str]]
+
+# A token trie node: child node per word, plus the (translation, note) entry under None
+TrieNode = Dict[Optional[str], Any]
+
+
+def format_mapping(entry: Tuple[str, Optional[str]]) -> str:
+    """Render a (translation, note) mapping entry as translation text"""
+    cmd, note = entry
+    if note:
+        return f"{cmd} # [{note}]"
+    return cmd
+
+
+def _split_key(key: str) -> List[str]:
+    """Tokenize a mapping key the same way command stages are tokenized"""
+    try:
+        return split_words(key)
+    except ValueError:
+        return key.split()
+
+
+def compile_flags(flag_semantics: Dict[str, str]) -> FlagTable:
+    """
+    Assign a bit to each distinct fragment of one command's flag map.
+
+    Flags with the same fragment share a bit, so a set of flags becomes a
+    bitmask that flag_output turns back into fragments.
+    """
+    fragments: List[str] = []
+    token_bits: Dict[str, int] = {}
+    for flag, fragment in flag_semantics.items():
+        if fragment not in fragments:
+            fragments.append(fragment)
+        token_bits[flag] = 1 << fragments.index(fragment)
+
+    letter_bits = {
+        flag[1]: bit
+        for flag, bit in token_bits.items()
+        if len(flag) == 2 and flag[0] == "-"
+    }
+
+    return token_bits, letter_bits, tuple(fragments)
+
+
+def flag_output(fragments: Tuple[str, ...], mask: int) -> Tuple[str, str]:
+    """
+    Split the fragments selected by mask into a head (parameters, placed
+    before the targets) and a tail (pipes and comments, placed after them).
+
+    Set bits are walked in fragment order, so this costs O(flags) however
+    many flags the command has.
+    """
+    params: List[str] = []
+    pipes: List[str] = []
+    notes: List[str] = []
+    i = 0
+    while mask:
+        if mask & 1:
+            fragment = fragments[i]
+            if fragment.startswith("|"):
+                pipes.append(fragment)
+            elif fragment.startswith("#"):
+                notes.append(fragment)
+            else:
+                params.append(fragment)
+        mask >>= 1
+        i += 1
+    return " ".join(params), " ".join(pipes + notes)
+
+
+def build_token_trie(mapping: Dict[str, Tuple[str, Optional[str]]]) -> TrieNode:
+    """
+    Build a word-level trie over mapping keys.
+
+    Keys are split on whitespace, so a stage is matched one word at a time
+    and the longest mapped prefix is found in a single walk.
+    """
+    root: TrieNode = {}
+    for key, entry in mapping.items():
+        node = root
+        for word in key.split():
+            node = node.setdefault(word, {})
+        node[None] = entry
+    return root
+
+
+class TranslationEngine:
+    """Translation tables compiled from the mapping dictionaries"""
+
+    def __init__(
+        self,
+        linux_to_ps: Dict[str, Tuple[str, Optional[str]]],
+        ps_to_linux: Dict[str, Tuple[str, Optional[str]]],
+        flag_translations: Dict[str, Tuple[str, Dict[str, str]]],
+    ):
+        self.linux_handlers = self._compile_linux(linux_to_ps, flag_translations)
+        self.ps_trie = build_token_trie(ps_to_linux)
+
+    @classmethod
+    def from_tables(
+        cls, linux_handlers: Dict[str, LinuxHandler], ps_trie: TrieNode
+    ) -> "TranslationEngine":
+        """Rebuild an engine from already compiled tables"""
+        engine = cls.__new__(cls)
+        engine.linux_handlers = linux_handlers
+        engine.ps_trie = ps_trie
+        return engine
+
+    @staticmethod
+    def _compile_linux(
+        linux_to_ps: Dict[str, Tuple[str, Optional[str]]],
+        flag_translations: Dict[str, Tuple[str, Dict[str, str]]],
+    ) -> Dict[str, LinuxHandler]:
+        """Group direct mappings and flag maps by command name"""
+        direct: Dict[str, Dict[Tuple[str, ...], str]] = {}
+        for key, entry in linux_to_ps.items():
+            tokens = _split_key(key)
+            if not tokens:
+                continue
+            cmd = tokens[0].lower()
+            direct.setdefault(cmd, {})[tuple(tokens[1:])] = format_mapping(entry)
+
+        handlers: Dict[str, LinuxHandler] = {}
+        for cmd in set(direct) | set(flag_translations):
+            base, flag_semantics = flag_translations.get(cmd, (None, None))
+            flags = compile_flags(flag_semantics) if flag_semantics is not None else None
+            handlers[cmd] = (base, flags, direct.get(cmd, {}))
+        return handlers
+
+    def flag_translate(self, cmd: str, args: List[str]) -> str:
+        """Reconstruct a translation from the per-command flag table"""
+        handler = self.linux_handlers.get(cmd)
+        base, flags = (handler[0], handler[1]) if handler is not None else (None, None)
+        if base is None or flags is None:
+            return f"# [No translation available for '{cmd}' with args '{' '.join(args)}']"
+
+        token_bits, letter_bits, fragments = flags
+        mask = 0
+        unknown: List[str] = []
+        targets: List[str] = []
+        for arg in args:
+            if not arg.startswith("-"):
+                targets.append(arg)
+                continue
+            bit = token_bits.get(arg)
+            if bit is not None:
+                mask |= bit
+            elif arg.startswith("--") or len(arg) < 3:
+                unknown.append(arg)
+            else:
+                # Clustered short flags: "-alh" == "-a -l -h". Anything else,
+                # like "-mtime" or "-A3", is one unknown flag.
+                letters = arg[1:]
+                if not all(letter in letter_bits for letter in letters):
+                    unknown.append(arg)
+                    continue
+                for letter in letters:
+                    mask |= letter_bits[letter]
+
+        head, tail = flag_output(fragments, mask)
+        out = base
+        if head:
+            out += f" {head}"
+        if targets:
+            out += " " + " ".join(targets)
+        if tail:
+            out += f" {tail}"
+        if unknown:
+            out += f" # [No direct PowerShell equivalent for flags: {', '.join(unknown)}]"
+        return out
+
+    def translate_linux_stage(self, tokens: List[str]) -> str:
+        """Translate one tokenized Linux pipeline stage to PowerShell"""
+        cmd = tokens[0].lower()
+        args = tokens[1:]
+        handler = self.linux_handlers.get(cmd)
+        if handler is not None:
+            direct = handler[2].get(tuple(args))
+            if direct is not None:
+                return direct
+        return self.flag_translate(cmd, args)
+
+    def translate_ps_stage(self, stage: str) -> str:
+        """
+        Translate one PowerShell pipeline stage to Linux.
+
+        The longest mapped prefix of the stage is translated and the words
+        after it are carried over as arguments.
+        """
+        words = stage.split()
+        node = self.ps_trie
+        entry = None
+        matched = 0
+        for i, word in enumerate(words):
+            child = node.get(word)
+            if child is None:
+                break
+            node = child
+            if None in node:
+                entry = node[None]
+                matched = i + 1
+
+        if entry is None:
+            return f"# [No Linux equivalent for: {stage}]"
+
+        cmd, note = entry
+        if matched < len(words):
+            cmd = f"{cmd} {' '.join(words[matched:])}"
+        return format_mapping((cmd, note))
+
+
+_engine: Optional[TranslationEngine] = None
+
+# Set by reset_engine: the in-memory tables may differ from the files on
+# disk, so the next engine is compiled from them and the snapshot is skipped
+_tables_modified = False
+
+
+def build_engine() -> TranslationEngine:
+    """Compile a fresh engine from the current mapping tables"""
+    from .mappings import LINUX_TO_PS, PS_TO_LINUX, FLAG_TRANSLATIONS
+
+    return TranslationEngine(LINUX_TO_PS, PS_TO_LINUX, FLAG_TRANSLATIONS)
+
+
+def snapshot_path() -> Path:
+    """Where the compiled snapshot for this Python version is stored"""
+    if "SHELLROSETTA_CACHE_DIR" in os.environ:
+        cache_dir = Path(os.environ["SHELLROSETTA_CACHE_DIR"])
+    else:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        cache_dir = Path(xdg_cache) / "shellrosetta"
+    tag = sys.implementation.cache_tag or "py"
+    return cache_dir / f"engine-{tag}.marshal"
+
+
+def source_hash() -> str:
+    """Hash of the snapshot format, interpreter and mapping sources"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{SNAPSHOT_VERSION}:{sys.implementation.cache_tag}".encode())
+    package_dir = Path(__file__).parent
+    for name in SNAPSHOT_SOURCES:
+        digest.update((package_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+def save_snapshot(
+    engine: TranslationEngine, path: Optional[Path] = None, digest: Optional[str] = None
+) -> bool:
+    """Write the engine's compiled tables; returns False if the cache is not writable"""
+    path = path or snapshot_path()
+    digest = digest or source_hash()
+    data = marshal.dumps((SNAPSHOT_VERSION, digest, engine.linux_handlers, engine.ps_trie))
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_snapshot(
+    path: Optional[Path] = None, digest: Optional[str] = None
+) -> Optional[TranslationEngine]:
+    """Load compiled tables, or None if the snapshot is missing, stale or unreadable"""
+    path = path or snapshot_path()
+    try:
+        version, stored_digest, linux_handlers, ps_trie = marshal.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != SNAPSHOT_VERSION or stored_digest != (digest or source_hash()):
+        return None
+    return TranslationEngine.from_tables(linux_handlers, ps_trie)
+
+
+def load_engine(save: bool = True) -> TranslationEngine:
+    """
+    Load the engine from its snapshot, recompiling it if stale.
+
+    The recompiled tables are saved as the new snapshot unless save is False.
+    """
+    digest = source_hash()
+    engine = load_snapshot(digest=digest)
+    if engine is None:
+        engine = build_engine()
+        if save:
+            save_snapshot(engine, digest=digest)
+    return engine
+
+
+def get_engine(save: bool = True) -> TranslationEngine:
+    """
+    Return the shared engine, loading it on first use.
+
+    With save=False, a first use that has to recompile does not write the
+    snapshot (see load_engine).
+    """
+    global _engine
+    if _engine is None:
+        _engine = build_engine() if _tables_modified else load_engine(save)
+    return _engine
+
+
+def reset_engine() -> None:
+    """Drop the compiled engine so the next call recompiles from the mapping tables"""
+    global _engine, _tables_modified
+    _engine = None
+    _tables_modified = True
@@ -0,0 +1,111 @@
+# shellrosetta/learning.py
+
+"""
+Asynchronous sink for ML learning events.
+
+Translation threads only enqueue (command, translation, direction, success)
+events; a background thread drains the queue and applies each batch to the
+pattern store with a single learn_patterns call, so the pattern updates and
+disk writes never run on the caller's thread.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+from .core import LearnEvent, _get_ml_engine
+
+_STOP = object()
+
+
+def _default_apply(events: Iterable[LearnEvent]) -> None:
+    """Apply events to the global ML engine used by core"""
+    _get_ml_engine().learn_patterns(events)
+
+
+class AsyncLearningSink:
+    """Background thread that batches learning events into the pattern store"""
+
+    # Seconds between checks that the thread is still running, while flushing
+    POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        apply: Optional[Callable[[List[LearnEvent]], None]] = None,
+        max_batch: int = 256,
+        maxsize: int = 10000,
+    ):
+        self.apply = apply or _default_apply
+        self.max_batch = max_batch
+        self.submitted = 0
+        self.applied = 0
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(
+            target=self._run, name="shellrosetta-learning", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, event: LearnEvent) -> bool:
+        """Queue an event without blocking; returns False if the queue is full"""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been applied"""
+        if not self._thread.is_alive():
+            # Closed: nothing drains the queue any more
+            return self._queue.empty()
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(self.POLL_INTERVAL):
+            # close() may have stopped the thread before it reached the marker
+            if not self._thread.is_alive():
+                return done.is_set()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Apply the remaining events and stop the background thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[LearnEvent] = []
+            markers: List[threading.Event] = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self.apply(batch)
+                    self.applied += len(batch)
+                except Exception as e:
+                    print(f"Failed to apply learning events: {e}")
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
@@ -3,7 +3,7 @@
 """
 Command and flag mappings for ShellRosetta:
 - Direct mappings for single commands and common command+flag combos.
-- Per-command flag maps for complex/flag-heavy translation.
+- Per-flag semantics for flag-heavy commands, combined by the engine.
 - Notes for special cases or usage tips.
 """
 
@@ -205,74 +205,67 @@ PS_TO_LINUX = {
     "Get-Help": ("man", None),
 }
 
-# --- Per-command flag maps ---
-LS_FLAGS_MAP = {
-    "": "",
-    "-l": "| Format-List",
+# --- Per-command flag semantics ---
+# Each entry maps one flag to its PowerShell fragment. Combined flags such as
+# "-alh" or "-l -a -h" are split into single letters, and the engine joins
+# their fragments when the command is translated, so permutations never need
+# to be listed here.
+# Fragments are emitted in the order listed; fragments starting with "|" are
+# placed after the targets, and comments ("# [...]") go last.
+LS_FLAGS = {
     "-a": "-Force",
-    "-h": "# [No direct PowerShell equivalent for -h (human-readable)]",
-    "-r": "-Recurse",
     "-R": "-Recurse",
-    "-la": "-Force | Format-List",
-    "-al": "-Force | Format-List",
-    "-lh": "| Format-List # [No direct PowerShell equivalent for -h]",
-    "-ah": "-Force # [No direct PowerShell equivalent for -h]",
-    "-alh": "-Force | Format-List # [No direct PowerShell equivalent for -h]",
-    "-lah": "-Force | Format-List # [No direct PowerShell equivalent for -h]",
-    "-lR": "| Format-List -Recurse",
-    "-laR": "-Force | Format-List -Recurse",
-    "-Ral": "-Force | Format-List -Recurse",
+    "-r": "-Recurse",
+    "-l": "| Format-List",
+    "-h": "# [No direct PowerShell equivalent for -h (human-readable)]",
 }
 
-RM_FLAGS_MAP = {
-    "": "",
-    "-f": "-Force",
+RM_FLAGS = {
     "-r": "-Recurse",
     "-R": "-Recurse",
-    "-rf": "-Recurse -Force",
-    "-fr": "-Recurse -Force",
-    "-rfv": "-Recurse -Force -Verbose",
-    "-rvf": "-Recurse -Force -Verbose",
+    "-f": "-Force",
+    "-v": "-Verbose",
 }
 
-CP_FLAGS_MAP = {
-    "": "",
+CP_FLAGS = {
     "-r": "-Recurse",
     "-R": "-Recurse",
     "-v": "-Verbose",
-    "-rv": "-Recurse -Verbose",
-    "-vr": "-Recurse -Verbose",
     "-f": "# [No direct PowerShell equivalent for -f (force overwrite)]",
 }
 
-MV_FLAGS_MAP = {
-    "": "",
+MV_FLAGS = {
     "-v": "-Verbose",
     "-f": "# [No direct PowerShell equivalent for -f (force overwrite)]",
 }
 
-GREP_FLAGS_MAP = {
-    "": "",
-    "-i": "-CaseSensitive:$false",
-    "-n": "-Context 0,0 # [No direct line numbers in PowerShell]",
+GREP_FLAGS = {
     "-r": "-Recurse",
     "-R": "-Recurse",
+    "-i": "-CaseSensitive:$false",
     "-l": "-List",
     "-v": "-NotMatch",
-    "-iv": "-CaseSensitive:$false -NotMatch",
-    "-in": "-CaseSensitive:$false # [No direct line numbers in PowerShell]",
-    "-ir": "-CaseSensitive:$false -Recurse",
-    "-ri": "-Recurse -CaseSensitive:$false",
+    "-n": "# [No direct line numbers in PowerShell]",
 }
 
-FIND_FLAGS_MAP = {
-    "": "",
+FIND_FLAGS = {
     "-name": "-Filter",
     "-type": "# [No direct PowerShell equivalent for -type]",
 }
 
-CAT_FLAGS_MAP = {
-    "": "",
+CAT_FLAGS = {
     "-n": "# [No direct PowerShell equivalent for -n (line numbers)]",
     "-b": "# [No direct PowerShell equivalent for -b]",
 }
+
+
+# --- Flag-aware fallback: command -> (base cmdlet, flag semantics) ---
+FLAG_TRANSLATIONS = {
+    "ls": ("Get-ChildItem", LS_FLAGS),
+    "rm": ("Remove-Item", RM_FLAGS),
+    "cp": ("Copy-Item", CP_FLAGS),
+    "mv": ("Move-Item", MV_FLAGS),
+    "grep": ("Select-String", GREP_FLAGS),
+    "find": ("Get-ChildItem -Recurse", FIND_FLAGS),
+    "cat": ("Get-Content", CAT_FLAGS),
+}
@@ -1,17 +1,57 @@
 # shellrosetta/ml_engine.py
 
-from datetime import timedelta
+import atexit
+import bisect
+import copy
+import heapq
 import json
 import os
 import re
+import shutil
+import sys
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
-from collections import defaultdict, Counter
+from typing import IO, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Any
+from collections import OrderedDict, defaultdict, deque
+from operator import attrgetter, itemgetter
+
+from .similarity import DEFAULT_SIMILARITY_INDEX, SIMILARITY_INDEXES, command_words
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Write JSON to a temporary file and rename it over path"""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+_intern = sys.intern
+
+
+def _epoch(value: Any) -> int:
+    """Epoch seconds from a stored timestamp (epoch number or ISO string)"""
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp())
+    return int(value)
 
 
 class CommandPattern:
-    """Represents a learned command pattern"""
+    """
+    Represents a learned command pattern.
+
+    Timestamps are integer epoch seconds and strings are interned, keeping
+    each pattern to a single slotted object.
+    """
+
+    __slots__ = (
+        "command", "translation", "direction",
+        "success_count", "failure_count", "last_used", "created",
+    )
 
     def __init__(
         self,
@@ -20,14 +60,26 @@ class CommandPattern:
         direction: str,
         success_count: int = 0,
         failure_count: int = 0,
+        last_used: Optional[int] = None,
+        created: Optional[int] = None,
     ):
-        self.command = command
-        self.translation = translation
-        self.direction = direction
+        self.command = _intern(command)
+        self.translation = _intern(translation)
+        self.direction = _intern(direction)
         self.success_count = success_count
         self.failure_count = failure_count
-        self.last_used = datetime.now()
-        self.created = datetime.now()
+        if last_used is None or created is None:
+            now = int(time.time())
+            last_used = now if last_used is None else last_used
+            created = now if created is None else created
+        self.last_used = last_used
+        self.created = created
+
+    def __copy__(self) -> "CommandPattern":
+        return CommandPattern(
+            self.command, self.translation, self.direction,
+            self.success_count, self.failure_count, self.last_used, self.created,
+        )
 
     def get_success_rate(self) -> float:
         """Calculate success rate"""
@@ -37,12 +89,12 @@ class CommandPattern:
     def record_success(self):
         """Record a successful translation"""
         self.success_count += 1
-        self.last_used = datetime.now()
+        self.last_used = int(time.time())
 
     def record_failure(self):
         """Record a failed translation"""
         self.failure_count += 1
-        self.last_used = datetime.now()
+        self.last_used = int(time.time())
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
@@ -52,137 +104,400 @@ class CommandPattern:
             "direction": self.direction,
             "success_count": self.success_count,
             "failure_count": self.failure_count,
-            "last_used": self.last_used.isoformat(),
-            "created": self.created.isoformat(),
+            "last_used": self.last_used,
+            "created": self.created,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "CommandPattern":
-        """Create from dictionary"""
-        pattern = cls(
+        """Create from dictionary; timestamps may be epoch seconds or ISO strings"""
+        return cls(
             data["command"],
             data["translation"],
             data["direction"],
             data["success_count"],
             data["failure_count"],
+            _epoch(data["last_used"]),
+            _epoch(data["created"]),
         )
-        pattern.last_used = datetime.fromisoformat(data["last_used"])
-        pattern.created = datetime.fromisoformat(data["created"])
-        return pattern
+
+    def to_row(self) -> List[Any]:
+        """Convert to the positional row stored in patterns.json"""
+        return [
+            self.command, self.translation, self.direction,
+            self.success_count, self.failure_count, self.last_used, self.created,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "CommandPattern":
+        """Create from a row written by to_row"""
+        return cls(*row)
+
+
+class ContextRecord:
+    """One learned translation in the context history"""
+
+    __slots__ = ("timestamp", "command", "translation", "direction", "success", "command_type")
+
+    def __init__(
+        self,
+        timestamp: int,
+        command: str,
+        translation: str,
+        direction: str,
+        success: bool,
+        command_type: str,
+    ):
+        # Epoch seconds; strings are interned so repeated commands share storage
+        self.timestamp = timestamp
+        self.command = _intern(command)
+        self.translation = _intern(translation)
+        self.direction = _intern(direction)
+        self.success = success
+        self.command_type = _intern(command_type)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "command": self.command,
+            "translation": self.translation,
+            "direction": self.direction,
+            "success": self.success,
+            "command_type": self.command_type,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContextRecord":
+        """Create from dictionary"""
+        return cls(
+            _epoch(data["timestamp"]),
+            data["command"],
+            data["translation"],
+            data["direction"],
+            data["success"],
+            data["command_type"],
+        )
+
+
+class ContextHistory:
+    """
+    Fixed-capacity ring buffer of context records.
+
+    Successful translations among the last `window` records are counted per
+    direction as records enter and leave the window, so the most common
+    recent translations are found without scanning the history. The counts
+    are copy-on-write; appends must be serialized by the caller.
+    """
+
+    def __init__(self, capacity: int = 1000, window: int = 50):
+        self.capacity = capacity
+        self.window = min(window, capacity)
+        self._records: "deque[ContextRecord]" = deque(maxlen=capacity)
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def snapshot(self) -> List[ContextRecord]:
+        """The records, oldest first"""
+        return list(self._records)
+
+    def append(self, record: ContextRecord) -> None:
+        records = self._records
+        leaving = records[-self.window] if len(records) >= self.window else None
+        records.append(record)
+        if record.success:
+            self._count(record, 1)
+        if leaving is not None and leaving.success:
+            self._count(leaving, -1)
+
+    def extend(self, records: Iterable[ContextRecord]) -> None:
+        for record in records:
+            self.append(record)
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._counts = {}
+
+    def _count(self, record: ContextRecord, delta: int) -> None:
+        counts = dict(self._counts.get(record.direction, {}))
+        count = counts.get(record.translation, 0) + delta
+        if count:
+            counts[record.translation] = count
+        else:
+            del counts[record.translation]
+        self._counts = {**self._counts, record.direction: counts}
+
+    def most_common(self, direction: str, n: int) -> List[str]:
+        """The n most frequent successful translations in the window"""
+        counts = self._counts.get(direction, {})
+        top = heapq.nlargest(n, counts.items(), key=itemgetter(1))
+        return [translation for translation, _ in top]
+
+
+# Entry in the top patterns list: (negated success rate, command, direction)
+TopEntry = Tuple[float, str, str]
+
+
+class PatternStats:
+    """
+    Running aggregates over the learned patterns, for analyze_patterns.
+
+    Counters change by the difference between a pattern's old and new state.
+    The best patterns are kept in a short sorted list that is always the
+    exact top of all qualifying patterns; it is refilled from a full scan
+    only when changes leave it shorter than TOP_PATTERNS. Not thread-safe:
+    the engine updates it under its writer lock and publishes snapshots.
+    """
+
+    # Success rates that count as successful, and as a top pattern
+    SUCCESSFUL_RATE = 0.5
+    TOP_RATE = 0.7
+
+    # Top patterns reported, and kept in reserve so removals rarely force a scan
+    TOP_PATTERNS = 10
+    TOP_CAPACITY = 20
+
+    def __init__(self, classify: Callable[[str], str]):
+        self.classify = classify
+        self.total = 0
+        self.successful = 0
+        self.qualifying = 0
+        self.command_types: Dict[str, int] = {}
+        self._top: List[TopEntry] = []
+
+    def _top_entry(self, pattern: Optional[CommandPattern]) -> Optional[TopEntry]:
+        if pattern is None:
+            return None
+        rate = pattern.get_success_rate()
+        if rate <= self.TOP_RATE:
+            return None
+        return (-rate, pattern.command, pattern.direction)
+
+    def update(self, old: Optional[CommandPattern], new: Optional[CommandPattern]) -> bool:
+        """
+        Account for a pattern being added (old is None), changed or removed
+        (new is None). Returns False if the top list must be rebuilt.
+        """
+        if old is None and new is not None:
+            self.total += 1
+            command_type = self.classify(new.command)
+            self.command_types[command_type] = self.command_types.get(command_type, 0) + 1
+        if new is None and old is not None:
+            self.total -= 1
+            command_type = self.classify(old.command)
+            count = self.command_types[command_type] - 1
+            if count:
+                self.command_types[command_type] = count
+            else:
+                del self.command_types[command_type]
+
+        for state, delta in ((old, -1), (new, 1)):
+            if state is not None and state.get_success_rate() > self.SUCCESSFUL_RATE:
+                self.successful += delta
+
+        old_entry = self._top_entry(old)
+        new_entry = self._top_entry(new)
+        top = self._top
+        if old_entry is not None:
+            self.qualifying -= 1
+            i = bisect.bisect_left(top, old_entry)
+            if i < len(top) and top[i] == old_entry:
+                del top[i]
+        if new_entry is not None:
+            # The list holds the best len(top) qualifying patterns, so a new
+            # entry belongs in it if the list is complete or it beats the last
+            if len(top) == self.qualifying or (top and new_entry < top[-1]):
+                bisect.insort(top, new_entry)
+                del top[self.TOP_CAPACITY:]
+            self.qualifying += 1
+        return len(top) >= min(self.TOP_PATTERNS, self.qualifying)
+
+    def rebuild(self, patterns: Dict[str, CommandPattern]) -> None:
+        """Recompute every aggregate from scratch"""
+        self.total = len(patterns)
+        self.successful = 0
+        self.command_types = {}
+        entries = []
+        for pattern in patterns.values():
+            command_type = self.classify(pattern.command)
+            self.command_types[command_type] = self.command_types.get(command_type, 0) + 1
+            if pattern.get_success_rate() > self.SUCCESSFUL_RATE:
+                self.successful += 1
+            entry = self._top_entry(pattern)
+            if entry is not None:
+                entries.append(entry)
+        self.qualifying = len(entries)
+        self._top = heapq.nsmallest(self.TOP_CAPACITY, entries)
+
+    def rebuild_top(self, patterns: Dict[str, CommandPattern]) -> None:
+        """Refill the top list from a full scan"""
+        entries = (self._top_entry(p) for p in patterns.values())
+        self._top = heapq.nsmallest(self.TOP_CAPACITY, (e for e in entries if e is not None))
+
+    def snapshot(self, patterns: Dict[str, CommandPattern]) -> "StatsSnapshot":
+        """Immutable copy of the aggregates, tagged with the patterns they describe"""
+        return (
+            patterns,
+            self.total,
+            self.successful,
+            dict(self.command_types),
+            [(command, -rate) for rate, command, _ in self._top[: self.TOP_PATTERNS]],
+        )
+
+
+# (patterns, total, successful, command types, top (command, rate) pairs)
+StatsSnapshot = Tuple[Dict[str, CommandPattern], int, int, Dict[str, int], List[Tuple[str, float]]]
 
 
-class MLEngine:
-    """Machine learning engine for command translation"""
+class FrequencyBuckets:
+    """
+    Pattern keys grouped by success count, least recently used first.
+
+    The eviction victim, the least recently used of the keys with the
+    lowest success count, is found without scanning the patterns.
+    """
 
     def __init__(self):
-        self.data_dir = Path.home() / ".shellrosetta" / "ml"
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._frequency: Dict[str, int] = {}
+        # No bucket below this is non-empty; it may point at an emptied one
+        self._min = 0
 
-        self.patterns_file = self.data_dir / "patterns.json"
-        self.context_file = self.data_dir / "context.json"
-        self.suggestions_file = self.data_dir / "suggestions.json"
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[CommandPattern]) -> "FrequencyBuckets":
+        """Buckets for existing patterns, in last-used order"""
+        buckets = cls()
+        for pattern in sorted(patterns, key=attrgetter("last_used")):
+            buckets.touch(f"{pattern.direction}:{pattern.command}", pattern.success_count)
+        return buckets
 
-        self.patterns: Dict[str, CommandPattern] = {}
-        self.context_history: List[Dict[str, Any]] = []
-        self.suggestion_cache: Dict[str, List[str]] = {}
+    def __len__(self) -> int:
+        return len(self._frequency)
 
-        self.load_data()
+    def touch(self, key: str, frequency: int) -> None:
+        """Record a use of key, whose success count is now frequency"""
+        old = self._frequency.get(key)
+        if old == frequency:
+            self._buckets[frequency].move_to_end(key)
+            return
+        if old is not None:
+            self.discard(key)
+        self._buckets.setdefault(frequency, OrderedDict())[key] = None
+        self._frequency[key] = frequency
+        if frequency < self._min:
+            self._min = frequency
 
-    def load_data(self) -> None:
-        """Load learned patterns and context"""
-        # Load patterns
-        if self.patterns_file.exists():
-            try:
-                with open(self.patterns_file, "r") as f:
-                    data = json.load(f)
-                    for key, pattern_data in data.items():
-                        self.patterns[key] = CommandPattern.from_dict(pattern_data)
-            except Exception as e:
-                print(f"Failed to load patterns: {e}")
+    def discard(self, key: str) -> None:
+        """Stop tracking key"""
+        frequency = self._frequency.pop(key, None)
+        if frequency is not None:
+            bucket = self._buckets[frequency]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[frequency]
 
-        # Load context history
-        if self.context_file.exists():
-            try:
-                with open(self.context_file, "r") as f:
-                    self.context_history = json.load(f)
-            except Exception as e:
-                print(f"Failed to load context: {e}")
+    def pop_victim(self) -> str:
+        """Remove and return the key to evict next"""
+        if self._min not in self._buckets:
+            self._min = min(self._buckets)
+        bucket = self._buckets[self._min]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self._buckets[self._min]
+        del self._frequency[key]
+        return key
 
-        # Load suggestions
-        if self.suggestions_file.exists():
-            try:
-                with open(self.suggestions_file, "r") as f:
-                    self.suggestion_cache = json.load(f)
-            except Exception as e:
-                print(f"Failed to load suggestions: {e}")
 
-    def save_data(self) -> None:
-        """Save learned patterns and context"""
-        # Save patterns
-        patterns_data = {}
-        for key, pattern in self.patterns.items():
-            patterns_data[key] = pattern.to_dict()
+class PatternStore(ABC):
+    """
+    What the translator and its callers need from a learned pattern store.
 
-        try:
-            with open(self.patterns_file, "w") as f:
-                json.dump(patterns_data, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save patterns: {e}")
+    MLEngine (in memory, journaled to JSON) and SQLiteMLEngine (a shared
+    database) both implement it; code that may get either backend, such as
+    get_ml_engine() callers, should only use these methods.
+    """
 
-        # Save context (keep only last 1000 entries)
-        try:
-            with open(self.context_file, "w") as f:
-                json.dump(self.context_history[-1000:], f, indent=2)
-        except Exception as e:
-            print(f"Failed to save context: {e}")
+    # Context entries kept
+    MAX_CONTEXT_HISTORY = 1000
 
-        # Save suggestions
-        try:
-            with open(self.suggestions_file, "w") as f:
-                json.dump(self.suggestion_cache, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save suggestions: {e}")
+    def __init__(self) -> None:
+        self._change_listeners: List[Callable[..., None]] = []
+
+    def add_change_listener(self, callback: Callable[..., None]) -> None:
+        """
+        Register a callback invoked when learned patterns change.
+
+        The callback receives (direction, command) for a single changed
+        pattern, or no arguments when any pattern may have changed.
+        """
+        self._change_listeners.append(callback)
+
+    def _notify_change(self, direction: Optional[str] = None, command: Optional[str] = None):
+        """Tell listeners which pattern changed (all patterns if not given)"""
+        for callback in self._change_listeners:
+            if direction is None:
+                callback()
+            else:
+                callback(direction, command)
 
     def learn_pattern(
         self, command: str, translation: str, direction: str, success: bool = True
     ) -> None:
         """Learn a new command pattern"""
-        key = f"{direction}:{command}"
+        self.learn_patterns([(command, translation, direction, success)])
 
-        if key in self.patterns:
-            pattern = self.patterns[key]
-            if success:
-                pattern.record_success()
-            else:
-                pattern.record_failure()
-        else:
-            pattern = CommandPattern(command, translation, direction)
-            if success:
-                pattern.record_success()
-            else:
-                pattern.record_failure()
-            self.patterns[key] = pattern
+    @abstractmethod
+    def learn_patterns(self, events: Iterable[Tuple[str, str, str, bool]]) -> None:
+        """Learn a batch of (command, translation, direction, success) events"""
 
-        # Update context
-        self._update_context(command, translation, direction, success)
+    def record_hit(self, command: str, direction: str) -> None:
+        """Count a translation served from a cache as another successful use"""
+        self.record_hits([(command, direction)])
 
-        # Save data periodically
-        if len(self.patterns) % 10 == 0:
-            self.save_data()
+    @abstractmethod
+    def record_hits(self, hits: Iterable[Tuple[str, str]]) -> None:
+        """Count a batch of (command, direction) cache hits"""
 
-    def _update_context(
-        self, command: str, translation: str, direction: str, success: bool
-    ):
-        """Update context history"""
-        context_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "command": command,
-            "translation": translation,
-            "direction": direction,
-            "success": success,
-            "command_type": self._classify_command(command),
-        }
-        self.context_history.append(context_entry)
+    @abstractmethod
+    def get_best_translation(self, command: str, direction: str) -> Optional[str]:
+        """Get the best learned translation for a command"""
+
+    @abstractmethod
+    def get_suggestions(
+        self, partial_command: str, direction: str, limit: int = 5
+    ) -> List[Tuple[str, float]]:
+        """Get (translation, confidence) suggestions for a partial command"""
+
+    def get_suggestions_many(
+        self, partial_commands: List[str], direction: str, limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        """Get suggestions for each of a batch of partial commands"""
+        return [self.get_suggestions(partial, direction, limit) for partial in partial_commands]
+
+    @abstractmethod
+    def get_context_suggestions(self, current_command: str, direction: str) -> List[str]:
+        """Get the most common successful translations among the recent context"""
+
+    @abstractmethod
+    def analyze_patterns(self) -> Dict[str, Any]:
+        """Analyze learned patterns for insights"""
+
+    @abstractmethod
+    def cleanup_old_patterns(self, days: int = 30) -> None:
+        """Remove patterns that haven't been used recently"""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Persist everything learned so far before returning"""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and release files or connections"""
 
     def _classify_command(self, command: str) -> str:
         """Classify command type"""
@@ -199,34 +514,6 @@ class MLEngine:
         else:
             return "general"
 
-    def get_suggestions(
-        self, partial_command: str, direction: str, limit: int = 5
-    ) -> List[Tuple[str, float]]:
-        """Get suggestions for a partial command"""
-        suggestions = []
-
-        # Look for exact matches in learned patterns
-        for key, pattern in self.patterns.items():
-            if key.startswith(f"{direction}:") and pattern.command.startswith(
-                partial_command
-            ):
-                success_rate = pattern.get_success_rate()
-                suggestions.append((pattern.translation, success_rate))
-
-        # Look for similar patterns
-        for key, pattern in self.patterns.items():
-            if key.startswith(f"{direction}:") and self._similar_commands(
-                partial_command, pattern.command
-            ):
-                success_rate = pattern.get_success_rate()
-                suggestions.append(
-                    (pattern.translation, success_rate * 0.8)
-                )  # Lower confidence
-
-        # Sort by confidence and return top results
-        suggestions.sort(key=lambda x: x[1], reverse=True)
-        return suggestions[:limit]
-
     def _similar_commands(self, cmd1: str, cmd2: str) -> bool:
         """Check if two commands are similar"""
         # Simple similarity check - can be improved with more sophisticated algorithms
@@ -241,12 +528,798 @@ class MLEngine:
 
         return len(intersection) / len(union) > 0.5
 
+
+class MLEngine(PatternStore):
+    """
+    Machine learning engine for command translation.
+
+    Readers use patterns without locking. Writers, serialized by a single
+    lock, never modify a CommandPattern in place: each changed pattern is
+    replaced by an updated copy with one dict item assignment, so a learn
+    costs the same at any store size and readers never see a half-updated
+    pattern. Code iterating over patterns must hold the write lock, or
+    tolerate it changing. context_history is a bounded ring buffer appended
+    to under the same lock.
+
+    Commands are also kept in a sorted list per direction, updated as new
+    patterns are learned, so prefix suggestions are a binary search rather
+    than a scan of every pattern, and indexed by word so similar commands
+    are found without scoring every pattern.
+
+    Learning is persisted by appending events to a JSONL journal, which is
+    replayed on load. Journal writes, and the compaction that folds the
+    journal into the JSON snapshot files once it grows past
+    journal_compact_bytes, run on a background writer thread. The writer
+    batches events for up to flush_interval seconds, or until
+    flush_threshold are pending; flush() writes them immediately and runs at
+    interpreter exit.
+
+    With max_patterns set, learning a new command when the store is full
+    first evicts the pattern with the fewest successes, the least recently
+    used among equals. Evictions are journaled like learning events.
+
+    Data lives in data_dir, ~/.shellrosetta/ml unless another is given.
+    """
+
+    # Recent context entries that get_context_suggestions draws from
+    CONTEXT_WINDOW = 50
+
+    # Journal size that triggers a background compaction
+    JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+    # Seconds pending events may wait for the writer, and the backlog that
+    # wakes it early
+    FLUSH_INTERVAL = 1.0
+    FLUSH_THRESHOLD = 256
+
+    # Patterns kept before learning evicts one (None: unbounded)
+    MAX_PATTERNS: Optional[int] = None
+
+    def __init__(
+        self, max_patterns: Optional[int] = None, data_dir: Optional[Path] = None
+    ):
+        super().__init__()
+        self.data_dir = Path(data_dir) if data_dir else Path.home() / ".shellrosetta" / "ml"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        self.patterns_file = self.data_dir / "patterns.json"
+        self.context_file = self.data_dir / "context.json"
+        self.suggestions_file = self.data_dir / "suggestions.json"
+
+        self.patterns: Dict[str, CommandPattern] = {}
+        self.context_history = ContextHistory(self.MAX_CONTEXT_HISTORY, self.CONTEXT_WINDOW)
+        self.suggestion_cache: Dict[str, List[str]] = {}
+        self._stats = PatternStats(self._classify_command)
+        self._stats_snapshot = self._stats.snapshot(self.patterns)
+        self._sorted_commands: Dict[str, List[str]] = {}
+        self._similarity_kind = DEFAULT_SIMILARITY_INDEX
+        self._similarity_options: Dict[str, Any] = {}
+        self._similarity_index: Any = SIMILARITY_INDEXES[DEFAULT_SIMILARITY_INDEX]()
+        self._write_lock = threading.RLock()
+
+        self.max_patterns: Optional[int] = None
+        self.evictions = 0
+        self._frequencies: Optional[FrequencyBuckets] = None
+
+        self.journal_compact_bytes = self.JOURNAL_COMPACT_BYTES
+        self._journal_seq = 0
+        self._journal_bytes = 0
+        self._journal: Optional[IO[str]] = None
+        self._journal_path: Optional[Path] = None
+        self._io_lock = threading.Lock()
+
+        self.flush_interval = self.FLUSH_INTERVAL
+        self.flush_threshold = self.FLUSH_THRESHOLD
+        self._pending: List[Dict[str, Any]] = []
+        # (direction, command) cache hits not applied yet
+        self._hits: Deque[Tuple[str, str]] = deque()
+        self._save_requested = False
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+        self.load_data()
+        self.set_capacity(self.MAX_PATTERNS if max_patterns is None else max_patterns)
+        _live_engines.add(self)
+
+    @property
+    def journal_file(self) -> Path:
+        """Append-only log of learning events since the last compaction"""
+        return self.data_dir / "journal.jsonl"
+
+    @property
+    def _compacting_file(self) -> Path:
+        """Journal segment being folded into the snapshot files"""
+        return self.data_dir / "journal.compacting.jsonl"
+
+    def load_data(self) -> None:
+        """Load learned patterns and context, then replay the journal"""
+        with self._write_lock:
+            # Load patterns, and the last journal event they include
+            snapshot_seq = 0
+            if self.patterns_file.exists():
+                try:
+                    with open(self.patterns_file, "r") as f:
+                        data = json.load(f)
+                    patterns = dict(self.patterns)
+                    if "rows" in data:
+                        snapshot_seq = data.get("seq", 0)
+                        for row in data["rows"]:
+                            pattern = CommandPattern.from_row(row)
+                            patterns[f"{pattern.direction}:{pattern.command}"] = pattern
+                    else:
+                        # Written before patterns were stored as rows
+                        for key, pattern_data in data.items():
+                            patterns[key] = CommandPattern.from_dict(pattern_data)
+                    self.patterns = patterns
+                    self._frequencies = None
+                except Exception as e:
+                    print(f"Failed to load patterns: {e}")
+            self._stats.rebuild(self.patterns)
+            self._publish_stats(self.patterns)
+            self._rebuild_command_index()
+
+            # Load context history
+            if self.context_file.exists():
+                try:
+                    with open(self.context_file, "r") as f:
+                        entries = json.load(f)
+                    history = ContextHistory(self.MAX_CONTEXT_HISTORY, self.CONTEXT_WINDOW)
+                    history.extend(ContextRecord.from_dict(entry) for entry in entries)
+                    self.context_history = history
+                except Exception as e:
+                    print(f"Failed to load context: {e}")
+
+            # Load suggestions
+            if self.suggestions_file.exists():
+                try:
+                    with open(self.suggestions_file, "r") as f:
+                        self.suggestion_cache = json.load(f)
+                except Exception as e:
+                    print(f"Failed to load suggestions: {e}")
+
+            self._replay_journal(snapshot_seq)
+
+        self._notify_change()
+
+    def _replay_journal(self, snapshot_seq: int = 0) -> None:
+        """Apply journaled events newer than snapshot_seq, the last one in patterns.json"""
+        self._journal_seq = max(self._journal_seq, snapshot_seq)
+
+        events = []
+        self._journal_bytes = 0
+        for path in (self._compacting_file, self.journal_file):
+            if not path.exists():
+                continue
+            try:
+                with open(path, "r") as f:
+                    for line in f:
+                        if path == self.journal_file:
+                            self._journal_bytes += len(line)
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue  # torn write at the end of the log
+                        if event["seq"] <= snapshot_seq:
+                            continue
+                        events.append(event)
+                        self._journal_seq = max(self._journal_seq, event["seq"])
+            except Exception as e:
+                print(f"Failed to replay journal {path}: {e}")
+
+        # A pattern's events up to its last eviction or removal no longer
+        # count: drop them, and the pattern itself if the snapshot has it.
+        # Context history keeps every learning event, as it did in memory.
+        evicted: Dict[str, int] = {}
+        for position, event in enumerate(events):
+            if event.get("op") in ("evict", "remove"):
+                evicted[f"{event['direction']}:{event['command']}"] = position
+        if evicted:
+            self._remove_patterns(evicted)
+
+        entries: List[Tuple[str, str, str, bool, int]] = []
+        history: List[ContextRecord] = []
+        for position, event in enumerate(events):
+            op = event.get("op")
+            if op in ("evict", "remove"):
+                continue
+            when = _epoch(event["timestamp"])
+            if op is None:
+                history.append(self._context_entry(
+                    event["command"],
+                    event["translation"],
+                    event["direction"],
+                    event["success"],
+                    when,
+                ))
+            if evicted.get(f"{event['direction']}:{event['command']}", -1) > position:
+                continue
+            if op == "hit":
+                # Apply the learning before it, so the hit finds its pattern
+                if entries:
+                    self._apply_entries(entries, record_context=False)
+                    entries = []
+                hit = {(event["direction"], event["command"]): (event["count"], when)}
+                self._apply_hit_counts(hit)
+            else:
+                entries.append((
+                    event["command"],
+                    event["translation"],
+                    event["direction"],
+                    event["success"],
+                    when,
+                ))
+        if entries:
+            self._apply_entries(entries, record_context=False)
+        self.context_history.extend(history)
+
+    def save_data(self) -> None:
+        """Ask the background writer to snapshot all learned state"""
+        with self._write_lock:
+            self._save_requested = True
+            self._schedule_flush(now=True)
+
+    def flush(self) -> None:
+        """Write pending journal events, and any requested snapshot, before returning"""
+        with self._write_lock:
+            save, self._save_requested = self._save_requested, False
+        with self._io_lock:
+            self._write_pending()
+        if save or self._journal_bytes >= self.journal_compact_bytes:
+            self.compact()
+
+    def close(self) -> None:
+        """Flush and close the journal"""
+        self.flush()
+        self._close_journal()
+
+    def compact(self) -> bool:
+        """
+        Fold the journal into the JSON snapshot files.
+
+        The journal is rotated under the write lock, so learning continues
+        into a fresh journal while the snapshots are written. Returns False
+        if writing failed; the rotated journal is then kept for replay.
+        """
+        with self._io_lock:
+            self._write_pending()
+            with self._write_lock:
+                self._close_journal()
+                self._rotate_journal()
+                self._journal_bytes = 0
+                patterns = list(self.patterns.values())
+                context_history = self.context_history.snapshot()
+                suggestion_cache = self.suggestion_cache
+                seq = self._journal_seq
+
+            if not self._write_snapshot(patterns, context_history, suggestion_cache, seq):
+                return False
+            try:
+                self._compacting_file.unlink()
+            except FileNotFoundError:
+                pass
+            return True
+
+    def _rotate_journal(self) -> None:
+        """Move the live journal aside for compaction"""
+        if not self.journal_file.exists():
+            return
+        if self._compacting_file.exists():
+            # Left behind by a failed compaction: keep both segments
+            with open(self._compacting_file, "a") as dst, open(self.journal_file, "r") as src:
+                shutil.copyfileobj(src, dst)
+            self.journal_file.unlink()
+        else:
+            os.replace(self.journal_file, self._compacting_file)
+
+    def _write_snapshot(
+        self,
+        patterns: List[CommandPattern],
+        context_history: List[ContextRecord],
+        suggestion_cache: Dict[str, List[str]],
+        seq: int,
+    ) -> bool:
+        """
+        Atomically write the snapshot files.
+
+        patterns.json goes last and carries seq, the last journal event it
+        includes, so the patterns and the point replay resumes from change
+        in one rename.
+        """
+        try:
+            _write_json(self.context_file, [record.to_dict() for record in context_history])
+            _write_json(self.suggestions_file, suggestion_cache)
+            _write_json(
+                self.patterns_file, {"seq": seq, "rows": [p.to_row() for p in patterns]}
+            )
+        except Exception as e:
+            print(f"Failed to save patterns: {e}")
+            return False
+        return True
+
+    def _schedule_flush(self, now: bool = False) -> None:
+        """Make sure the writer will run; called with the write lock held"""
+        if now or len(self._pending) + len(self._hits) >= self.flush_threshold:
+            self._wake.set()
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._run_writer, name="shellrosetta-persistence", daemon=True
+            )
+            self._writer.start()
+
+    def _run_writer(self) -> None:
+        """Flush pending events every flush_interval until there is nothing left"""
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            with self._write_lock:
+                if not self._pending and not self._hits and not self._save_requested:
+                    self._writer = None
+                    return
+
+    def _write_pending(self) -> None:
+        """Append pending events to the journal; called with the I/O lock held"""
+        with self._write_lock:
+            self._apply_hits()
+            pending, self._pending = self._pending, []
+        if pending:
+            self._append_journal(pending)
+
+    def _append_journal(self, entries: List[Dict[str, Any]]) -> None:
+        """Append events to the journal file"""
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        try:
+            if self._journal is None or self._journal_path != self.journal_file:
+                self._close_journal()
+                self._journal_path = self.journal_file
+                self._journal = open(self._journal_path, "a")
+            self._journal.write(data)
+            self._journal.flush()
+        except OSError as e:
+            print(f"Failed to write journal: {e}")
+            return
+
+        self._journal_bytes += len(data)
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            try:
+                self._journal.close()
+            except OSError:
+                pass
+            self._journal = None
+
+    def learn_patterns(
+        self, events: Iterable[Tuple[str, str, str, bool]]
+    ) -> None:
+        """Learn a batch of (command, translation, direction, success) events"""
+        self._record_patterns(events)
+
+    def load_patterns(self, patterns: Iterable[CommandPattern]) -> None:
+        """
+        Add patterns as they are, replacing any for the same command.
+
+        Unlike learning, nothing is journaled: the patterns are saved by the
+        next compaction. A bounded store then evicts down to its capacity.
+        """
+        with self._write_lock:
+            loaded = dict(self.patterns)
+            for pattern in patterns:
+                loaded[f"{pattern.direction}:{pattern.command}"] = pattern
+            self.patterns = loaded
+            self._frequencies = None
+            self._stats.rebuild(loaded)
+            self._publish_stats(loaded)
+            self._rebuild_command_index()
+        self.set_capacity(self.max_patterns)
+        self._notify_change()
+
+    def record_hit(self, command: str, direction: str) -> None:
+        """
+        Count a translation served from a cache as another successful use.
+
+        Hits only matter for eviction, so they are ignored while the store
+        is unbounded. Otherwise this only queues the hit, without taking the
+        write lock. Queued hits are applied by the background writer, and
+        before any learning event so that eviction sees them; a pattern's
+        last use is then the time the hits were applied.
+        """
+        if self.max_patterns is None:
+            return
+        self._hits.append((direction, command))
+        if self._writer is None:
+            with self._write_lock:
+                self._schedule_flush()
+
+    def record_hits(self, hits: Iterable[Tuple[str, str]]) -> None:
+        """Count a batch of (command, direction) cache hits"""
+        if self.max_patterns is None:
+            return
+        self._hits.extend((direction, command) for command, direction in hits)
+        if self._writer is None:
+            with self._write_lock:
+                self._schedule_flush()
+
+    def _apply_hits(self) -> None:
+        """Apply and journal the queued cache hits; called with the write lock held"""
+        counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        hits = self._hits
+        while hits:
+            counts[hits.popleft()] += 1
+        if counts:
+            now = int(time.time())
+            self._apply_hit_counts(
+                {key: (count, now) for key, count in counts.items()}, journal=self._pending
+            )
+
+    def _apply_hit_counts(
+        self,
+        hits: Dict[Tuple[str, str], Tuple[int, int]],
+        journal: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Add (direction, command) -> (count, time) hits to the success count
+        and last use of the patterns they hit.
+
+        Each pattern gets one {"op": "hit"} journal event however many hits
+        it had. Listeners are not notified: the translation is unchanged, so
+        cached results stay valid.
+        """
+        with self._write_lock:
+            patterns = self.patterns
+            frequencies = self._frequency_index(patterns)
+            top_complete = True
+            for (direction, command), (count, when) in hits.items():
+                key = f"{direction}:{command}"
+                old = patterns.get(key)
+                if old is None:
+                    continue  # evicted since it was cached
+                pattern = copy.copy(old)
+                pattern.success_count += count
+                pattern.last_used = max(pattern.last_used, when)
+                patterns[key] = pattern
+                if frequencies is not None:
+                    frequencies.touch(key, pattern.success_count)
+                top_complete &= self._stats.update(old, pattern)
+                if journal is not None:
+                    self._journal_seq += 1
+                    journal.append({
+                        "seq": self._journal_seq,
+                        "timestamp": when,
+                        "op": "hit",
+                        "command": command,
+                        "direction": direction,
+                        "count": count,
+                    })
+
+            if not top_complete:
+                self._stats.rebuild_top(patterns)
+            self._publish_stats(patterns)
+
+    def _record_patterns(self, events: Iterable[Tuple[str, str, str, bool]]) -> int:
+        """Apply learning events and queue them for the journal. Returns the number applied."""
+        with self._write_lock:
+            now = int(time.time())
+            entries = [(c, t, d, s, now) for c, t, d, s in events]
+            if not entries:
+                return 0
+            # Hits first, so eviction sees every use made before these events
+            self._apply_hits()
+            self._apply_entries(entries, journal=self._pending)
+            self._schedule_flush()
+            return len(entries)
+
+    def _apply_entries(
+        self,
+        entries: List[Tuple[str, str, str, bool, int]],
+        journal: Optional[List[Dict[str, Any]]] = None,
+        record_context: bool = True,
+    ) -> None:
+        """
+        Apply (command, translation, direction, success, time) events.
+
+        Changed patterns are copied rather than modified, and the copy is
+        stored with one item assignment, so readers never see a half-updated
+        pattern. The events, and any evictions they cause, are appended to
+        journal in order, and to the context history unless record_context
+        is False.
+        """
+        with self._write_lock:
+            patterns = self.patterns
+            frequencies = self._frequency_index(patterns)
+            capacity = self.max_patterns
+            changed: List[Tuple[str, str]] = []
+            top_complete = True
+
+            for command, translation, direction, success, when in entries:
+                key = f"{direction}:{command}"
+                old = patterns.get(key)
+                if old is None:
+                    if frequencies is not None and capacity is not None:
+                        while len(patterns) >= capacity:
+                            top_complete &= self._evict(patterns, changed, journal, when)
+                    pattern = CommandPattern(command, translation, direction, created=when)
+                    self._index_command(direction, command)
+                else:
+                    pattern = copy.copy(old)
+                if success:
+                    pattern.record_success()
+                else:
+                    pattern.record_failure()
+                pattern.last_used = when
+                patterns[key] = pattern
+                if frequencies is not None:
+                    frequencies.touch(key, pattern.success_count)
+                top_complete &= self._stats.update(old, pattern)
+                if record_context:
+                    self.context_history.append(
+                        self._context_entry(command, translation, direction, success, when)
+                    )
+                changed.append((direction, command))
+                if journal is not None:
+                    self._journal_seq += 1
+                    journal.append({
+                        "seq": self._journal_seq,
+                        "timestamp": when,
+                        "command": command,
+                        "translation": translation,
+                        "direction": direction,
+                        "success": success,
+                    })
+
+            if not top_complete:
+                self._stats.rebuild_top(patterns)
+            self._publish_stats(patterns)
+
+        for direction, command in changed:
+            self._notify_change(direction, command)
+
+    def set_capacity(self, max_patterns: Optional[int]) -> None:
+        """
+        Set the maximum number of patterns kept (None for no limit).
+
+        Patterns over the new limit are evicted straight away.
+        """
+        if max_patterns is not None and max_patterns < 1:
+            raise ValueError("max_patterns must be at least 1")
+        changed: List[Tuple[str, str]] = []
+        with self._write_lock:
+            self.max_patterns = max_patterns
+            patterns = self.patterns
+            frequencies = self._frequency_index(patterns)
+            if frequencies is None or max_patterns is None or len(patterns) <= max_patterns:
+                return
+            self._apply_hits()
+            top_complete = True
+            now = int(time.time())
+            while len(patterns) > max_patterns:
+                top_complete &= self._evict(patterns, changed, self._pending, now)
+            if not top_complete:
+                self._stats.rebuild_top(patterns)
+            self._publish_stats(patterns)
+            self._schedule_flush()
+
+        for direction, command in changed:
+            self._notify_change(direction, command)
+
+    def get_eviction_stats(self) -> Dict[str, Any]:
+        """Store size, capacity and the number of patterns evicted so far"""
+        return {
+            "patterns": len(self.patterns),
+            "max_patterns": self.max_patterns,
+            "evictions": self.evictions,
+        }
+
+    def _frequency_index(self, patterns: Dict[str, CommandPattern]) -> Optional[FrequencyBuckets]:
+        """The eviction order while a capacity is set, built on first use"""
+        if self.max_patterns is None:
+            self._frequencies = None
+        elif self._frequencies is None:
+            self._frequencies = FrequencyBuckets.from_patterns(patterns.values())
+        return self._frequencies
+
+    def _evict(
+        self,
+        patterns: Dict[str, CommandPattern],
+        changed: List[Tuple[str, str]],
+        journal: Optional[List[Dict[str, Any]]],
+        when: int,
+    ) -> bool:
+        """
+        Evict the least frequently used pattern from patterns; called with
+        the write lock held. Returns False if the top list must be rebuilt.
+        """
+        frequencies = self._frequency_index(patterns)
+        while True:
+            if not frequencies:
+                # patterns was replaced without going through the engine
+                frequencies = self._frequencies = FrequencyBuckets.from_patterns(patterns.values())
+            pattern = patterns.pop(frequencies.pop_victim(), None)
+            if pattern is not None:
+                break
+
+        self._unindex_command(pattern.direction, pattern.command)
+        self.evictions += 1
+        changed.append((pattern.direction, pattern.command))
+        if journal is not None:
+            self._journal_seq += 1
+            journal.append({
+                "seq": self._journal_seq,
+                "timestamp": when,
+                "op": "evict",
+                "command": pattern.command,
+                "direction": pattern.direction,
+            })
+        return self._stats.update(pattern, None)
+
+    def _remove_patterns(self, keys: Iterable[str]) -> bool:
+        """Remove patterns by key. Returns True if any were removed."""
+        with self._write_lock:
+            patterns = self.patterns
+            removed = []
+            top_complete = True
+            for key in keys:
+                pattern = patterns.pop(key, None)
+                if pattern is None:
+                    continue
+                removed.append(pattern)
+                top_complete &= self._stats.update(pattern, None)
+                if self._frequencies is not None:
+                    self._frequencies.discard(key)
+            if not removed:
+                return False
+
+            if not top_complete:
+                self._stats.rebuild_top(patterns)
+            self._publish_stats(patterns)
+
+            # One pass over each affected sorted list, however many are removed
+            gone: Dict[str, Set[str]] = defaultdict(set)
+            for pattern in removed:
+                gone[pattern.direction].add(pattern.command)
+                self._similarity_index.remove(pattern.direction, pattern.command)
+            for direction, commands in gone.items():
+                self._sorted_commands[direction] = [
+                    command for command in self._sorted_commands.get(direction, [])
+                    if command not in commands
+                ]
+            return True
+
+    def _index_command(self, direction: str, command: str) -> None:
+        """Insert a command into its direction's sorted list, if missing"""
+        commands = self._sorted_commands.setdefault(direction, [])
+        i = bisect.bisect_left(commands, command)
+        if i == len(commands) or commands[i] != command:
+            commands.insert(i, command)
+            self._similarity_index.add(direction, command)
+
+    def _unindex_command(self, direction: str, command: str) -> None:
+        """Remove a command from its direction's sorted list and the similarity index"""
+        commands = self._sorted_commands.get(direction, [])
+        i = bisect.bisect_left(commands, command)
+        if i < len(commands) and commands[i] == command:
+            del commands[i]
+            self._similarity_index.remove(direction, command)
+
+    def _rebuild_command_index(self) -> None:
+        """Rebuild the sorted command lists and similarity index from the current patterns"""
+        index: Dict[str, List[str]] = defaultdict(list)
+        similarity_index = SIMILARITY_INDEXES[self._similarity_kind](**self._similarity_options)
+        for pattern in self.patterns.values():
+            index[pattern.direction].append(pattern.command)
+            similarity_index.add(pattern.direction, pattern.command)
+        for commands in index.values():
+            commands.sort()
+        self._sorted_commands = dict(index)
+        self._similarity_index = similarity_index
+
+    def set_similarity_index(self, kind: str = DEFAULT_SIMILARITY_INDEX, **options: Any) -> None:
+        """
+        Choose how similar commands are found.
+
+        "inverted" finds every similar command; "minhash" uses MinHash LSH,
+        which may miss a few but reads fewer candidates; "matrix" scores
+        every command with one sparse product (NumPy if installed, pure
+        Python otherwise). The default is "matrix" when NumPy is installed
+        and "inverted" otherwise. Options are passed to the index class in
+        shellrosetta.similarity.
+        """
+        if kind not in SIMILARITY_INDEXES:
+            raise ValueError(f"Unknown similarity index {kind!r}")
+        with self._write_lock:
+            self._similarity_kind = kind
+            self._similarity_options = options
+            self._rebuild_command_index()
+
+    def _commands_with_prefix(self, prefix: str, direction: str) -> List[str]:
+        """Commands starting with prefix, in sorted order"""
+        commands = self._sorted_commands.get(direction, [])
+        i = bisect.bisect_left(commands, prefix)
+        matches = []
+        # A concurrent insert or eviction can shift the list; startswith
+        # re-checks each entry
+        for i in range(i, len(commands)):
+            try:
+                command = commands[i]
+            except IndexError:
+                break
+            if not command.startswith(prefix):
+                break
+            matches.append(command)
+        return matches
+
+    def _context_entry(
+        self,
+        command: str,
+        translation: str,
+        direction: str,
+        success: bool,
+        when: Optional[int] = None,
+    ) -> ContextRecord:
+        """Build a context history entry"""
+        return ContextRecord(
+            int(time.time()) if when is None else when,
+            command,
+            translation,
+            direction,
+            success,
+            self._classify_command(command),
+        )
+
+    def get_suggestions(
+        self, partial_command: str, direction: str, limit: int = 5
+    ) -> List[Tuple[str, float]]:
+        """
+        Get suggestions for a partial command.
+
+        Learned commands are visited in sorted order, so equally confident
+        suggestions are returned in command order.
+        """
+        similar = self._similarity_index.similar(direction, command_words(partial_command))
+        return self._rank_suggestions(partial_command, direction, similar, limit)
+
+    def get_suggestions_many(
+        self, partial_commands: List[str], direction: str, limit: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        """Get suggestions for each of a batch of partial commands"""
+        similar = self._similarity_index.similar_many(
+            direction, [command_words(partial) for partial in partial_commands]
+        )
+        return [
+            self._rank_suggestions(partial, direction, commands, limit)
+            for partial, commands in zip(partial_commands, similar)
+        ]
+
+    def _rank_suggestions(
+        self, partial_command: str, direction: str, similar: Iterable[str], limit: int
+    ) -> List[Tuple[str, float]]:
+        """Combine prefix matches and similar commands into the top suggestions"""
+        patterns = self.patterns
+        suggestions = []
+
+        # Look for prefix matches in learned patterns
+        for command in self._commands_with_prefix(partial_command, direction):
+            pattern = patterns.get(f"{direction}:{command}")
+            if pattern is not None:
+                suggestions.append((pattern.translation, pattern.get_success_rate()))
+
+        # Similar patterns, as scored by the similarity index
+        for command in sorted(similar):
+            pattern = patterns.get(f"{direction}:{command}")
+            if pattern is not None:
+                suggestions.append(
+                    (pattern.translation, pattern.get_success_rate() * 0.8)
+                )  # Lower confidence
+
+        # Return the most confident results
+        return heapq.nlargest(limit, suggestions, key=itemgetter(1))
+
     def get_best_translation(self, command: str, direction: str) -> Optional[str]:
         """Get the best learned translation for a command"""
         key = f"{direction}:{command}"
 
-        if key in self.patterns:
-            pattern = self.patterns[key]
+        pattern = self.patterns.get(key)
+        if pattern is not None:
             if pattern.get_success_rate() > 0.5:  # Only use if success rate > 50%
                 return pattern.translation
 
@@ -255,70 +1328,136 @@ class MLEngine:
     def get_context_suggestions(
         self, current_command: str, direction: str
     ) -> List[str]:
-        """Get suggestions based on recent context"""
-        if not self.context_history:
-            return []
-
-        # Get recent commands of similar type
-        current_type = self._classify_command(current_command)
-        recent_commands = []
-
-        for entry in self.context_history[-50:]:  # Last 50 entries
-            if entry["direction"] == direction and entry["success"]:
-                recent_commands.append(entry["translation"])
-
-        # Return most common recent translations
-        counter = Counter(recent_commands)
-        return [cmd for cmd, _ in counter.most_common(3)]
+        """Get the most common successful translations among the recent context"""
+        return self.context_history.most_common(direction, 3)
 
     def analyze_patterns(self) -> Dict[str, Any]:
-        """Analyze learned patterns for insights"""
-        if not self.patterns:
-            return {}
+        """
+        Analyze learned patterns for insights.
 
-        total_patterns = len(self.patterns)
-        successful_patterns = sum(
-            1 for p in self.patterns.values() if p.get_success_rate() > 0.5
-        )
-
-        # Most common command types
-        command_types: Counter[str] = Counter()
-        for pattern in self.patterns.values():
-            command_types[self._classify_command(pattern.command)] += 1
-
-        # Most successful patterns
-        successful_patterns_list = [
-            (p.command, p.get_success_rate())
-            for p in self.patterns.values()
-            if p.get_success_rate() > 0.7
-        ]
-        successful_patterns_list.sort(key=lambda x: x[1], reverse=True)
+        Reads the running aggregates instead of scanning the patterns; ties
+        among the top patterns are listed in command order.
+        """
+        snapshot = self._current_stats()
+        _, total_patterns, successful_patterns, command_types, top = snapshot
+        if not total_patterns:
+            return {}
 
         return {
             "total_patterns": total_patterns,
             "successful_patterns": successful_patterns,
-            "success_rate": (
-                successful_patterns / total_patterns if total_patterns > 0 else 0
-            ),
+            "success_rate": successful_patterns / total_patterns,
             "command_types": dict(command_types),
-            "top_successful_patterns": successful_patterns_list[:10],
+            "top_successful_patterns": list(top),
         }
 
-    def cleanup_old_patterns(self, days: int = 30):
+    def _current_stats(self) -> StatsSnapshot:
+        """The published aggregates, recomputed if patterns was changed directly"""
+        snapshot = self._stats_snapshot
+        patterns = self.patterns
+        if snapshot[0] is patterns and snapshot[1] == len(patterns):
+            return snapshot
+        with self._write_lock:
+            # A writer may have been between publishing patterns and stats
+            snapshot = self._stats_snapshot
+            patterns = self.patterns
+            if snapshot[0] is not patterns or snapshot[1] != len(patterns):
+                self._stats.rebuild(patterns)
+                snapshot = self._publish_stats(patterns)
+            return snapshot
+
+    def _publish_stats(self, patterns: Dict[str, CommandPattern]) -> StatsSnapshot:
+        snapshot = self._stats_snapshot = self._stats.snapshot(patterns)
+        return snapshot
+
+    def cleanup_old_patterns(self, days: int = 30) -> None:
         """Remove patterns that haven't been used recently"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        keys_to_remove = []
+        cutoff = int(time.time()) - days * 86400
+
+        with self._write_lock:
+            stale = [
+                pattern for pattern in self.patterns.values()
+                if pattern.last_used < cutoff and pattern.get_success_rate() < 0.3
+            ]
+            if not self._remove_patterns(f"{p.direction}:{p.command}" for p in stale):
+                return
+
+            # Journaled like evictions, so replay drops them too
+            now = int(time.time())
+            for pattern in stale:
+                self._journal_seq += 1
+                self._pending.append({
+                    "seq": self._journal_seq,
+                    "timestamp": now,
+                    "op": "remove",
+                    "command": pattern.command,
+                    "direction": pattern.direction,
+                })
+            self._schedule_flush()
+
+        self._notify_change()
+
+
+# Global ML engine instance, created on first use so that importing this
+# module does not touch ~/.shellrosetta
+_ml_engine: Optional[PatternStore] = None
+_instance_lock = threading.Lock()
+
+# Engines whose pending events are written when the interpreter exits
+_live_engines: "weakref.WeakSet[MLEngine]" = weakref.WeakSet()
+
+
+def _flush_at_exit() -> None:
+    for engine in list(_live_engines):
+        try:
+            engine.close()
+        except Exception as e:
+            print(f"Failed to save patterns: {e}")
+
+
+atexit.register(_flush_at_exit)
+
+# Storage backends for the global engine, selected by SHELLROSETTA_ML_BACKEND
+ML_BACKENDS = ("json", "sqlite")
+
+
+def create_ml_engine(
+    backend: Optional[str] = None, max_patterns: Optional[int] = None
+) -> PatternStore:
+    """
+    Create an ML engine with the given storage backend.
+
+    "json" keeps patterns in memory, persisted through the journal;
+    "sqlite" keeps them in a database shared by every process.
+    max_patterns (default: SHELLROSETTA_ML_MAX_PATTERNS) bounds the "json"
+    store.
+    """
+    backend = (backend or os.environ.get("SHELLROSETTA_ML_BACKEND") or "json").lower()
+    if max_patterns is None and os.environ.get("SHELLROSETTA_ML_MAX_PATTERNS"):
+        max_patterns = int(os.environ["SHELLROSETTA_ML_MAX_PATTERNS"])
+    if backend == "sqlite":
+        from .ml_sqlite import SQLiteMLEngine
 
-        for key, pattern in self.patterns.items():
-            if pattern.last_used < cutoff_date and pattern.get_success_rate() < 0.3:
-                keys_to_remove.append(key)
+        if max_patterns is not None:
+            raise ValueError("max_patterns is not supported by the sqlite backend")
+        return SQLiteMLEngine()
+    if backend != "json":
+        raise ValueError(f"Unknown ML backend {backend!r}, expected one of {ML_BACKENDS}")
+    return MLEngine(max_patterns)
 
-        for key in keys_to_remove:
-            del self.patterns[key]
 
-        if keys_to_remove:
-            self.save_data()
+def get_ml_engine() -> PatternStore:
+    """Return the global ML engine, loading its data on first use"""
+    global _ml_engine
+    if _ml_engine is None:
+        with _instance_lock:
+            if _ml_engine is None:
+                _ml_engine = create_ml_engine()
+    return _ml_engine
 
 
-# Global ML engine instance
-ml_engine = MLEngine()
+def __getattr__(name: str) -> Any:
+    # Keep "from shellrosetta.ml_engine import ml_engine" working
+    if name == "ml_engine":
+        return get_ml_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
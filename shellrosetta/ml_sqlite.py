@@ -0,0 +1,334 @@
+# shellrosetta/ml_sqlite.py
+
+"""
+SQLite backend for the ML engine.
+
+Patterns and context history live in a single database in WAL mode, so any
+number of processes (for example several API workers) can read it while one
+of them writes, and every worker sees what the others learned. Nothing is
+loaded into memory: lookups, prefix suggestions and the success-rate
+analytics are indexed queries. analyze_patterns also counts all patterns and
+groups them by command type, which reads every row.
+"""
+
+import heapq
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .ml_engine import CommandPattern, ContextRecord, PatternStore
+
+# Upper bound for prefix range scans: sorts after any character in a command
+_PREFIX_END = "\U0010ffff"
+
+# Success rate as SQL, 0.0 for a pattern with no recorded uses (as in CommandPattern)
+_SUCCESS_RATE = (
+    "COALESCE(CAST(success_count AS REAL) / NULLIF(success_count + failure_count, 0), 0.0)"
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS patterns (
+    direction TEXT NOT NULL,
+    command TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    command_type TEXT NOT NULL,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+-- Exact lookups, and prefix range scans within a direction
+CREATE UNIQUE INDEX IF NOT EXISTS patterns_direction_command
+    ON patterns (direction, command);
+-- Successful-pattern counts and the top patterns by success rate
+CREATE INDEX IF NOT EXISTS patterns_success_rate
+    ON patterns ({_SUCCESS_RATE} DESC, command, direction);
+
+-- Words of each pattern's command, for the similar-command search
+CREATE TABLE IF NOT EXISTS pattern_words (
+    word TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    command TEXT NOT NULL,
+    PRIMARY KEY (word, direction, command)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS context (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    command TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    command_type TEXT NOT NULL
+);
+"""
+
+
+class SQLiteMLEngine(PatternStore):
+    """
+    ML engine whose patterns and context history are stored in SQLite.
+
+    Each thread uses its own connection. snapshot_patterns() and
+    snapshot_context_history() return what MLEngine keeps in its patterns
+    and context_history attributes, but read the whole table on every call.
+    """
+
+    # Seconds to wait for another process's write transaction
+    BUSY_TIMEOUT = 30.0
+
+    def __init__(self, db_path: Optional[Path] = None):
+        super().__init__()
+        self.data_dir = Path.home() / ".shellrosetta" / "ml"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = Path(db_path) if db_path else self.data_dir / "patterns.db"
+
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self.load_data()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=self.BUSY_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by this engine"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def snapshot_patterns(self) -> Dict[str, CommandPattern]:
+        """Copy of all learned patterns, read from the database (a full table scan)"""
+        rows = self._connection().execute(
+            "SELECT command, translation, direction, success_count, failure_count,"
+            " created, last_used FROM patterns ORDER BY rowid"
+        )
+        patterns = {}
+        for command, translation, direction, successes, failures, created, last_used in rows:
+            patterns[f"{direction}:{command}"] = CommandPattern(
+                command, translation, direction, successes, failures, int(last_used), int(created)
+            )
+        return patterns
+
+    def snapshot_context_history(self) -> List[ContextRecord]:
+        """Copy of the recent context entries, oldest first, read from the database"""
+        rows = self._connection().execute(
+            "SELECT timestamp, command, translation, direction, success, command_type"
+            " FROM context ORDER BY id"
+        )
+        return [
+            ContextRecord(
+                int(timestamp), command, translation, direction, bool(success), command_type
+            )
+            for timestamp, command, translation, direction, success, command_type in rows
+        ]
+
+    def load_data(self) -> None:
+        """Create the schema if needed; the data itself stays in the database"""
+        self._connection().executescript(_SCHEMA)
+        self._notify_change()
+
+    def save_data(self) -> None:
+        """Checkpoint the write-ahead log into the database file"""
+        self.compact()
+
+    def compact(self) -> bool:
+        """Checkpoint the write-ahead log; returns False if readers blocked part of it"""
+        busy, _, _ = self._connection().execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return not busy
+
+    def flush(self) -> None:
+        """Nothing to do: every write is committed before learn_pattern returns"""
+
+    def get_eviction_stats(self) -> Dict[str, Any]:
+        """Store size; the database never evicts"""
+        (count,) = self._connection().execute("SELECT COUNT(*) FROM patterns").fetchone()
+        return {"patterns": count, "max_patterns": None, "evictions": 0}
+
+    def record_hits(self, hits: Iterable[Tuple[str, str]]) -> None:
+        """The database is not bounded, so cache hits have no eviction order to feed"""
+
+    def learn_patterns(self, events: Iterable[Tuple[str, str, str, bool]]) -> None:
+        """Learn a batch of (command, translation, direction, success) events in one transaction"""
+        now = datetime.now().timestamp()
+        pattern_rows: List[Tuple[Any, ...]] = []
+        word_rows: List[Tuple[str, str, str]] = []
+        context_rows: List[Tuple[Any, ...]] = []
+        changed: List[Tuple[str, str]] = []
+        for command, translation, direction, success in events:
+            command_type = self._classify_command(command)
+            pattern_rows.append((
+                direction, command, translation, command_type,
+                int(success), int(not success), now, now,
+            ))
+            word_rows.extend((word, direction, command) for word in set(command.split()))
+            context_rows.append((now, command, translation, direction, int(success), command_type))
+            changed.append((direction, command))
+        if not pattern_rows:
+            return
+
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO patterns (direction, command, translation, command_type,"
+                    " success_count, failure_count, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (direction, command) DO UPDATE SET"
+                    " success_count = success_count + excluded.success_count,"
+                    " failure_count = failure_count + excluded.failure_count,"
+                    " last_used = excluded.last_used",
+                    pattern_rows,
+                )
+                conn.executemany("INSERT OR IGNORE INTO pattern_words VALUES (?, ?, ?)", word_rows)
+                conn.executemany(
+                    "INSERT INTO context (timestamp, command, translation, direction,"
+                    " success, command_type) VALUES (?, ?, ?, ?, ?, ?)",
+                    context_rows,
+                )
+                conn.execute(
+                    "DELETE FROM context WHERE id <= (SELECT MAX(id) FROM context) - ?",
+                    (self.MAX_CONTEXT_HISTORY,),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        for direction, command in changed:
+            self._notify_change(direction, command)
+
+    def get_suggestions(
+        self, partial_command: str, direction: str, limit: int = 5
+    ) -> List[Tuple[str, float]]:
+        """Get suggestions for a partial command, ties in command order"""
+        conn = self._connection()
+        suggestions = []
+
+        # Prefix matches: a range scan on the (direction, command) index
+        rows = conn.execute(
+            "SELECT translation, success_count, failure_count FROM patterns"
+            " WHERE direction = ? AND command >= ? AND command < ? ORDER BY command",
+            (direction, partial_command, partial_command + _PREFIX_END),
+        )
+        for translation, successes, failures in rows:
+            suggestions.append((translation, _success_rate(successes, failures)))
+
+        # Similar commands share at least one word with the partial command
+        words = sorted(set(partial_command.split()))
+        if words:
+            placeholders = ", ".join("?" * len(words))
+            rows = conn.execute(
+                "SELECT command, translation, success_count, failure_count FROM patterns"
+                " WHERE rowid IN (SELECT p.rowid FROM pattern_words w JOIN patterns p"
+                " ON p.direction = w.direction AND p.command = w.command"
+                f" WHERE w.direction = ? AND w.word IN ({placeholders})) ORDER BY command",
+                (direction, *words),
+            )
+            for command, translation, successes, failures in rows:
+                if self._similar_commands(partial_command, command):
+                    suggestions.append(
+                        (translation, _success_rate(successes, failures) * 0.8)
+                    )  # Lower confidence
+
+        return heapq.nlargest(limit, suggestions, key=itemgetter(1))
+
+    def get_best_translation(self, command: str, direction: str) -> Optional[str]:
+        """Get the best learned translation for a command"""
+        row = self._connection().execute(
+            "SELECT translation, success_count, failure_count FROM patterns"
+            " WHERE direction = ? AND command = ?",
+            (direction, command),
+        ).fetchone()
+        if row is not None and _success_rate(row[1], row[2]) > 0.5:
+            return row[0]
+        return None
+
+    def get_context_suggestions(
+        self, current_command: str, direction: str
+    ) -> List[str]:
+        """Get suggestions based on recent context"""
+        rows = self._connection().execute(
+            "SELECT translation, COUNT(*) AS uses FROM"
+            " (SELECT * FROM context ORDER BY id DESC LIMIT 50)"
+            " WHERE direction = ? AND success GROUP BY translation"
+            " ORDER BY uses DESC, MIN(id) LIMIT 3",
+            (direction,),
+        )
+        return [translation for translation, _ in rows]
+
+    def analyze_patterns(self) -> Dict[str, Any]:
+        """Analyze learned patterns for insights"""
+        conn = self._connection()
+        (total_patterns,) = conn.execute("SELECT COUNT(*) FROM patterns").fetchone()
+        if not total_patterns:
+            return {}
+        (successful_patterns,) = conn.execute(
+            f"SELECT COUNT(*) FROM patterns WHERE {_SUCCESS_RATE} > 0.5"
+        ).fetchone()
+
+        command_types = conn.execute(
+            "SELECT command_type, COUNT(*) FROM patterns"
+            " GROUP BY command_type ORDER BY MIN(rowid)"
+        ).fetchall()
+        top_successful = conn.execute(
+            f"SELECT command, {_SUCCESS_RATE} FROM patterns WHERE {_SUCCESS_RATE} > 0.7"
+            f" ORDER BY {_SUCCESS_RATE} DESC, command, direction LIMIT 10"
+        ).fetchall()
+
+        return {
+            "total_patterns": total_patterns,
+            "successful_patterns": successful_patterns,
+            "success_rate": successful_patterns / total_patterns,
+            "command_types": dict(command_types),
+            "top_successful_patterns": top_successful,
+        }
+
+    def cleanup_old_patterns(self, days: int = 30) -> None:
+        """Remove patterns that haven't been used recently"""
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        conn = self._connection()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = conn.execute(
+                    f"DELETE FROM patterns WHERE last_used < ? AND {_SUCCESS_RATE} < 0.3",
+                    (cutoff,),
+                ).rowcount
+                conn.execute(
+                    "DELETE FROM pattern_words WHERE NOT EXISTS (SELECT 1 FROM patterns p"
+                    " WHERE p.direction = pattern_words.direction"
+                    " AND p.command = pattern_words.command)"
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if removed:
+            self._notify_change()
+
+
+def _success_rate(successes: int, failures: int) -> float:
+    total = successes + failures
+    return successes / total if total > 0 else 0.0
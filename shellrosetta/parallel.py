@@ -0,0 +1,109 @@
+# shellrosetta/parallel.py
+
+"""
+Multi-process translation of large command corpora.
+
+Unique commands are sharded across a ProcessPoolExecutor. Each worker
+compiles the mapping engine once, translates its shards without touching
+the ML store, and sends its learning events back; the parent merges results
+in input order and folds all learning into its own pattern store in one go.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import core
+from .engine import get_engine
+
+DIRECTIONS = ("lnx2ps", "ps2lnx")
+
+
+def _init_worker() -> None:
+    """Compile the translation engine once per worker process"""
+    get_engine()
+
+
+def _translate_shard(
+    shard: List[str], direction: str, use_ml: bool, use_plugins: bool, pure: bool
+) -> Tuple[List[str], List[core.LearnEvent]]:
+    """Translate one shard, returning results and the learning it produced"""
+    if pure:
+        return [core._translate_pure(command, direction) for command in shard], []
+    learned: List[core.LearnEvent] = []
+    results = [
+        core._translate(command, direction, use_ml, use_plugins, learned)
+        for command in shard
+    ]
+    return results, learned
+
+
+def translate_corpus(
+    commands: Iterable[str],
+    direction: str = "lnx2ps",
+    workers: Optional[int] = None,
+    use_ml: bool = True,
+    use_plugins: bool = True,
+    chunk_size: Optional[int] = None,
+    pure: Optional[bool] = None,
+) -> List[str]:
+    """
+    Translate a corpus of commands across several processes.
+
+    Args:
+        commands: The commands to translate
+        direction: "lnx2ps" or "ps2lnx"
+        workers: Number of worker processes (defaults to the CPU count)
+        use_ml: Whether to use machine learning suggestions
+        use_plugins: Whether to use plugin translations
+        chunk_size: Commands per shard (defaults to an even split, four shards per worker)
+        pure: Translate from the mapping tables only (defaults to the process-wide setting)
+
+    Returns:
+        The translations, one per input command, in input order
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction: {direction}")
+
+    commands = list(commands)
+    unique = list(dict.fromkeys(commands))
+    workers = workers or os.cpu_count() or 1
+    pure = core.is_pure_mode() if pure is None else pure
+
+    if workers == 1 or len(unique) < 2:
+        many = core.lnx2ps_many if direction == "lnx2ps" else core.ps2lnx_many
+        return many(commands, use_ml=use_ml, use_plugins=use_plugins, pure=pure)
+
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(unique) // (workers * 4)))
+    shards = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+
+    translations: Dict[str, str] = {}
+    learned: List[core.LearnEvent] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [
+            executor.submit(_translate_shard, shard, direction, use_ml, use_plugins, pure)
+            for shard in shards
+        ]
+        for shard, future in zip(shards, futures):
+            results, shard_learned = future.result()
+            translations.update(zip(shard, results))
+            learned.extend(shard_learned)
+
+    # Workers never see the parent's learning sink, so pure results are
+    # handed to it here
+    sink = core._learning_sink
+    if pure and sink is not None:
+        for command in unique:
+            if command.strip():
+                sink.submit((command, translations[command], direction, True))
+
+    # Fold every worker's learning into the parent's pattern store once
+    if learned:
+        if sink is not None:
+            for event in learned:
+                sink.submit(event)
+        else:
+            core._get_ml_engine().learn_patterns(learned)
+
+    return [translations[command] for command in commands]
@@ -8,6 +8,23 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Union, Any
 
 
+# Quotes and escapes need the full POSIX lexer; anything else splits on whitespace
+_NEEDS_POSIX_LEXER = re.compile(r"[\"'\\]").search
+_WORDS = re.compile(r"[^ \t\r\n]+").findall
+
+
+def split_words(text: str) -> List[str]:
+    """
+    Split text into words exactly like shlex.split.
+
+    Text without quotes or backslashes, which is most real-world input, is
+    scanned with a precompiled regex; everything else goes through shlex.
+    """
+    if _NEEDS_POSIX_LEXER(text) is None:
+        return _WORDS(text)
+    return shlex.split(text)
+
+
 class NodeType(Enum):
     COMMAND = "command"
     ARGUMENT = "argument"
@@ -37,38 +54,45 @@ class CommandParser:
         self.redirect_pattern = re.compile(r"([><])([^|&]*?)(?:\||$)")
         self.conditional_pattern = re.compile(r"([&|]{2})")
 
+    def split_stages(self, command: str) -> List[str]:
+        """Split a command into its non-empty pipeline stages"""
+        return [stage for stage in (part.strip() for part in command.split("|")) if stage]
+
+    def tokenize(self, stage: str) -> List[str]:
+        """Tokenize a single pipeline stage using shell quoting rules"""
+        try:
+            return split_words(stage)
+        except ValueError:
+            # Fallback for malformed commands
+            return stage.split()
+
+    def tokenize_pipeline(self, command: str) -> List[List[str]]:
+        """Tokenize every pipeline stage of a command in one pass"""
+        return [self.tokenize(stage) for stage in self.split_stages(command)]
+
     def parse(self, command: str) -> ASTNode:
         """Parse a command string into an AST"""
-        if not command.strip():
-            return ASTNode(NodeType.COMMAND, "", [])
+        return self.parse_tokens(self.tokenize_pipeline(command))
 
-        # Split by pipes first
-        pipe_parts = command.split("|")
-        if len(pipe_parts) == 1:
-            return self._parse_single_command(command.strip())
+    def parse_tokens(self, stages: List[List[str]]) -> ASTNode:
+        """Build an AST from stage tokens produced by tokenize_pipeline"""
+        stages = [tokens for tokens in stages if tokens]
+        if not stages:
+            return ASTNode(NodeType.COMMAND, "", [])
+        if len(stages) == 1:
+            return self._build_command(stages[0])
 
         # Handle piped commands
         root = ASTNode(NodeType.PIPE, "|", [])
-        for part in pipe_parts:
-            if part.strip():
-                root.children.append(self._parse_single_command(part.strip()))
+        for tokens in stages:
+            root.children.append(self._build_command(tokens))
 
         return root
 
-    def _parse_single_command(self, command: str) -> ASTNode:
-        """Parse a single command (no pipes)"""
+    def _build_command(self, tokens: List[str]) -> ASTNode:
+        """Build the AST node for a single command (no pipes)"""
         # Handle variable substitutions
-        command = self._expand_variables(command)
-
-        # Parse with shlex for proper tokenization
-        try:
-            tokens = shlex.split(command)
-        except ValueError:
-            # Fallback for malformed commands
-            tokens = command.split()
-
-        if not tokens:
-            return ASTNode(NodeType.COMMAND, "", [])
+        tokens = [self._expand_variables(token) for token in tokens]
 
         cmd_node = ASTNode(NodeType.COMMAND, tokens[0], [])
 
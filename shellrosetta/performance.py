@@ -12,6 +12,7 @@ try:
 except ImportError:
     psutil = None
 
+from .cache import LRUCache
 # Import core functions for benchmarking
 from .core import lnx2ps
 
@@ -22,9 +23,7 @@ class PerformanceMonitor:
     def __init__(self):
         self.metrics: Dict[str, List[float]] = defaultdict(list)
         self.call_counts: Dict[str, int] = defaultdict(int)
-        self.memory_cache: Dict[str, Any] = {}
-        self.cache_hits = 0
-        self.cache_misses = 0
+        self.memory_cache = LRUCache(maxsize=1024)
 
     def time_function(self, func_name: str):
         """Decorator to time function execution."""
@@ -57,17 +56,13 @@ class PerformanceMonitor:
                 }
 
         # Add cache statistics
-        total_cache_requests = self.cache_hits + self.cache_misses
-        cache_hit_rate = (
-            self.cache_hits / total_cache_requests * 100
-            if total_cache_requests > 0 else 0
-        )
-
+        cache_stats = self.memory_cache.get_stats()
         stats['cache'] = {
-            'hits': self.cache_hits,
-            'misses': self.cache_misses,
-            'hit_rate': cache_hit_rate,
-            'total_cached_items': len(self.memory_cache)
+            'hits': cache_stats['hits'],
+            'misses': cache_stats['misses'],
+            'evictions': cache_stats['evictions'],
+            'hit_rate': cache_stats['hit_rate'] * 100,
+            'total_cached_items': cache_stats['size']
         }
 
         return stats
@@ -75,21 +70,15 @@ class PerformanceMonitor:
     def clear_cache(self):
         """Clear the memory cache."""
         self.memory_cache.clear()
-        self.cache_hits = 0
-        self.cache_misses = 0
+        self.memory_cache.reset_stats()
 
     def cache_get(self, key: str) -> Optional[Any]:
         """Get item from cache."""
-        if key in self.memory_cache:
-            self.cache_hits += 1
-            return self.memory_cache[key]
-        else:
-            self.cache_misses += 1
-            return None
-
-    def cache_set(self, key: str, value: Any):
+        return self.memory_cache.get(key)
+
+    def cache_set(self, key: str, value: Any, ttl: Optional[float] = None):
         """Set item in cache."""
-        self.memory_cache[key] = value
+        self.memory_cache.set(key, value, ttl=ttl)
 
 
 def get_system_metrics() -> Dict[str, Any]:
@@ -125,7 +114,7 @@ def get_system_metrics() -> Dict[str, Any]:
         }
 
 
-def get_memory_cache() -> Dict[str, Any]:
+def get_memory_cache() -> LRUCache:
     """Get memory cache for testing."""
     return performance_monitor.memory_cache
 
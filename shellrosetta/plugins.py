@@ -4,6 +4,7 @@
 import os
 import sys
 import importlib.util
+import threading
 from pathlib import Path
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any, Callable
@@ -46,48 +47,73 @@ class CommandPlugin(ABC):
 
 
 class PluginManager:
-    """Manages loading and using command translation plugins"""
+    """
+    Manages loading and using command translation plugins.
+
+    plugins is an immutable snapshot: lookups read it without locking, while
+    loads and installs are serialized and swap in a new dict when done.
+    """
 
     def __init__(self):
         self.plugins: Dict[str, CommandPlugin] = {}
+        self._change_listeners: List[Callable[[], None]] = []
+        self._write_lock = threading.RLock()
         self.plugin_dir = Path.home() / ".shellrosetta" / "plugins"
         self.plugin_dir.mkdir(parents=True, exist_ok=True)
         self.load_plugins()
 
     def load_plugins(self) -> None:
         """Load all available plugins"""
-        # Load built-in plugins
-        self._load_builtin_plugins()
+        with self._write_lock:
+            # Load built-in plugins
+            self._load_builtin_plugins()
+
+            # Load user plugins
+            self._load_user_plugins()
 
-        # Load user plugins
-        self._load_user_plugins()
+    def add_change_listener(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked whenever the set of plugins changes"""
+        self._change_listeners.append(callback)
+
+    def _notify_change(self) -> None:
+        """Tell listeners that plugin translations may have changed"""
+        for callback in self._change_listeners:
+            callback()
 
     def _load_builtin_plugins(self) -> None:
         """Load built-in plugins"""
         # Create plugin instances directly instead of importing modules
-        self.plugins["docker"] = docker_plugin
-        self.plugins["kubernetes"] = kubernetes_plugin
-        self.plugins["aws"] = aws_plugin
-        self.plugins["git"] = git_plugin
+        with self._write_lock:
+            plugins = dict(self.plugins)
+            plugins["docker"] = docker_plugin
+            plugins["kubernetes"] = kubernetes_plugin
+            plugins["aws"] = aws_plugin
+            plugins["git"] = git_plugin
+            self.plugins = plugins
 
     def _load_user_plugins(self) -> None:
         """Load user-installed plugins"""
-        for plugin_file in self.plugin_dir.glob("*.py"):
-            try:
-                spec = importlib.util.spec_from_file_location(
-                    plugin_file.stem, plugin_file
-                )
-                if spec is None:
-                    continue
-                module = importlib.util.module_from_spec(spec)
-                if spec.loader is not None:
-                    spec.loader.exec_module(module)
-
-                if hasattr(module, "plugin"):
-                    plugin = module.plugin
-                    self.plugins[plugin.get_name()] = plugin
-            except Exception as e:
-                print(f"Failed to load plugin {plugin_file}: {e}")
+        with self._write_lock:
+            plugins = dict(self.plugins)
+            for plugin_file in self.plugin_dir.glob("*.py"):
+                try:
+                    spec = importlib.util.spec_from_file_location(
+                        plugin_file.stem, plugin_file
+                    )
+                    if spec is None:
+                        continue
+                    module = importlib.util.module_from_spec(spec)
+                    if spec.loader is not None:
+                        spec.loader.exec_module(module)
+
+                    if hasattr(module, "plugin"):
+                        plugin = module.plugin
+                        plugins[plugin.get_name()] = plugin
+                except Exception as e:
+                    print(f"Failed to load plugin {plugin_file}: {e}")
+            self.plugins = plugins
+
+        self._notify_change()
 
     def get_plugin_for_command(
         self, command: str, direction: str
@@ -118,12 +144,13 @@ class PluginManager:
             if not plugin_file.exists():
                 return False
 
-            # Copy to plugins directory
-            target_path = self.plugin_dir / plugin_file.name
-            shutil.copy2(plugin_file, target_path)
+            with self._write_lock:
+                # Copy to plugins directory
+                target_path = self.plugin_dir / plugin_file.name
+                shutil.copy2(plugin_file, target_path)
 
-            # Reload plugins
-            self._load_user_plugins()
+                # Reload plugins
+                self._load_user_plugins()
             return True
         except Exception as e:
             print(f"Failed to install plugin: {e}")
@@ -230,5 +257,24 @@ kubernetes_plugin = KubernetesPlugin()
 aws_plugin = AWSPlugin()
 git_plugin = GitPlugin()
 
-# Global plugin manager instance
-plugin_manager = PluginManager()
+# Global plugin manager instance, created on first use so that importing this
+# module does not run user plugin files
+_plugin_manager: Optional[PluginManager] = None
+_instance_lock = threading.Lock()
+
+
+def get_plugin_manager() -> PluginManager:
+    """Return the global plugin manager, loading plugins on first use"""
+    global _plugin_manager
+    if _plugin_manager is None:
+        with _instance_lock:
+            if _plugin_manager is None:
+                _plugin_manager = PluginManager()
+    return _plugin_manager
+
+
+def __getattr__(name: str) -> Any:
+    # Keep "from shellrosetta.plugins import plugin_manager" working
+    if name == "plugin_manager":
+        return get_plugin_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
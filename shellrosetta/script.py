@@ -0,0 +1,129 @@
+# shellrosetta/script.py
+
+"""
+Streaming translation of whole shell scripts.
+
+Scripts are read lazily line by line, so memory use stays constant no
+matter how long the script is. Line continuations are joined into one
+logical command, comments and blank lines pass through unchanged, and each
+result records the source lines it came from.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from .core import lnx2ps, ps2lnx
+
+# Line continuation character per source language
+CONTINUATIONS = {"lnx2ps": "\\", "ps2lnx": "`"}
+
+# Script file suffixes and the direction they translate in
+SUFFIX_DIRECTIONS = {
+    ".sh": "lnx2ps",
+    ".bash": "lnx2ps",
+    ".zsh": "lnx2ps",
+    ".ps1": "ps2lnx",
+    ".psm1": "ps2lnx",
+}
+
+
+@dataclass
+class ScriptLine:
+    """One translated logical line of a script"""
+
+    start_line: int
+    end_line: int
+    source: str
+    translation: str
+    translated: bool = True
+
+
+def _is_continued(line: str, marker: str) -> bool:
+    """True if the line ends with an unescaped continuation marker"""
+    stripped = line.rstrip(" \t")
+    if not stripped.endswith(marker):
+        return False
+    run = len(stripped) - len(stripped.rstrip(marker))
+    return run % 2 == 1
+
+
+def direction_for_path(path: str) -> Optional[str]:
+    """Guess the translation direction from a script's file suffix"""
+    lowered = path.lower()
+    for suffix, direction in SUFFIX_DIRECTIONS.items():
+        if lowered.endswith(suffix):
+            return direction
+    return None
+
+
+def translate_script(
+    file_obj: Iterable[str],
+    direction: str,
+    use_ml: bool = True,
+    use_plugins: bool = True,
+) -> Iterator[ScriptLine]:
+    """
+    Lazily translate a script, yielding one ScriptLine per logical line.
+
+    Args:
+        file_obj: Any iterable of lines, such as an open text file
+        direction: "lnx2ps" for shell scripts or "ps2lnx" for PowerShell scripts
+        use_ml: Whether to use machine learning suggestions
+        use_plugins: Whether to use plugin translations
+
+    Yields:
+        ScriptLine records in source order. Comments and blank lines are passed
+        through with translated=False.
+    """
+    if direction not in CONTINUATIONS:
+        raise ValueError(f"Unknown direction: {direction}")
+    translate = lnx2ps if direction == "lnx2ps" else ps2lnx
+    marker = CONTINUATIONS[direction]
+
+    pending: List[str] = []
+    start = 0
+    in_block_comment = False
+
+    def flush(end: int) -> ScriptLine:
+        first = pending[0]
+        indent = first[: len(first) - len(first.lstrip())]
+        parts = []
+        for part in pending:
+            part = part.strip()
+            if _is_continued(part, marker):
+                part = part[: -len(marker)].rstrip()
+            if part:
+                parts.append(part)
+        translation = translate(" ".join(parts), use_ml, use_plugins)
+        return ScriptLine(start, end, "\n".join(pending), indent + translation)
+
+    lineno = 0
+    for lineno, raw in enumerate(file_obj, 1):
+        line = raw.rstrip("\r\n")
+        stripped = line.strip()
+
+        if not pending:
+            # PowerShell block comments: <# ... #>
+            if in_block_comment:
+                in_block_comment = "#>" not in stripped
+                yield ScriptLine(lineno, lineno, line, line, translated=False)
+                continue
+            if direction == "ps2lnx" and stripped.startswith("<#"):
+                in_block_comment = "#>" not in stripped[2:]
+                yield ScriptLine(lineno, lineno, line, line, translated=False)
+                continue
+            if not stripped or stripped.startswith("#"):
+                yield ScriptLine(lineno, lineno, line, line, translated=False)
+                continue
+            start = lineno
+
+        pending.append(line)
+        if _is_continued(line, marker):
+            continue
+
+        yield flush(lineno)
+        pending = []
+
+    # A trailing continuation at end of file still yields its command
+    if pending:
+        yield flush(lineno)
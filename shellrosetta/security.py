@@ -94,14 +94,17 @@ class CommandValidator:
 
     def validate_command(self, command: str) -> List[SecurityViolation]:
         """Validate a command for security issues."""
-        self.violations = []
+        # Violations are collected locally and published in one assignment,
+        # so concurrent validations never interleave their results
+        violations: List[SecurityViolation] = []
+        security_level = self.security_level
         command_lower = command.lower().strip()
 
         # Check for dangerous patterns
-        patterns = self.dangerous_patterns.get(self.security_level, [])
+        patterns = self.dangerous_patterns.get(security_level, [])
         for pattern in patterns:
             if re.search(pattern, command_lower):
-                self.violations.append(SecurityViolation(
+                violations.append(SecurityViolation(
                     command=command,
                     violation_type="dangerous_pattern",
                     description=f"Command matches dangerous pattern: {pattern}",
@@ -109,10 +112,10 @@ class CommandValidator:
                 ))
 
         # For paranoid mode, only allow specific commands
-        if self.security_level == SecurityLevel.PARANOID:
+        if security_level == SecurityLevel.PARANOID:
             first_word = command_lower.split()[0] if command_lower.split() else ""
             if first_word not in self.allowed_commands:
-                self.violations.append(SecurityViolation(
+                violations.append(SecurityViolation(
                     command=command,
                     violation_type="unauthorized_command",
                     description=f"Command '{first_word}' not allowed in paranoid mode",
@@ -132,7 +135,7 @@ class CommandValidator:
 
         for pattern in injection_patterns:
             if re.search(pattern, command):
-                self.violations.append(SecurityViolation(
+                violations.append(SecurityViolation(
                     command=command,
                     violation_type="command_injection",
                     description=f"Potential command injection: {pattern}",
@@ -140,7 +143,7 @@ class CommandValidator:
                 ))
 
         # Check for file system access patterns
-        if self.security_level in [SecurityLevel.STRICT, SecurityLevel.PARANOID]:
+        if security_level in [SecurityLevel.STRICT, SecurityLevel.PARANOID]:
             fs_patterns = [
                 r'/etc/',  # system config
                 r'/var/',  # variable data
@@ -152,14 +155,15 @@ class CommandValidator:
 
             for pattern in fs_patterns:
                 if re.search(pattern, command):
-                    self.violations.append(SecurityViolation(
+                    violations.append(SecurityViolation(
                         command=command,
                         violation_type="system_access",
                         description=f"Access to system directory: {pattern}",
                         severity="MEDIUM"
                     ))
 
-        return self.violations
+        self.violations = violations
+        return violations
 
     def is_safe(self, command: str) -> bool:
         """Check if a command is safe to execute."""
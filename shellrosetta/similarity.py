@@ -0,0 +1,361 @@
+# shellrosetta/similarity.py
+
+"""
+Candidate generation for similar-command search.
+
+The ML engine treats two commands as similar when the Jaccard similarity of
+their word sets is above a threshold. Instead of scoring every learned
+command, an index returns the few commands that can pass, and only those
+are scored.
+
+InvertedIndex is exact: it returns every command that can reach the
+threshold. MinHashLSH is approximate: it returns commands whose MinHash
+signatures collide in at least one band, trading a little recall for a
+candidate set that no longer grows with how common the query's words are.
+WordMatrixIndex is exact and scores every command at once: with NumPy, a
+query or a batch of queries is one sparse product with a binary command-word
+matrix, which counts shared words and so gives the same Jaccard scores.
+
+Every index answers similar() (and similar_many() for a batch) with the
+commands whose similarity is above the threshold.
+"""
+
+import random
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+np: Any
+try:
+    import numpy
+    np = numpy
+except ImportError:
+    np = None
+
+# Mersenne prime for the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+
+def command_words(command: str) -> Set[str]:
+    """The word set that similarity is computed on"""
+    return set(command.split())
+
+
+def _above_threshold(words: Set[str], commands: Iterable[str], threshold: float) -> Set[str]:
+    """Commands whose Jaccard similarity with words is above threshold"""
+    matches = set()
+    for command in commands:
+        other = command_words(command)
+        shared = len(words & other)
+        if shared and shared / (len(words) + len(other) - shared) > threshold:
+            matches.add(command)
+    return matches
+
+
+class InvertedIndex:
+    """Word to commands postings, per direction"""
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}
+
+    def add(self, direction: str, command: str) -> None:
+        postings = self._postings.setdefault(direction, {})
+        for word in command_words(command):
+            postings.setdefault(word, set()).add(command)
+
+    def remove(self, direction: str, command: str) -> None:
+        postings = self._postings.get(direction, {})
+        for word in command_words(command):
+            posting = postings.get(word)
+            if posting is not None:
+                posting.discard(command)
+                if not posting:
+                    del postings[word]
+
+    def candidates(self, direction: str, words: Set[str]) -> Set[str]:
+        """
+        Commands that may have Jaccard similarity above the threshold.
+
+        A match must share more than threshold * len(words) of the words, so
+        it contains at least one of the rarest len(words) - that + 1 words:
+        only their postings are read, and commands sharing fewer words than
+        that are dropped.
+        """
+        postings = self._postings.get(direction)
+        if not postings or not words:
+            return set()
+        min_overlap = int(self.threshold * len(words)) + 1
+        rarest = sorted(words, key=lambda word: len(postings.get(word, ())))
+        found: Set[str] = set()
+        for word in rarest[: len(words) - min_overlap + 1]:
+            found.update(postings.get(word, ()))
+        if min_overlap > 1:
+            # Drop commands that share too few words, without splitting them
+            posting_sets = [postings.get(word, ()) for word in rarest]
+            found = {
+                command for command in found
+                if sum(command in posting for posting in posting_sets) >= min_overlap
+            }
+        return found
+
+    def similar(self, direction: str, words: Set[str]) -> Set[str]:
+        return _above_threshold(words, self.candidates(direction, words), self.threshold)
+
+    def similar_many(self, direction: str, queries: List[Set[str]]) -> List[Set[str]]:
+        return [self.similar(direction, words) for words in queries]
+
+
+class MinHashLSH:
+    """
+    Banded MinHash index, per direction.
+
+    With the defaults (16 bands of 2 rows) a pair with Jaccard similarity
+    0.5 collides in some band with probability about 0.99.
+    """
+
+    def __init__(
+        self, num_perm: int = 32, bands: int = 16, seed: int = 1, threshold: float = 0.5
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._perms: List[Tuple[int, int]] = [
+            (rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)
+        ]
+        self._buckets: Dict[str, Dict[int, Set[str]]] = {}
+
+    def signature(self, words: Iterable[str]) -> List[int]:
+        """MinHash signature of a word set"""
+        hashes = [hash(word) & 0xFFFFFFFFFFFFFFFF for word in words]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, words: Iterable[str]) -> List[int]:
+        signature = self.signature(words)
+        rows = self.rows
+        return [
+            hash((band, *signature[band * rows:(band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def add(self, direction: str, command: str) -> None:
+        words = command_words(command)
+        if not words:
+            return
+        buckets = self._buckets.setdefault(direction, {})
+        for key in self._band_keys(words):
+            buckets.setdefault(key, set()).add(command)
+
+    def remove(self, direction: str, command: str) -> None:
+        words = command_words(command)
+        buckets = self._buckets.get(direction)
+        if not buckets or not words:
+            return
+        for key in self._band_keys(words):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(command)
+                if not bucket:
+                    del buckets[key]
+
+    def candidates(self, direction: str, words: Set[str]) -> Set[str]:
+        """Commands sharing at least one band with the query"""
+        buckets = self._buckets.get(direction)
+        if not buckets or not words:
+            return set()
+        found: Set[str] = set()
+        for key in self._band_keys(words):
+            found.update(buckets.get(key, ()))
+        return found
+
+    def similar(self, direction: str, words: Set[str]) -> Set[str]:
+        return _above_threshold(words, self.candidates(direction, words), self.threshold)
+
+    def similar_many(self, direction: str, queries: List[Set[str]]) -> List[Set[str]]:
+        return [self.similar(direction, words) for words in queries]
+
+
+class _WordMatrix:
+    """
+    Binary command-by-word matrix for one direction, stored by column.
+
+    Rows are appended and never reused; a removed command leaves an empty
+    row until the matrix is rebuilt. Columns only grow in place, in row
+    order; a removal replaces the column list, so a column array is current
+    while its list is the same object with the same length.
+    """
+
+    def __init__(self, use_numpy: bool):
+        self.commands: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.columns: Dict[str, List[int]] = {}
+        self.use_numpy = use_numpy
+        # Word count of each row; with NumPy, an array grown by doubling
+        self.lengths: Any = np.zeros(64, dtype=np.int64) if use_numpy else []
+        self.size = 0
+        # Column arrays, tagged with the column list and length they were built from
+        self._arrays: Dict[str, Tuple[List[int], int, Any]] = {}
+
+    def add(self, command: str, words: Set[str]) -> None:
+        row = self.size
+        if self.use_numpy:
+            if row == len(self.lengths):
+                lengths = np.zeros(2 * row, dtype=np.int64)
+                lengths[:row] = self.lengths
+                self.lengths = lengths
+            self.lengths[row] = len(words)
+        else:
+            self.lengths.append(len(words))
+        self.commands.append(command)
+        self.rows[command] = row
+        self.size = row + 1
+        for word in words:
+            self.columns.setdefault(word, []).append(row)
+
+    def remove(self, command: str, words: Set[str]) -> None:
+        row = self.rows.pop(command)
+        self.commands[row] = None
+        for word in words:
+            column = [r for r in self.columns[word] if r != row]
+            if column:
+                self.columns[word] = column
+            else:
+                del self.columns[word]
+                self._arrays.pop(word, None)
+
+    def column_array(self, word: str) -> Any:
+        """The rows containing word, as an array"""
+        column = self.columns.get(word)
+        if column is None:
+            return None
+        length = len(column)
+        cached = self._arrays.get(word)
+        if cached is not None and cached[0] is column:
+            if cached[1] == length:
+                return cached[2]
+            # Grown since: convert only the new rows
+            array = np.concatenate((cached[2], np.array(column[cached[1]:length], dtype=np.int64)))
+        else:
+            array = np.array(column[:length], dtype=np.int64)
+        self._arrays[word] = (column, length, array)
+        return array
+
+
+class WordMatrixIndex:
+    """
+    Scores a query against every command with one sparse product.
+
+    The matrix is binary (a word is in a command or not), not weighted like
+    TF-IDF, so the scores are exactly the Jaccard similarity the other
+    indexes use.
+
+    The overlap of a query with each command is the product of the binary
+    command-by-word matrix with the query's word vector; Jaccard similarity
+    follows from the overlaps and the row lengths. With NumPy the product is
+    computed from the query words' column arrays, and similar_many() scores
+    a whole batch in one. Without NumPy (or with use_numpy=False) the same
+    overlaps are counted in a dict.
+    """
+
+    def __init__(self, threshold: float = 0.5, use_numpy: Optional[bool] = None):
+        if use_numpy and np is None:
+            raise ValueError("use_numpy requires NumPy")
+        self.threshold = threshold
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self._matrices: Dict[str, _WordMatrix] = {}
+
+    def add(self, direction: str, command: str) -> None:
+        matrix = self._matrices.get(direction)
+        if matrix is None:
+            matrix = self._matrices[direction] = _WordMatrix(self.use_numpy)
+        if command not in matrix.rows:
+            matrix.add(command, command_words(command))
+
+    def remove(self, direction: str, command: str) -> None:
+        matrix = self._matrices.get(direction)
+        if matrix is None or command not in matrix.rows:
+            return
+        matrix.remove(command, command_words(command))
+        if len(matrix.rows) < matrix.size // 2:
+            # Mostly empty rows: rebuild from the remaining commands
+            rebuilt = _WordMatrix(self.use_numpy)
+            for other in matrix.commands:
+                if other is not None:
+                    rebuilt.add(other, command_words(other))
+            self._matrices[direction] = rebuilt
+
+    def candidates(self, direction: str, words: Set[str]) -> Set[str]:
+        """Every command that reaches the threshold (scores are exact)"""
+        return self.similar(direction, words)
+
+    def similar(self, direction: str, words: Set[str]) -> Set[str]:
+        return self.similar_many(direction, [words])[0]
+
+    def similar_many(self, direction: str, queries: List[Set[str]]) -> List[Set[str]]:
+        matrix = self._matrices.get(direction)
+        if matrix is None:
+            return [set() for _ in queries]
+        if not self.use_numpy:
+            return [self._similar_python(matrix, words) for words in queries]
+        return self._similar_numpy(matrix, queries)
+
+    def _similar_numpy(self, matrix: _WordMatrix, queries: List[Set[str]]) -> List[Set[str]]:
+        """
+        Score a batch of queries at once: the query-by-row overlap matrix is
+        the counts of (query, row) cells across the queries' columns.
+        """
+        # Rows added after this point are not scored by this call
+        lengths = matrix.lengths[: matrix.size]
+        rows = len(lengths)
+        parts = []
+        for i, words in enumerate(queries):
+            for word in words:
+                column = matrix.column_array(word)
+                if column is None or not column.size:
+                    continue
+                if column[-1] >= rows:
+                    column = column[column < rows]
+                parts.append(column + i * rows if i else column)
+        if not parts:
+            return [set() for _ in queries]
+
+        # Non-zero overlaps only, so memory follows the columns read
+        cells, shared = np.unique(np.concatenate(parts), return_counts=True)
+        query_of, row_of = np.divmod(cells, rows)
+        query_lengths = np.array([len(words) for words in queries], dtype=np.int64)
+        scores = shared / (query_lengths[query_of] + lengths[row_of] - shared)
+        hits = scores > self.threshold
+
+        commands = matrix.commands
+        results: List[Set[str]] = [set() for _ in queries]
+        for query, row in zip(query_of[hits].tolist(), row_of[hits].tolist()):
+            command = commands[row]
+            if command is not None:  # removed while this call read its columns
+                results[query].add(command)
+        return results
+
+    def _similar_python(self, matrix: _WordMatrix, words: Set[str]) -> Set[str]:
+        overlaps: Dict[int, int] = {}
+        for word in words:
+            for row in matrix.columns.get(word, ()):
+                overlaps[row] = overlaps.get(row, 0) + 1
+        lengths = matrix.lengths
+        threshold = self.threshold
+        query_length = len(words)
+        matches: Set[str] = set()
+        for row, shared in overlaps.items():
+            command = matrix.commands[row]
+            if command is not None and shared / (query_length + lengths[row] - shared) > threshold:
+                matches.add(command)
+        return matches
+
+
+SIMILARITY_INDEXES = {
+    "inverted": InvertedIndex,
+    "minhash": MinHashLSH,
+    "matrix": WordMatrixIndex,
+}
+
+# The matrix index's pure-Python fallback is slower than the inverted index
+DEFAULT_SIMILARITY_INDEX = "matrix" if np is not None else "inverted"
@@ -4,7 +4,9 @@ import shutil
 import unittest
 import tempfile
 import json
-from shellrosetta.parser import CommandParser, ASTNode, NodeType
+import random
+import shlex
+from shellrosetta.parser import CommandParser, ASTNode, NodeType, split_words
 from shellrosetta.plugins import CommandPlugin, PluginManager
 from shellrosetta.ml_engine import MLEngine, CommandPattern
 from shellrosetta.core import lnx2ps, ps2lnx
@@ -70,6 +72,57 @@ class TestCommandParser(unittest.TestCase):
         self.assertEqual(ast.node_type, NodeType.COMMAND)
         self.assertEqual(ast.value, "")
 
+    def test_tokenize_pipeline(self):
+        """Test tokenizing every stage of a pipeline"""
+        stages = self.parser.tokenize_pipeline("ls -la 'my dir' | grep error |  | wc -l")
+        self.assertEqual(stages, [["ls", "-la", "my dir"], ["grep", "error"], ["wc", "-l"]])
+
+    def test_parse_tokens_matches_parse(self):
+        """Test building the AST from existing tokens"""
+        command = "ls -la | grep $PATTERN"
+        self.assertEqual(
+            self.parser.parse_tokens(self.parser.tokenize_pipeline(command)),
+            self.parser.parse(command),
+        )
+        ast = self.parser.parse(command)
+        self.assertEqual(ast.children[1].children[0].value, "${PATTERN}")
+
+    def test_malformed_quotes(self):
+        """Test tokenizing falls back to whitespace splitting"""
+        self.assertEqual(self.parser.tokenize("echo 'oops"), ["echo", "'oops"])
+
+
+class TestSplitWords(unittest.TestCase):
+    """Differential test of the fast-path lexer against shlex"""
+
+    ALPHABET = list("abcxyz019-_./*?[]{}~$=:,@%+") + [
+        " ", "  ", "\t", "\n", "\r", "|", "é", "\x0b"
+    ]
+    SPECIAL = ["'", '"', "\\", "\\ ", "'a b'", '"a b"', '"$X"']
+
+    def shlex_result(self, text):
+        try:
+            return shlex.split(text)
+        except ValueError as e:
+            return ("error", str(e))
+
+    def split_words_result(self, text):
+        try:
+            return split_words(text)
+        except ValueError as e:
+            return ("error", str(e))
+
+    def test_matches_shlex_on_generated_corpus(self):
+        rng = random.Random(20240601)
+        for _ in range(20000):
+            pieces = self.ALPHABET + (self.SPECIAL if rng.random() < 0.3 else [])
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+            self.assertEqual(self.split_words_result(text), self.shlex_result(text), repr(text))
+
+    def test_common_commands(self):
+        for text in ["ls -la /tmp", "  grep  -ri\terror  ", "", "find . -name *.py", "echo $HOME"]:
+            self.assertEqual(split_words(text), shlex.split(text))
+
 
 class TestPluginSystem(unittest.TestCase):
     """Test the plugin system"""
@@ -158,6 +211,23 @@ class TestMLEngine(unittest.TestCase):
         self.assertEqual(pattern.success_count, 1)
         self.assertEqual(pattern.failure_count, 0)
 
+    def test_learn_patterns_batch(self):
+        """Test learning a batch of patterns"""
+        self.ml_engine.patterns.clear()
+
+        self.ml_engine.learn_patterns(
+            [
+                ("ls -la", "Get-ChildItem -Force | Format-List", "lnx2ps", True),
+                ("ls -la", "Get-ChildItem -Force | Format-List", "lnx2ps", True),
+                ("Get-Process", "ps aux", "ps2lnx", False),
+            ]
+        )
+
+        self.assertEqual(self.ml_engine.patterns["lnx2ps:ls -la"].success_count, 2)
+        self.assertEqual(self.ml_engine.patterns["ps2lnx:Get-Process"].failure_count, 1)
+        self.ml_engine.flush()
+        self.assertTrue(self.ml_engine.journal_file.exists())
+
     def test_get_best_translation(self):
         """Test getting the best learned translation"""
         # Learn a pattern
@@ -242,6 +312,11 @@ class TestEnhancedCore(unittest.TestCase):
         result = lnx2ps("ls -la", use_ml=False, use_plugins=False)
         self.assertIn("Get-ChildItem", result)
 
+    def test_unbalanced_quotes(self):
+        """Test translation of a command with unbalanced quotes"""
+        result = lnx2ps("grep 'oops", use_ml=False, use_plugins=False)
+        self.assertIn("Select-String", result)
+
     def test_ps2lnx_without_ml(self):
         """Test PowerShell to Linux translation with ML disabled"""
         result = ps2lnx("Get-ChildItem -Force", use_ml=False, use_plugins=False)
@@ -0,0 +1,119 @@
+# tests/test_aio.py
+
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from shellrosetta import aio, core
+from shellrosetta.core import lnx2ps, ps2lnx, clear_translation_cache
+
+
+class TestAsyncTranslation(unittest.TestCase):
+    """Test the asyncio translation API"""
+
+    def setUp(self):
+        clear_translation_cache()
+
+    def tearDown(self):
+        aio.configure_executor()
+
+    def test_results_match_sync(self):
+        async def run():
+            return (
+                await aio.alnx2ps("ls -la | grep error", use_ml=False, use_plugins=False),
+                await aio.aps2lnx("Get-ChildItem -Force", use_ml=False, use_plugins=False),
+                await aio.alnx2ps_many(["ls", "rm -rf x", "ls"], use_ml=False, use_plugins=False),
+                await aio.aps2lnx_many(["Get-Process"], use_ml=False, use_plugins=False),
+            )
+
+        single, ps_single, many, ps_many = asyncio.run(run())
+        self.assertEqual(single, lnx2ps("ls -la | grep error", use_ml=False, use_plugins=False))
+        self.assertEqual(ps_single, ps2lnx("Get-ChildItem -Force", use_ml=False, use_plugins=False))
+        expected = [lnx2ps(c, use_ml=False, use_plugins=False) for c in ["ls", "rm -rf x", "ls"]]
+        self.assertEqual(many, expected)
+        self.assertEqual(ps_many, ["ps aux"])
+
+    def test_persistence_runs_off_the_loop(self):
+        threads = []
+        ml = core._get_ml_engine()
+
+        async def run():
+            loop_thread = threading.current_thread()
+            with mock.patch.object(
+                ml,
+                "_record_patterns",
+                side_effect=lambda events: threads.append(threading.current_thread()),
+            ):
+                await aio.alnx2ps_many([f"aiotest{i}" for i in range(5)], use_plugins=False)
+            return loop_thread
+
+        loop_thread = asyncio.run(run())
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], loop_thread)
+
+    def test_loop_stays_responsive(self):
+        def slow(*args, **kwargs):
+            time.sleep(0.2)
+            return "done"
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            with mock.patch.object(core, "lnx2ps", side_effect=slow):
+                result = await aio.alnx2ps("aiotest-slow", pure=False)
+            task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(run())
+        self.assertEqual(result, "done")
+        self.assertGreater(ticks, 5)
+
+    def test_bounded_concurrency(self):
+        aio.configure_executor(max_workers=2)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def tracked(*args, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return ""
+
+        async def run():
+            with mock.patch.object(core, "lnx2ps", side_effect=tracked):
+                await asyncio.gather(*(aio.alnx2ps(f"c{i}", pure=False) for i in range(8)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+
+    def test_pure_runs_inline(self):
+        async def run():
+            with mock.patch.object(aio, "get_executor") as get_executor:
+                result = await aio.alnx2ps("ls -la", pure=True)
+            get_executor.assert_not_called()
+            return result
+
+        self.assertEqual(asyncio.run(run()), lnx2ps("ls -la", pure=True))
+
+    def test_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            aio.configure_executor(max_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
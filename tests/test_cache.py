@@ -0,0 +1,175 @@
+# tests/test_cache.py
+
+
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from shellrosetta import core
+from shellrosetta.cache import LRUCache
+from shellrosetta.core import (
+    lnx2ps,
+    lnx2ps_many,
+    ps2lnx,
+    clear_translation_cache,
+    configure_stage_cache,
+    get_translation_stats,
+)
+from shellrosetta.ml_engine import MLEngine
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the bounded LRU cache"""
+
+    def test_get_and_set(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("missing"))
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(maxsize=4, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+
+    def test_resize(self):
+        cache = LRUCache(maxsize=4)
+        for i in range(4):
+            cache.set(i, i)
+        cache.resize(2)
+        self.assertEqual(len(cache), 2)
+        self.assertIn(3, cache)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(maxsize=0)
+
+
+class TestTranslationCache(unittest.TestCase):
+    """Test the translation cache in front of lnx2ps/ps2lnx"""
+
+    def setUp(self):
+        clear_translation_cache()
+
+    def test_repeated_command_hits_cache(self):
+        before = get_translation_stats()["cache_stats"]["hits"]
+        first = lnx2ps("ls -la | grep cached", use_ml=False, use_plugins=False)
+        second = lnx2ps("ls -la | grep cached", use_ml=False, use_plugins=False)
+        self.assertEqual(first, second)
+        self.assertEqual(get_translation_stats()["cache_stats"]["hits"], before + 1)
+
+    def test_key_includes_direction_and_options(self):
+        lnx2ps("ls", use_ml=False, use_plugins=False)
+        ps2lnx("ls", use_ml=False, use_plugins=False)
+        lnx2ps("ls", use_ml=False, use_plugins=True)
+        self.assertEqual(get_translation_stats()["cache_size"], 3)
+
+    def test_ml_change_invalidates_entry(self):
+        command = "cachetest-ml-command"
+        lnx2ps(command, use_ml=True, use_plugins=False)
+        self.assertIn(("lnx2ps", command, True, False), core._translation_cache)
+        core.ml_engine.learn_pattern(command, "Invoke-CacheTest", "lnx2ps", success=True)
+        self.assertNotIn(("lnx2ps", command, True, False), core._translation_cache)
+
+    def bounded_engine(self, max_patterns):
+        """Install a private, bounded ML engine behind lnx2ps for one test"""
+        home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, home, ignore_errors=True)
+        with mock.patch.object(Path, "home", return_value=Path(home)):
+            engine = MLEngine(max_patterns=max_patterns)
+        self.addCleanup(engine.close)
+        engine.add_change_listener(core._on_patterns_changed)
+        patcher = mock.patch.object(core, "_ml_engine", engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return engine
+
+    def test_cache_hits_count_towards_eviction(self):
+        engine = self.bounded_engine(max_patterns=3)
+        for _ in range(100):
+            lnx2ps("ls -la", use_ml=True, use_plugins=False)
+        lnx2ps_many(["ls -la", "pwd"], use_ml=True, use_plugins=False)
+        for command in ["whoami", "date"]:
+            lnx2ps(command, use_ml=True, use_plugins=False)
+        self.assertIn("lnx2ps:ls -la", engine.patterns)
+        self.assertEqual(engine.patterns["lnx2ps:ls -la"].success_count, 101)
+        self.assertIn(("lnx2ps", "ls -la", True, False), core._translation_cache)
+
+    def test_plugin_change_clears_cache(self):
+        lnx2ps("ls", use_ml=False, use_plugins=True)
+        core.plugin_manager.load_plugins()
+        self.assertEqual(get_translation_stats()["cache_size"], 0)
+
+    def test_reload_mappings_clears_cache(self):
+        lnx2ps("ls", use_ml=False, use_plugins=False)
+        core.reload_mappings()
+        self.assertEqual(get_translation_stats()["cache_size"], 0)
+
+
+class TestStageCache(unittest.TestCase):
+    """Test the pipeline stage cache under the whole-command cache"""
+
+    def setUp(self):
+        clear_translation_cache()
+
+    def tearDown(self):
+        configure_stage_cache(maxsize=8192)
+
+    def test_new_pipeline_of_known_stages(self):
+        lnx2ps("ls -la | grep a", use_ml=False, use_plugins=False)
+        lnx2ps("ps aux | wc -l", use_ml=False, use_plugins=False)
+        engine = core.get_engine()
+        with mock.patch.object(
+            engine, "translate_linux_stage", wraps=engine.translate_linux_stage
+        ) as translate_stage:
+            result = lnx2ps("ls -la | wc -l", use_ml=False, use_plugins=False)
+        translate_stage.assert_not_called()
+        self.assertEqual(result, "Get-ChildItem -Force | Format-List | Measure-Object -Line")
+        self.assertGreaterEqual(get_translation_stats()["stage_cache_stats"]["hits"], 2)
+
+    def test_keyed_by_direction(self):
+        lnx2ps("ls", use_ml=False, use_plugins=False)
+        ps2lnx("ls", use_ml=False, use_plugins=False)
+        self.assertIn(("lnx2ps", "ls"), core._stage_cache)
+        self.assertIn(("ps2lnx", "ls"), core._stage_cache)
+
+    def test_own_bound(self):
+        configure_stage_cache(maxsize=2)
+        lnx2ps("ls | sort | uniq | wc -l", use_ml=False, use_plugins=False)
+        stats = get_translation_stats()
+        self.assertEqual(stats["stage_cache_stats"]["size"], 2)
+        self.assertEqual(stats["cache_size"], 1)
+
+    def test_survives_ml_change(self):
+        # Patterns persisted by earlier runs would answer without translating stages
+        with mock.patch.object(core.ml_engine, "get_best_translation", return_value=None):
+            lnx2ps("stagecache-ml | sort", use_ml=True, use_plugins=False)
+        core.ml_engine.learn_pattern("stagecache-ml | sort", "Sort-Object", "lnx2ps")
+        self.assertIn(("lnx2ps", "sort"), core._stage_cache)
+
+    def test_reload_mappings_clears_stages(self):
+        lnx2ps("ls", use_ml=False, use_plugins=False)
+        core.reload_mappings()
+        self.assertEqual(get_translation_stats()["stage_cache_stats"]["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
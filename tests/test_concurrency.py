@@ -0,0 +1,135 @@
+# tests/test_concurrency.py
+
+
+import sys
+import threading
+import unittest
+from unittest import mock
+
+from shellrosetta.cache import LRUCache
+from shellrosetta.ml_engine import MLEngine
+from shellrosetta.plugins import PluginManager
+from shellrosetta.security import CommandValidator
+
+
+def run_threads(target, count):
+    """Run target(index) on count threads and re-raise the first error"""
+    errors = []
+
+    def wrapper(index):
+        try:
+            target(index)
+        except Exception as e:  # pragma: no cover - only on failure
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapper, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class TestConcurrentState(unittest.TestCase):
+    """Shared state stays consistent under concurrent readers and writers"""
+
+    def setUp(self):
+        # Switch threads as often as possible to surface races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+        self.ml_engine = MLEngine()
+        self.ml_engine.patterns = {}
+        self.ml_engine.context_history.clear()
+        patcher = mock.patch.object(self.ml_engine, "save_data")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_learning_loses_no_updates(self):
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                self.ml_engine.get_suggestions("cmd", "lnx2ps")
+                self.ml_engine.analyze_patterns()
+                self.ml_engine.get_context_suggestions("cmd", "lnx2ps")
+
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in readers:
+            thread.start()
+
+        def writer(index):
+            for i in range(200):
+                self.ml_engine.learn_pattern(f"cmd{i % 20}", f"out{i % 20}", "lnx2ps")
+
+        try:
+            run_threads(writer, 4)
+        finally:
+            stop.set()
+            for thread in readers:
+                thread.join()
+
+        patterns = self.ml_engine.patterns
+        self.assertEqual(len(patterns), 20)
+        self.assertEqual(sum(p.success_count for p in patterns.values()), 800)
+
+    def test_readers_keep_their_pattern(self):
+        self.ml_engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        old = self.ml_engine.patterns["lnx2ps:ls"]
+        self.ml_engine.learn_patterns(
+            [("ls", "Get-ChildItem", "lnx2ps", True), ("pwd", "Get-Location", "lnx2ps", True)]
+        )
+        # Learning replaces the pattern rather than modifying the one a reader holds
+        self.assertEqual(old.success_count, 1)
+        self.assertEqual(self.ml_engine.patterns["lnx2ps:ls"].success_count, 2)
+
+    def test_plugin_reload_during_lookups(self):
+        manager = PluginManager()
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                manager.translate_with_plugins("docker ps", "lnx2ps")
+                manager.list_plugins()
+
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in readers:
+            thread.start()
+        try:
+            run_threads(lambda index: [manager.load_plugins() for _ in range(20)], 2)
+        finally:
+            stop.set()
+            for thread in readers:
+                thread.join()
+        self.assertIn("docker", manager.plugins)
+
+    def test_validator_results_do_not_interleave(self):
+        validator = CommandValidator()
+
+        def validate(index):
+            for _ in range(200):
+                if index % 2:
+                    self.assertEqual(validator.validate_command("ls -la"), [])
+                else:
+                    self.assertTrue(validator.validate_command("ls; rm -rf /"))
+
+        run_threads(validate, 4)
+
+    def test_shared_lru_cache(self):
+        cache = LRUCache(maxsize=64)
+
+        def worker(index):
+            for i in range(2000):
+                cache.set((index, i % 100), i)
+                cache.get((index, (i * 7) % 100))
+
+        run_threads(worker, 4)
+        stats = cache.get_stats()
+        self.assertEqual(stats["size"], 64)
+        self.assertEqual(stats["hits"] + stats["misses"], 8000)
+
+
+if __name__ == "__main__":
+    unittest.main()
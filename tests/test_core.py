@@ -1,8 +1,14 @@
 # tests/test_core.py
 
 
+import os
+import tempfile
 import unittest
-from shellrosetta.core import lnx2ps, ps2lnx
+from unittest import mock
+
+from shellrosetta import core
+from shellrosetta import engine as engine_module
+from shellrosetta.core import lnx2ps, ps2lnx, lnx2ps_many, ps2lnx_many, clear_translation_cache
 
 
 class TestShellRosettaCore(unittest.TestCase):
@@ -88,5 +94,99 @@ class TestShellRosettaCore(unittest.TestCase):
         self.assertIn("Measure-Object", result)
 
 
+class TestBatchTranslation(unittest.TestCase):
+    def setUp(self):
+        clear_translation_cache()
+
+    def test_results_in_input_order(self):
+        commands = ["ls -la", "rm -rf build", "ls -la | grep error", "", "ls -la"]
+        expected = [lnx2ps(c, use_ml=False, use_plugins=False) for c in commands]
+        clear_translation_cache()
+        self.assertEqual(lnx2ps_many(commands, use_ml=False, use_plugins=False), expected)
+
+    def test_ps2lnx_many(self):
+        result = ps2lnx_many(["Get-ChildItem -Force", "Get-Process"], use_ml=False)
+        self.assertEqual(result, ["ls -a", "ps aux"])
+
+    def test_learns_and_saves_once_per_batch(self):
+        commands = [f"batchtest{i} | grep x" for i in range(25)] * 2
+        with mock.patch.object(
+            core.ml_engine, "_schedule_flush"
+        ) as schedule_flush, mock.patch.object(
+            core.ml_engine, "learn_pattern"
+        ) as learn_pattern, mock.patch.object(
+            # Patterns persisted by earlier runs would answer instead of learning
+            core.ml_engine, "get_best_translation", return_value=None
+        ):
+            results = lnx2ps_many(commands, use_ml=True, use_plugins=False)
+        self.assertEqual(len(results), 50)
+        self.assertEqual(schedule_flush.call_count, 1)
+        learn_pattern.assert_not_called()
+
+    def test_shares_stage_results(self):
+        commands = ["ls -la | grep a", "ls -la | grep b", "ls -la | wc -l"]
+        engine = core.get_engine()
+        with mock.patch.object(
+            engine, "translate_linux_stage", wraps=engine.translate_linux_stage
+        ) as translate_stage:
+            lnx2ps_many(commands, use_ml=False, use_plugins=False)
+        # "ls -la" is translated once for the whole batch
+        self.assertEqual(translate_stage.call_count, 4)
+
+
+class TestPureMode(unittest.TestCase):
+    def setUp(self):
+        clear_translation_cache()
+
+    def tearDown(self):
+        core.set_pure_mode(False)
+        core.set_learning_sink(None)
+
+    def test_matches_mapping_only_translation(self):
+        for command in ["ls -la | grep error", "rm -rf build", "frobnicate -q", ""]:
+            self.assertEqual(
+                lnx2ps(command, pure=True), lnx2ps(command, use_ml=False, use_plugins=False)
+            )
+        self.assertEqual(ps2lnx("Get-ChildItem -Force", pure=True), "ls -a")
+
+    def test_no_learning_io_or_shared_state(self):
+        with mock.patch.object(core, "_get_ml_engine") as get_ml, mock.patch.object(
+            core, "_get_plugin_manager"
+        ) as get_plugins:
+            lnx2ps("puretest-command | sort", pure=True)
+            lnx2ps_many(["puretest-a", "puretest-b | wc -l"], pure=True)
+        get_ml.assert_not_called()
+        get_plugins.assert_not_called()
+        stats = core.get_translation_stats()
+        self.assertEqual(stats["cache_size"], 0)
+        self.assertEqual(stats["stage_cache_stats"]["size"], 0)
+
+    def test_first_pure_call_writes_no_snapshot(self):
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch.dict(
+            os.environ, {"SHELLROSETTA_CACHE_DIR": cache_dir}
+        ), mock.patch.object(engine_module, "_engine", None), mock.patch.object(
+            engine_module, "_tables_modified", False
+        ):
+            self.assertEqual(lnx2ps("ls -a", pure=True), "Get-ChildItem -Force")
+            self.assertIsNotNone(engine_module._engine)
+            self.assertEqual(os.listdir(cache_dir), [])
+
+    def test_process_wide_default(self):
+        core.set_pure_mode(True)
+        self.assertTrue(core.is_pure_mode())
+        with mock.patch.object(core, "_get_ml_engine") as get_ml:
+            lnx2ps("puretest-process")
+        get_ml.assert_not_called()
+        # An explicit per-call setting wins over the process default
+        lnx2ps("ls", use_ml=False, use_plugins=False, pure=False)
+        self.assertEqual(core.get_translation_stats()["cache_size"], 1)
+
+    def test_learning_goes_to_sink(self):
+        sink = mock.Mock()
+        core.set_learning_sink(sink)
+        result = lnx2ps("puretest-sink", pure=True)
+        sink.submit.assert_called_once_with(("puretest-sink", result, "lnx2ps", True))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,214 @@
+# tests/test_engine.py
+
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.common import grown_tables
+from shellrosetta import engine as engine_module
+from shellrosetta.engine import (
+    TranslationEngine,
+    compile_flags,
+    flag_output,
+    get_engine,
+    format_mapping,
+    load_engine,
+    load_snapshot,
+    save_snapshot,
+)
+from shellrosetta.mappings import LINUX_TO_PS, PS_TO_LINUX, FLAG_TRANSLATIONS
+
+
+class TestTranslationEngine(unittest.TestCase):
+    """Test the compiled translation engine"""
+
+    def setUp(self):
+        self.engine = TranslationEngine(LINUX_TO_PS, PS_TO_LINUX, FLAG_TRANSLATIONS)
+
+    def test_direct_mapping(self):
+        """Whole-stage entries are found through the command handler"""
+        self.assertEqual(self.engine.translate_linux_stage(["ps", "aux"]), "Get-Process")
+        self.assertEqual(
+            self.engine.translate_linux_stage(["wc", "-l"]), "Measure-Object -Line"
+        )
+
+    def test_quoted_mapping_keys(self):
+        """Mapping keys are tokenized like input, so quoted keys match"""
+        result = self.engine.translate_linux_stage(["awk", "{print $1}"])
+        self.assertEqual(result, "ForEach-Object { $_.Split()[0] }")
+
+    def test_flag_fallback(self):
+        """Commands with a flag map fall back to flag translation"""
+        result = self.engine.translate_linux_stage(["rm", "-rf", "/tmp/x"])
+        self.assertEqual(result, "Remove-Item -Recurse -Force /tmp/x")
+
+    def test_unknown_command(self):
+        """Unknown commands report that no translation exists"""
+        result = self.engine.translate_linux_stage(["frobnicate", "-q"])
+        self.assertIn("No translation available for 'frobnicate'", result)
+
+    def test_ps_stage(self):
+        """PowerShell stages match whole entries, then the longest mapped prefix"""
+        self.assertEqual(self.engine.translate_ps_stage("Get-ChildItem -Force"), "ls -a")
+        self.assertEqual(self.engine.translate_ps_stage("Select-String foo"), "grep foo")
+        self.assertIn("No Linux equivalent", self.engine.translate_ps_stage("Get-Nope"))
+
+    def test_ps_longest_prefix_keeps_remainder(self):
+        """Words after the longest mapped prefix are appended as arguments"""
+        self.assertEqual(
+            self.engine.translate_ps_stage("Get-ChildItem -Recurse -Force foo"),
+            "ls -R -Force foo",
+        )
+        self.assertEqual(
+            self.engine.translate_ps_stage("Remove-Item -Recurse -Force build"),
+            "rm -rf build",
+        )
+        self.assertEqual(
+            self.engine.translate_ps_stage("Get-Content -Tail 5 app.log"),
+            "tail -n 5 app.log",
+        )
+
+    def test_ps_remainder_precedes_note(self):
+        """Carried-over arguments go before the mapping's note"""
+        trie_engine = TranslationEngine({}, {"Get-Thing": ("thing", "approximate")}, {})
+        self.assertEqual(
+            trie_engine.translate_ps_stage("Get-Thing -Name x"), "thing -Name x # [approximate]"
+        )
+
+    def test_format_mapping(self):
+        """Notes are rendered as trailing comments"""
+        self.assertEqual(format_mapping(("cmd", None)), "cmd")
+        self.assertEqual(format_mapping(("cmd", "note")), "cmd # [note]")
+
+    def test_grown_tables_keep_results(self):
+        """Growing the tables does not change existing translations"""
+        grown = TranslationEngine(*grown_tables(10))
+        for tokens in (["ls", "-la"], ["grep", "-ri", "x"], ["cat", "f"], ["ps", "aux"]):
+            self.assertEqual(
+                grown.translate_linux_stage(tokens),
+                self.engine.translate_linux_stage(tokens),
+            )
+        self.assertEqual(grown.translate_linux_stage(["synth3", "-x"]), "Invoke-Synth3 -Extra")
+        self.assertEqual(grown.translate_linux_stage(["synth3", "-v"]), "Invoke-Synth3 -Verbose")
+
+    def test_flag_order_insensitive(self):
+        """Flag order and clustering do not change the translation"""
+        expected = self.engine.flag_translate("ls", ["-alh"])
+        for args in (["-hla"], ["-l", "-a", "-h"], ["-ah", "-l"], ["-lah"]):
+            self.assertEqual(self.engine.flag_translate("ls", args), expected)
+
+    def test_unknown_flags_are_reported(self):
+        """Known flags still translate when mixed with unknown ones"""
+        result = self.engine.flag_translate("ls", ["-l", "-x", "dir"])
+        self.assertEqual(
+            result,
+            "Get-ChildItem dir | Format-List # [No direct PowerShell equivalent for flags: -x]",
+        )
+
+    def test_unknown_cluster_is_reported_whole(self):
+        """A token is only split into letters if every letter is a known flag"""
+        self.assertEqual(
+            self.engine.flag_translate("find", [".", "-mtime", "3"]),
+            "Get-ChildItem -Recurse . 3 # [No direct PowerShell equivalent for flags: -mtime]",
+        )
+        self.assertEqual(
+            self.engine.flag_translate("grep", ["-A3", "foo"]),
+            "Select-String foo # [No direct PowerShell equivalent for flags: -A3]",
+        )
+        self.assertEqual(
+            self.engine.flag_translate("ls", ["-lx"]),
+            "Get-ChildItem # [No direct PowerShell equivalent for flags: -lx]",
+        )
+
+    def test_long_flag_tokens(self):
+        """Multi-letter single-dash flags like find -name are matched whole"""
+        result = self.engine.flag_translate("find", [".", "-name", "*.py"])
+        self.assertEqual(result, "Get-ChildItem -Recurse -Filter . *.py")
+
+    def test_compile_flags_shares_bits(self):
+        """Flags sharing a fragment share a bit"""
+        token_bits, letter_bits, fragments = compile_flags(
+            {"-r": "-Recurse", "-R": "-Recurse", "-f": "-Force", "-n": "# [note]"}
+        )
+        self.assertEqual(token_bits["-r"], token_bits["-R"])
+        self.assertEqual(len(fragments), 3)
+        mask = token_bits["-n"] | token_bits["-r"]
+        self.assertEqual(flag_output(fragments, mask), ("-Recurse", "# [note]"))
+
+    def test_many_flags(self):
+        """Commands with many flags compile and translate without a table per combination"""
+        semantics = {f"-{chr(ord('a') + i)}": f"-Param{i}" for i in range(24)}
+        semantics["-Z"] = "| Sort-Object"
+        engine = TranslationEngine({}, {}, {"many": ("Invoke-Many", semantics)})
+        self.assertEqual(
+            engine.flag_translate("many", ["-xZ", "-b", "target"]),
+            "Invoke-Many -Param1 -Param23 target | Sort-Object",
+        )
+
+    def test_shared_engine(self):
+        """The shared engine is compiled once and reused"""
+        self.assertIs(get_engine(), get_engine())
+
+
+class TestEngineSnapshot(unittest.TestCase):
+    """Test the precompiled marshal snapshot"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.path = Path(self.cache_dir.name) / "engine.marshal"
+        self.engine = TranslationEngine(LINUX_TO_PS, PS_TO_LINUX, FLAG_TRANSLATIONS)
+
+    def test_round_trip(self):
+        self.assertTrue(save_snapshot(self.engine, self.path, digest="abc"))
+        loaded = load_snapshot(self.path, digest="abc")
+        self.assertEqual(loaded.linux_handlers, self.engine.linux_handlers)
+        self.assertEqual(loaded.ps_trie, self.engine.ps_trie)
+        for tokens in (["ls", "-alh"], ["ps", "aux"], ["grep", "-ri", "x"]):
+            self.assertEqual(
+                loaded.translate_linux_stage(tokens), self.engine.translate_linux_stage(tokens)
+            )
+        self.assertEqual(loaded.translate_ps_stage("Get-ChildItem -Force x"), "ls -a x")
+
+    def test_stale_or_corrupt_snapshot_is_ignored(self):
+        save_snapshot(self.engine, self.path, digest="old")
+        self.assertIsNone(load_snapshot(self.path, digest="new"))
+        self.path.write_bytes(b"not a snapshot")
+        self.assertIsNone(load_snapshot(self.path, digest="old"))
+        self.assertIsNone(load_snapshot(self.path.with_name("missing"), digest="old"))
+
+    def test_load_engine_regenerates_on_source_change(self):
+        with mock.patch.dict(os.environ, {"SHELLROSETTA_CACHE_DIR": self.cache_dir.name}):
+            path = engine_module.snapshot_path()
+            load_engine()
+            self.assertTrue(path.exists())
+            with mock.patch.object(
+                engine_module, "build_engine", wraps=engine_module.build_engine
+            ) as build:
+                load_engine()
+                build.assert_not_called()
+                with mock.patch.object(engine_module, "source_hash", return_value="changed"):
+                    load_engine()
+                build.assert_called_once()
+            self.assertEqual(load_snapshot(path, digest="changed").ps_trie, self.engine.ps_trie)
+
+    def test_reset_engine_uses_live_tables(self):
+        """After reset_engine, in-memory table edits win over the snapshot"""
+        with mock.patch.dict(LINUX_TO_PS, {"frobnicate": ("Invoke-Frobnicate", None)}):
+            engine_module.reset_engine()
+            self.assertEqual(
+                get_engine().translate_linux_stage(["frobnicate"]), "Invoke-Frobnicate"
+            )
+        engine_module.reset_engine()
+
+    def test_unwritable_cache_dir(self):
+        blocker = Path(self.cache_dir.name) / "file"
+        blocker.write_text("")
+        self.assertFalse(save_snapshot(self.engine, blocker / "engine.marshal", digest="abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# tests/test_import.py
+
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stdlib imports timed in the same interpreter, so the budget scales with the machine
+REFERENCE_IMPORTS = "argparse, email.parser, http.client, json, logging, pathlib, typing, decimal"
+
+# Importing core costs about 0.3 of the reference import; eagerly loading the
+# ML engine and plugins would add about 0.12
+IMPORT_BUDGET_RATIO = 0.38
+
+TIMED_IMPORT = f"""
+import time
+start = time.perf_counter()
+import {REFERENCE_IMPORTS}
+reference = time.perf_counter() - start
+start = time.perf_counter()
+import shellrosetta.core
+print((time.perf_counter() - start) / reference)
+"""
+
+
+def import_profile(statement, home):
+    """Run a statement in a fresh interpreter with -X importtime and a private HOME"""
+    env = dict(os.environ, HOME=home, USERPROFILE=home, PYTHONPATH=PROJECT_ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        cwd=home,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | imported package"
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+class TestLazyImport(unittest.TestCase):
+    """Importing shellrosetta.core must not load ML data or plugins"""
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def test_import_does_not_touch_home(self):
+        import_profile("import shellrosetta.core", self.home)
+        self.assertFalse(os.path.exists(os.path.join(self.home, ".shellrosetta")))
+
+    def test_import_skips_ml_and_plugins(self):
+        profile = import_profile("import shellrosetta.core", self.home)
+        self.assertIn("shellrosetta.core", profile)
+        self.assertNotIn("shellrosetta.ml_engine", profile)
+        self.assertNotIn("shellrosetta.plugins", profile)
+
+    def test_import_time_budget(self):
+        env = dict(os.environ, HOME=self.home, USERPROFILE=self.home, PYTHONPATH=PROJECT_ROOT)
+        ratios = [
+            float(subprocess.run(
+                [sys.executable, "-c", TIMED_IMPORT],
+                env=env, cwd=self.home, capture_output=True, text=True, check=True,
+            ).stdout)
+            for _ in range(3)
+        ]
+        self.assertLess(min(ratios), IMPORT_BUDGET_RATIO)
+
+    def test_plain_translation_stays_lazy(self):
+        import_profile(
+            "from shellrosetta.core import lnx2ps;"
+            " lnx2ps('ls -la', use_ml=False, use_plugins=False)",
+            self.home,
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.home, ".shellrosetta")))
+
+    def test_first_ml_use_loads_engine(self):
+        import_profile("from shellrosetta.core import lnx2ps; lnx2ps('ls -la')", self.home)
+        self.assertTrue(os.path.isdir(os.path.join(self.home, ".shellrosetta", "ml")))
+        self.assertTrue(os.path.isdir(os.path.join(self.home, ".shellrosetta", "plugins")))
+
+
+if __name__ == "__main__":
+    unittest.main()
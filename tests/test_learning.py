@@ -0,0 +1,61 @@
+# tests/test_learning.py
+
+
+import threading
+import unittest
+
+from shellrosetta.learning import AsyncLearningSink
+
+
+class TestAsyncLearningSink(unittest.TestCase):
+    """Test the background learning sink"""
+
+    def setUp(self):
+        self.batches = []
+        self.sink = AsyncLearningSink(apply=self.batches.append, max_batch=4)
+
+    def tearDown(self):
+        self.sink.close(timeout=5)
+
+    def test_flush_applies_all_events_in_order(self):
+        events = [(f"cmd{i}", f"out{i}", "lnx2ps", True) for i in range(10)]
+        for event in events:
+            self.assertTrue(self.sink.submit(event))
+        self.assertTrue(self.sink.flush(timeout=5))
+        self.assertEqual([e for batch in self.batches for e in batch], events)
+        self.assertTrue(all(len(batch) <= 4 for batch in self.batches))
+        self.assertEqual(self.sink.applied, 10)
+
+    def test_close_drains_queue(self):
+        self.sink.submit(("ls", "Get-ChildItem", "lnx2ps", True))
+        self.sink.close(timeout=5)
+        self.assertEqual(self.sink.applied, 1)
+
+    def test_flush_after_close_returns(self):
+        self.sink.submit(("ls", "Get-ChildItem", "lnx2ps", True))
+        self.sink.close(timeout=5)
+        self.assertTrue(self.sink.flush())
+        # Submitted after close: never applied, and flush says so without hanging
+        self.sink.submit(("pwd", "Get-Location", "lnx2ps", True))
+        self.assertFalse(self.sink.flush())
+
+    def test_applies_off_the_calling_thread(self):
+        threads = []
+        sink = AsyncLearningSink(apply=lambda batch: threads.append(threading.current_thread()))
+        sink.submit(("ls", "Get-ChildItem", "lnx2ps", True))
+        sink.close(timeout=5)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        gate = threading.Event()
+        sink = AsyncLearningSink(apply=lambda batch: gate.wait(5), max_batch=1, maxsize=1)
+        results = [sink.submit((f"cmd{i}", "out", "lnx2ps", True)) for i in range(5)]
+        self.assertIn(False, results)
+        self.assertEqual(sink.dropped, results.count(False))
+        gate.set()
+        sink.close(timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,825 @@
+# tests/test_ml_store.py
+
+
+import copy
+import json
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from shellrosetta import ml_engine, ml_sqlite, similarity
+from shellrosetta.ml_engine import (
+    CommandPattern,
+    ContextHistory,
+    ContextRecord,
+    FrequencyBuckets,
+    MLEngine,
+    PatternStats,
+    PatternStore,
+    create_ml_engine,
+)
+from shellrosetta.ml_sqlite import SQLiteMLEngine
+from shellrosetta.similarity import command_words
+
+
+class MLStoreTestCase(unittest.TestCase):
+    """Base class giving each test an MLEngine in a private home directory"""
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+
+    def new_engine(self, **kwargs):
+        """Create an engine that loads whatever the previous ones persisted"""
+        engine = MLEngine(data_dir=Path(self.home) / ".shellrosetta" / "ml", **kwargs)
+        self.addCleanup(engine.close)
+        return engine
+
+    def new_sqlite_engine(self):
+        """Create an engine on the shared SQLite database in the private home"""
+        with mock.patch.object(Path, "home", return_value=Path(self.home)):
+            engine = SQLiteMLEngine()
+        self.addCleanup(engine.close)
+        return engine
+
+
+class TestJournal(MLStoreTestCase):
+    """Test the append-only learning journal"""
+
+    def test_learning_appends_instead_of_rewriting(self):
+        engine = self.new_engine()
+        for i in range(25):
+            engine.learn_pattern(f"cmd{i}", f"Out-{i}", "lnx2ps")
+        engine.flush()
+        self.assertFalse(engine.patterns_file.exists())
+        lines = engine.journal_file.read_text().splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(json.loads(lines[-1])["command"], "cmd24")
+
+    def test_replay_on_load(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.learn_patterns(
+            [("ls", "Get-ChildItem", "lnx2ps", True), ("pwd", "Get-Location", "lnx2ps", False)]
+        )
+        engine.close()
+
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:ls"].success_count, 2)
+        self.assertEqual(reloaded.patterns["lnx2ps:pwd"].failure_count, 1)
+        self.assertEqual(
+            reloaded.patterns["lnx2ps:ls"].last_used, engine.patterns["lnx2ps:ls"].last_used
+        )
+        self.assertEqual(len(reloaded.context_history), 3)
+
+    def test_background_compaction(self):
+        engine = self.new_engine()
+        engine.journal_compact_bytes = 2000
+        for i in range(100):
+            engine.learn_pattern(f"cmd{i % 10}", f"Out-{i % 10}", "lnx2ps")
+        engine.flush()
+        engine.compact()
+
+        self.assertTrue(engine.patterns_file.exists())
+        self.assertFalse(engine._compacting_file.exists())
+        self.assertFalse(engine.journal_file.exists())
+
+        reloaded = self.new_engine()
+        self.assertEqual(sum(p.success_count for p in reloaded.patterns.values()), 100)
+
+    def test_learning_continues_during_compaction(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        original = engine._write_snapshot
+
+        def write_snapshot(*args):
+            # Another writer learns while the snapshot is being written
+            engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+            return original(*args)
+
+        with mock.patch.object(engine, "_write_snapshot", side_effect=write_snapshot):
+            engine.compact()
+        engine.close()
+
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:ls"].success_count, 2)
+
+    def test_interrupted_compaction_is_not_applied_twice(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        # Snapshot written, but the rotated journal was never deleted
+        with mock.patch.object(Path, "unlink"):
+            engine.compact()
+        self.assertTrue(engine._compacting_file.exists())
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.close()
+        with open(engine.journal_file, "a") as f:
+            f.write('{"seq": 99, "command": "torn')
+
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:ls"].success_count, 2)
+
+    def test_failed_snapshot_keeps_journal(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        with mock.patch("shellrosetta.ml_engine._write_json", side_effect=OSError("disk full")):
+            self.assertFalse(engine.compact())
+        self.assertTrue(engine._compacting_file.exists())
+
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:ls"].success_count, 1)
+
+    def test_crash_after_patterns_write_is_not_applied_twice(self):
+        engine = self.new_engine()
+        for _ in range(3):
+            engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        write_json = ml_engine._write_json
+
+        def crash_after_patterns(path, data):
+            # patterns.json is renamed into place, then the process dies
+            write_json(path, data)
+            if path == engine.patterns_file:
+                raise OSError("killed")
+
+        with mock.patch("shellrosetta.ml_engine._write_json", side_effect=crash_after_patterns):
+            self.assertFalse(engine.compact())
+        self.assertTrue(engine._compacting_file.exists())
+
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:ls"].success_count, 3)
+
+    def test_cleanup_is_journaled(self):
+        engine = self.new_engine()
+        engine.learn_pattern("old", "Old-Thing", "lnx2ps", success=False)
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.compact()
+        engine.patterns["lnx2ps:old"].last_used = 0
+        engine.cleanup_old_patterns(days=30)
+        engine.learn_pattern("old", "Old-Thing", "lnx2ps")
+        engine.close()
+
+        self.assertEqual(
+            [json.loads(line).get("op") for line in engine.journal_file.read_text().splitlines()],
+            ["remove", None],
+        )
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:old"].failure_count, 0)
+        self.assertEqual(reloaded.patterns["lnx2ps:old"].success_count, 1)
+        self.assertEqual(reloaded.patterns["lnx2ps:ls"].success_count, 1)
+
+    def test_loaded_patterns_are_not_journaled(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.load_patterns(
+            CommandPattern(f"cmd{i}", f"Out-{i}", "lnx2ps", i, 0) for i in range(5)
+        )
+        self.assertEqual(len(engine.get_suggestions("cmd", "lnx2ps")), 5)
+        engine.flush()
+        self.assertEqual(len(engine.journal_file.read_text().splitlines()), 1)
+        self.assertEqual(len(self.new_engine().patterns), 1)
+
+        engine.compact()
+        self.assertEqual(len(self.new_engine().patterns), 6)
+
+    def test_loaded_patterns_respect_capacity(self):
+        engine = self.new_engine(max_patterns=3)
+        engine.load_patterns(
+            CommandPattern(f"cmd{i}", f"Out-{i}", "lnx2ps", i, 0) for i in range(5)
+        )
+        self.assertEqual(sorted(p.command for p in engine.patterns.values()),
+                         ["cmd2", "cmd3", "cmd4"])
+
+
+LEARNING_EVENTS = [
+    ("ls -la", "Get-ChildItem -Force", "lnx2ps", True),
+    ("ls -la", "Get-ChildItem -Force", "lnx2ps", True),
+    ("ls -l", "Get-ChildItem | Format-List", "lnx2ps", True),
+    ("ls -l", "Get-ChildItem | Format-List", "lnx2ps", False),
+    ("ls -l /tmp", "Get-ChildItem /tmp", "lnx2ps", True),
+    ("grep -r foo", "Select-String foo", "lnx2ps", False),
+    ("git status", "git status", "lnx2ps", True),
+    ("docker ps", "docker ps", "lnx2ps", True),
+    ("Get-Process", "ps aux", "ps2lnx", True),
+    ("find . -name x", "Get-ChildItem -Recurse -Filter x", "lnx2ps", True),
+]
+
+
+class TestSQLiteBackend(MLStoreTestCase):
+    """Test the SQLite pattern store against the in-memory engine"""
+
+    def setUp(self):
+        super().setUp()
+        self.memory = self.new_engine()
+        self.memory.learn_patterns(LEARNING_EVENTS)
+        self.sqlite = self.new_sqlite_engine()
+        self.sqlite.learn_patterns(LEARNING_EVENTS)
+
+    def test_matches_in_memory_engine(self):
+        for partial in ["ls", "ls -l", "-la ls", "grep foo", "Get", "", "missing"]:
+            for direction in ["lnx2ps", "ps2lnx"]:
+                self.assertEqual(
+                    self.sqlite.get_suggestions(partial, direction, limit=10),
+                    self.memory.get_suggestions(partial, direction, limit=10),
+                )
+        for command in ["ls -la", "ls -l", "grep -r foo", "missing"]:
+            self.assertEqual(
+                self.sqlite.get_best_translation(command, "lnx2ps"),
+                self.memory.get_best_translation(command, "lnx2ps"),
+            )
+        self.assertEqual(self.sqlite.analyze_patterns(), self.memory.analyze_patterns())
+        self.assertEqual(
+            self.sqlite.get_context_suggestions("ls", "lnx2ps"),
+            self.memory.get_context_suggestions("ls", "lnx2ps"),
+        )
+        self.assertEqual(
+            {k: p.to_dict()["success_count"] for k, p in self.sqlite.snapshot_patterns().items()},
+            {k: p.to_dict()["success_count"] for k, p in self.memory.patterns.items()},
+        )
+
+    def test_shares_only_the_store_interface(self):
+        self.assertIsInstance(self.sqlite, PatternStore)
+        self.assertNotIsInstance(self.sqlite, MLEngine)
+        self.sqlite.record_hit("ls -la", "lnx2ps")
+        self.sqlite.flush()
+
+    def test_success_rate_analytics_are_indexed(self):
+        rate = ml_sqlite._SUCCESS_RATE
+        plan = self.sqlite._connection().execute(
+            f"EXPLAIN QUERY PLAN SELECT command, {rate} FROM patterns WHERE {rate} > 0.7"
+            f" ORDER BY {rate} DESC, command, direction LIMIT 10"
+        ).fetchall()
+        self.assertIn("patterns_success_rate", str(plan))
+        self.assertNotIn("TEMP B-TREE", str(plan))
+
+    def test_engines_share_the_database(self):
+        other = self.new_sqlite_engine()
+        other.learn_pattern("ls -la", "Get-ChildItem -Force", "lnx2ps")
+        self.assertEqual(self.sqlite.snapshot_patterns()["lnx2ps:ls -la"].success_count, 3)
+        self.assertEqual(len(self.sqlite.snapshot_context_history()), len(LEARNING_EVENTS) + 1)
+
+    def test_uses_wal_and_indexes(self):
+        conn = self.sqlite._connection()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        plan = " ".join(
+            str(row)
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT translation FROM patterns"
+                " WHERE direction = ? AND command >= ? AND command < ?",
+                ("lnx2ps", "ls", "ls\U0010ffff"),
+            )
+        )
+        self.assertIn("patterns_direction_command", plan)
+
+    def test_context_history_is_bounded(self):
+        self.sqlite.MAX_CONTEXT_HISTORY = 5
+        self.sqlite.learn_patterns(LEARNING_EVENTS)
+        history = self.sqlite.snapshot_context_history()
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[-1].command, LEARNING_EVENTS[-1][0])
+
+    def test_cleanup_old_patterns(self):
+        conn = self.sqlite._connection()
+        conn.execute("UPDATE patterns SET last_used = 0 WHERE command = 'grep -r foo'")
+        self.sqlite.cleanup_old_patterns(days=30)
+        self.assertNotIn("lnx2ps:grep -r foo", self.sqlite.snapshot_patterns())
+        self.assertIn("lnx2ps:ls -la", self.sqlite.snapshot_patterns())
+        self.assertEqual(self.sqlite.get_suggestions("grep foo", "lnx2ps"), [])
+
+    def test_backend_selection(self):
+        with mock.patch.object(Path, "home", return_value=Path(self.home)):
+            with mock.patch.dict("os.environ", {"SHELLROSETTA_ML_BACKEND": "sqlite"}):
+                engine = create_ml_engine()
+            self.addCleanup(engine.close)
+            self.assertIsInstance(engine, SQLiteMLEngine)
+            self.assertIs(type(create_ml_engine("json")), MLEngine)
+            with self.assertRaises(ValueError):
+                create_ml_engine("redis")
+
+
+class TestSuggestionIndex(MLStoreTestCase):
+    """Test the sorted per-direction command index behind get_suggestions"""
+
+    def test_matches_linear_scan(self):
+        engine = self.new_engine()
+        rng = random.Random(18)
+        words = ["ls", "-la", "-l", "grep", "foo", "git", "status", "log", "docker", "ps"]
+        events = [
+            (" ".join(rng.choice(words) for _ in range(rng.randint(1, 3))), f"Out-{i}",
+             rng.choice(["lnx2ps", "ps2lnx"]), rng.random() < 0.7)
+            for i in range(500)
+        ]
+        engine.learn_patterns(events)
+        for prefix in ["", "l", "ls", "ls -l", "git s", "docker ps", "zzz"]:
+            for direction in ["lnx2ps", "ps2lnx"]:
+                expected = sorted(
+                    p.command for p in engine.patterns.values()
+                    if p.direction == direction and p.command.startswith(prefix)
+                )
+                self.assertEqual(engine._commands_with_prefix(prefix, direction), expected)
+
+    def test_updated_incrementally(self):
+        engine = self.new_engine()
+        for command in ["ls -l", "ls", "git log", "ls -la", "ls"]:
+            engine.learn_pattern(command, "x", "lnx2ps")
+        self.assertEqual(engine._sorted_commands["lnx2ps"], ["git log", "ls", "ls -l", "ls -la"])
+        self.assertEqual(engine._commands_with_prefix("ls -", "lnx2ps"), ["ls -l", "ls -la"])
+
+    def test_rebuilt_on_load_and_cleanup(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.learn_pattern("old", "Old-Thing", "lnx2ps", success=False)
+        engine.compact()
+        self.assertEqual(self.new_engine()._sorted_commands, {"lnx2ps": ["ls", "old"]})
+
+        pattern = engine.patterns["lnx2ps:old"]
+        pattern.last_used = 0
+        engine.cleanup_old_patterns(days=30)
+        self.assertEqual(engine._sorted_commands, {"lnx2ps": ["ls"]})
+
+    def test_top_k_by_confidence(self):
+        engine = self.new_engine()
+        engine.learn_patterns([
+            ("ls -a", "A", "lnx2ps", True),
+            ("ls -b", "B", "lnx2ps", False),
+            ("ls -c", "C", "lnx2ps", True),
+            ("ls -c", "C", "lnx2ps", False),
+            ("ls -d", "D", "lnx2ps", True),
+        ])
+        self.assertEqual(
+            engine.get_suggestions("ls -", "lnx2ps", limit=3), [("A", 1.0), ("D", 1.0), ("C", 0.5)]
+        )
+
+
+class TestSimilarityIndex(MLStoreTestCase):
+    """Test candidate generation for similar-command suggestions"""
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(19)
+        words = [f"w{i}" for i in range(30)]
+        self.commands = [" ".join(rng.sample(words, rng.randint(1, 5))) for _ in range(2000)]
+        self.queries = [" ".join(rng.sample(words, rng.randint(1, 4))) for _ in range(200)]
+        self.engine = self.new_engine()
+        self.engine.learn_patterns((c, f"Out {c}", "lnx2ps", True) for c in self.commands)
+
+    def brute_force(self, query):
+        return {c for c in set(self.commands) if self.engine._similar_commands(query, c)}
+
+    def test_inverted_index_is_exact(self):
+        self.engine.set_similarity_index("inverted")
+        index = self.engine._similarity_index
+        for query in self.queries:
+            expected = self.brute_force(query)
+            candidates = index.candidates("lnx2ps", command_words(query))
+            self.assertLessEqual(expected, candidates)
+            self.assertEqual(
+                {c for c in candidates if self.engine._similar_commands(query, c)}, expected
+            )
+        self.assertEqual(index.candidates("ps2lnx", {"w1"}), set())
+
+    def test_minhash_recall(self):
+        self.engine.set_similarity_index("minhash")
+        found = expected = 0
+        for query in self.queries:
+            matches = self.brute_force(query)
+            expected += len(matches)
+            found += len(matches & self.engine._similarity_index.candidates(
+                "lnx2ps", command_words(query)
+            ))
+        self.assertGreater(found / expected, 0.9)
+
+        # New patterns are added to the selected index
+        self.engine.learn_pattern("brand new command", "Out", "lnx2ps")
+        self.assertIn(
+            "brand new command",
+            self.engine._similarity_index.candidates("lnx2ps", {"brand", "new", "command"}),
+        )
+
+    def test_suggestions_unchanged(self):
+        for query in self.queries[:50]:
+            prefixed = [(f"Out {c}", 1.0) for c in set(self.commands) if c.startswith(query)]
+            similar = [(f"Out {c}", 0.8) for c in self.brute_force(query)]
+            expected = sorted(prefixed + similar, key=lambda s: (-s[1], s[0][4:]))[:5]
+            self.assertEqual(self.engine.get_suggestions(query, "lnx2ps"), expected)
+
+    def test_unknown_index(self):
+        with self.assertRaises(ValueError):
+            self.engine.set_similarity_index("bloom")
+
+    def check_matrix_index(self, use_numpy):
+        self.engine.set_similarity_index("matrix", use_numpy=use_numpy)
+        index = self.engine._similarity_index
+        words = [command_words(query) for query in self.queries]
+        expected = [self.brute_force(query) for query in self.queries]
+        self.assertEqual([index.similar("lnx2ps", w) for w in words], expected)
+        self.assertEqual(index.similar_many("lnx2ps", words), expected)
+        self.assertEqual(index.similar("ps2lnx", {"w1"}), set())
+        self.test_suggestions_unchanged()
+
+        # Removing most commands rebuilds the matrix without them
+        commands = sorted(set(self.commands))
+        kept = set(commands[::3])
+        for command in commands:
+            if command not in kept:
+                index.remove("lnx2ps", command)
+        self.assertEqual(
+            index.similar_many("lnx2ps", words), [matches & kept for matches in expected]
+        )
+
+    def test_matrix_index_pure_python(self):
+        self.check_matrix_index(use_numpy=False)
+
+    @unittest.skipIf(similarity.np is None, "NumPy is not installed")
+    def test_matrix_index_numpy(self):
+        self.check_matrix_index(use_numpy=True)
+
+    def test_suggestions_many(self):
+        self.engine.set_similarity_index("matrix")
+        queries = self.queries[:20]
+        self.assertEqual(
+            self.engine.get_suggestions_many(queries, "lnx2ps", limit=3),
+            [self.engine.get_suggestions(query, "lnx2ps", limit=3) for query in queries],
+        )
+
+
+class TestContextHistory(MLStoreTestCase):
+    """Test the ring-buffer context history"""
+
+    def record(self, translation, direction="lnx2ps", success=True, timestamp=0):
+        return ContextRecord(timestamp, "cmd", translation, direction, success, "general")
+
+    def test_capacity_is_bounded(self):
+        history = ContextHistory(capacity=10, window=4)
+        history.extend(self.record(f"t{i}", timestamp=i) for i in range(25))
+        self.assertEqual(len(history), 10)
+        self.assertEqual([r.timestamp for r in history], list(range(15, 25)))
+
+    def test_rolling_counts_match_scan(self):
+        rng = random.Random(20)
+        history = ContextHistory(capacity=200, window=50)
+        records = []
+        for _ in range(1000):
+            record = self.record(
+                f"t{rng.randrange(8)}", rng.choice(["lnx2ps", "ps2lnx"]), rng.random() < 0.8
+            )
+            history.append(record)
+            records.append(record)
+            for direction in ("lnx2ps", "ps2lnx"):
+                expected = Counter(
+                    r.translation for r in records[-50:] if r.direction == direction and r.success
+                )
+                result = history.most_common(direction, 3)
+                self.assertEqual(
+                    [expected[t] for t in result], [c for _, c in expected.most_common(3)]
+                )
+        history.clear()
+        self.assertEqual(history.most_common("lnx2ps", 3), [])
+
+    def test_compact_records(self):
+        first = ContextRecord(0, "".join(["git", " log"]), "git log", "lnx2ps", True, "general")
+        second = ContextRecord(0, "".join(["git", " log"]), "git log", "lnx2ps", True, "general")
+        self.assertIs(first.command, second.command)
+        self.assertFalse(hasattr(first, "__dict__"))
+
+    def test_engine_history_round_trip(self):
+        engine = self.new_engine()
+        engine.learn_patterns([("ls", "Get-ChildItem", "lnx2ps", True)] * 3)
+        engine.learn_pattern("pwd", "Get-Location", "lnx2ps")
+        engine.compact()
+        self.assertEqual(json.loads(engine.context_file.read_text())[0]["command"], "ls")
+
+        reloaded = self.new_engine()
+        self.assertEqual(
+            [r.to_dict() for r in reloaded.context_history],
+            [r.to_dict() for r in engine.context_history],
+        )
+        self.assertEqual(
+            reloaded.get_context_suggestions("ls", "lnx2ps"), ["Get-ChildItem", "Get-Location"]
+        )
+
+
+class TestCompactPatterns(MLStoreTestCase):
+    """Test the slotted CommandPattern and the row-based patterns file"""
+
+    def test_compact_representation(self):
+        first = CommandPattern("".join(["git", " log"]), "git log", "lnx2ps")
+        second = CommandPattern("".join(["git", " log"]), "git log", "lnx2ps")
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first.command, second.command)
+        self.assertIsInstance(first.last_used, int)
+        self.assertIsInstance(first.created, int)
+
+        first.record_success()
+        clone = copy.copy(first)
+        self.assertEqual(clone.to_dict(), first.to_dict())
+        self.assertEqual(CommandPattern.from_row(first.to_row()).to_dict(), first.to_dict())
+
+    def test_saved_as_rows(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.compact()
+        rows = json.loads(engine.patterns_file.read_text())["rows"]
+        self.assertEqual(rows, [engine.patterns["lnx2ps:ls"].to_row()])
+        self.assertEqual(self.new_engine().patterns["lnx2ps:ls"].success_count, 1)
+
+    def test_loads_legacy_files(self):
+        data_dir = Path(self.home) / ".shellrosetta" / "ml"
+        data_dir.mkdir(parents=True)
+        (data_dir / "patterns.json").write_text(json.dumps({
+            "lnx2ps:ls": {
+                "command": "ls",
+                "translation": "Get-ChildItem",
+                "direction": "lnx2ps",
+                "success_count": 3,
+                "failure_count": 1,
+                "last_used": "2024-05-01T12:00:00.123456",
+                "created": "2024-04-01T08:30:00",
+            }
+        }))
+        (data_dir / "journal.jsonl").write_text(json.dumps({
+            "seq": 1, "timestamp": "2024-05-02T09:00:00", "command": "ls",
+            "translation": "Get-ChildItem", "direction": "lnx2ps", "success": True,
+        }) + "\n")
+
+        pattern = self.new_engine().patterns["lnx2ps:ls"]
+        self.assertEqual(pattern.success_count, 4)
+        self.assertEqual(pattern.created, int(datetime(2024, 4, 1, 8, 30).timestamp()))
+        self.assertEqual(pattern.last_used, int(datetime(2024, 5, 2, 9).timestamp()))
+
+
+class TestBackgroundWriter(MLStoreTestCase):
+    """Test the debounced background journal writer"""
+
+    def test_debounces_writes(self):
+        engine = self.new_engine()
+        engine.flush_interval = 60
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.learn_pattern("pwd", "Get-Location", "lnx2ps")
+        self.assertFalse(engine.journal_file.exists())
+        self.assertEqual(len(engine._pending), 2)
+
+        engine.flush()
+        self.assertEqual(len(engine.journal_file.read_text().splitlines()), 2)
+        self.assertEqual(engine._pending, [])
+
+    def test_threshold_wakes_writer(self):
+        engine = self.new_engine()
+        engine.flush_interval = 60
+        engine.flush_threshold = 5
+        engine.learn_patterns((f"cmd{i}", "Out", "lnx2ps", True) for i in range(5))
+        writer = engine._writer
+        writer.join(timeout=5)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(len(engine.journal_file.read_text().splitlines()), 5)
+
+    def test_writes_off_the_callers_thread(self):
+        engine = self.new_engine()
+        threads = []
+        original = engine._append_journal
+
+        def append_journal(entries):
+            threads.append(threading.current_thread())
+            original(entries)
+
+        with mock.patch.object(engine, "_append_journal", side_effect=append_journal):
+            engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+            writer = engine._writer
+            engine.save_data()
+            writer.join(timeout=5)
+        self.assertEqual(threads, [writer])
+        self.assertTrue(engine.patterns_file.exists())
+
+    def test_flush_at_exit(self):
+        engine = self.new_engine()
+        engine.flush_interval = 60
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        ml_engine._flush_at_exit()
+        self.assertEqual(self.new_engine().patterns["lnx2ps:ls"].success_count, 1)
+
+
+class TestPatternStats(MLStoreTestCase):
+    """Test the running aggregates behind analyze_patterns"""
+
+    def brute_force(self, engine):
+        patterns = list(engine.patterns.values())
+        if not patterns:
+            return {}
+        successful = sum(1 for p in patterns if p.get_success_rate() > 0.5)
+        top = sorted(
+            (p for p in patterns if p.get_success_rate() > 0.7),
+            key=lambda p: (-p.get_success_rate(), p.command, p.direction),
+        )
+        return {
+            "total_patterns": len(patterns),
+            "successful_patterns": successful,
+            "success_rate": successful / len(patterns),
+            "command_types": dict(Counter(engine._classify_command(p.command) for p in patterns)),
+            "top_successful_patterns": [(p.command, p.get_success_rate()) for p in top[:10]],
+        }
+
+    def test_matches_full_scan(self):
+        engine = self.new_engine()
+        rng = random.Random(23)
+        commands = ["ls", "grep", "git", "docker", "cp", "find", "tar", "ps"]
+        for step in range(60):
+            engine.learn_patterns(
+                (f"{rng.choice(commands)} {rng.randrange(40)}", "Out",
+                 rng.choice(["lnx2ps", "ps2lnx"]), rng.random() < 0.75)
+                for _ in range(rng.randint(1, 20))
+            )
+            if step % 15 == 14:
+                for pattern in rng.sample(list(engine.patterns.values()), 10):
+                    pattern.last_used = 0
+                engine.cleanup_old_patterns(days=30)
+            with mock.patch.object(PatternStats, "rebuild") as rebuild:
+                analysis = engine.analyze_patterns()
+            rebuild.assert_not_called()
+            self.assertEqual(analysis, self.brute_force(engine))
+
+    def test_top_patterns_rarely_rescanned(self):
+        engine = self.new_engine()
+        engine.learn_patterns((f"cmd{i}", "Out", "lnx2ps", True) for i in range(100))
+        with mock.patch.object(
+            PatternStats, "rebuild_top", autospec=True, side_effect=PatternStats.rebuild_top
+        ) as rebuild_top:
+            # Each failure drops one of the current top patterns out of the list
+            for i in range(10):
+                engine.learn_pattern(f"cmd{i}", "Out", "lnx2ps", success=False)
+        self.assertEqual(rebuild_top.call_count, 0)
+        self.assertEqual(engine.analyze_patterns(), self.brute_force(engine))
+
+    def test_recomputed_after_direct_changes(self):
+        engine = self.new_engine()
+        engine.learn_pattern("ls", "Get-ChildItem", "lnx2ps")
+        engine.patterns.clear()
+        self.assertEqual(engine.analyze_patterns(), {})
+        engine.learn_pattern("git log", "git log", "lnx2ps")
+        self.assertEqual(engine.analyze_patterns(), self.brute_force(engine))
+
+
+class TestEviction(MLStoreTestCase):
+    """Test the capacity bound and its LFU/LRU eviction"""
+
+    def learn(self, engine, command, successes=1, failures=0):
+        for _ in range(successes):
+            engine.learn_pattern(command, "Out", "lnx2ps")
+        for _ in range(failures):
+            engine.learn_pattern(command, "Out", "lnx2ps", success=False)
+
+    def commands(self, engine):
+        return sorted(p.command for p in engine.patterns.values())
+
+    def test_evicts_least_successful(self):
+        engine = self.new_engine(max_patterns=3)
+        self.learn(engine, "a", successes=3)
+        self.learn(engine, "b", successes=1)
+        self.learn(engine, "c", successes=2)
+        self.learn(engine, "d")
+        self.assertEqual(self.commands(engine), ["a", "c", "d"])
+        self.assertEqual(
+            engine.get_eviction_stats(), {"patterns": 3, "max_patterns": 3, "evictions": 1}
+        )
+        self.assertIsNone(engine.get_best_translation("b", "lnx2ps"))
+        self.assertEqual(engine._sorted_commands["lnx2ps"], ["a", "c", "d"])
+        self.assertNotIn("b", engine._similarity_index.candidates("lnx2ps", {"b"}))
+
+    def test_least_recently_used_breaks_ties(self):
+        engine = self.new_engine(max_patterns=2)
+        self.learn(engine, "a")
+        self.learn(engine, "b")
+        # A failed use does not change the success count, but is a use
+        self.learn(engine, "a", successes=0, failures=1)
+        self.learn(engine, "c")
+        self.assertEqual(self.commands(engine), ["a", "c"])
+
+    def test_matches_reference_policy(self):
+        engine = self.new_engine(max_patterns=15)
+        rng = random.Random(24)
+        successes = {}
+        last_use = {}
+        for tick in range(600):
+            command = f"cmd {rng.randrange(40)}"
+            success = rng.random() < 0.6
+            if command not in successes and len(successes) == 15:
+                victim = min(successes, key=lambda c: (successes[c], last_use[c]))
+                del successes[victim], last_use[victim]
+            successes[command] = successes.get(command, 0) + success
+            last_use[command] = tick
+            engine.learn_pattern(command, "Out", "lnx2ps", success=success)
+            self.assertEqual(self.commands(engine), sorted(successes))
+        self.assertEqual(
+            {p.command: p.success_count for p in engine.patterns.values()}, successes
+        )
+        self.assertEqual(engine._sorted_commands["lnx2ps"], sorted(successes))
+        self.assertEqual(engine.analyze_patterns()["total_patterns"], 15)
+
+    def test_evictions_replayed_on_load(self):
+        engine = self.new_engine(max_patterns=3)
+        self.learn(engine, "a", successes=2)
+        self.learn(engine, "b", successes=2)
+        self.learn(engine, "c")
+        self.learn(engine, "d")  # evicts c
+        self.learn(engine, "c", successes=3)  # evicts d, then starts c afresh
+        engine.flush()
+        expected = {k: p.to_dict() for k, p in engine.patterns.items()}
+
+        reloaded = self.new_engine()
+        self.assertEqual({k: p.to_dict() for k, p in reloaded.patterns.items()}, expected)
+        self.assertEqual(reloaded.patterns["lnx2ps:c"].success_count, 3)
+
+    def test_context_history_round_trip(self):
+        engine = self.new_engine(max_patterns=2)
+        self.learn(engine, "a", successes=2)
+        self.learn(engine, "b")
+        self.learn(engine, "c")  # evicts b
+        self.learn(engine, "d", successes=2)  # evicts c
+        engine.flush()
+        expected = [record.to_dict() for record in engine.context_history]
+        self.assertEqual(len(expected), 6)
+
+        reloaded = self.new_engine(max_patterns=2)
+        self.assertEqual([record.to_dict() for record in reloaded.context_history], expected)
+        self.assertEqual(self.commands(reloaded), ["a", "d"])
+        reloaded.compact()
+        compacted = self.new_engine(max_patterns=2)
+        self.assertEqual([record.to_dict() for record in compacted.context_history], expected)
+
+    def test_cache_hits_count_as_uses(self):
+        engine = self.new_engine(max_patterns=2)
+        self.learn(engine, "a")
+        for _ in range(5):
+            engine.record_hit("a", "lnx2ps")
+        engine.record_hits([("b", "lnx2ps")])  # not learned: ignored
+        self.learn(engine, "b", successes=2)
+        self.learn(engine, "c")  # evicts b, not the hit a
+        self.assertEqual(self.commands(engine), ["a", "c"])
+        engine.flush()
+        hits = [e for e in map(json.loads, engine.journal_file.read_text().splitlines())
+                if e.get("op") == "hit"]
+        self.assertEqual([(e["command"], e["count"]) for e in hits], [("a", 5)])
+
+        reloaded = self.new_engine()
+        self.assertEqual(reloaded.patterns["lnx2ps:a"].success_count, 6)
+        self.assertEqual(self.commands(reloaded), ["a", "c"])
+
+    def test_cache_hits_ignored_when_unbounded(self):
+        engine = self.new_engine()
+        self.learn(engine, "a")
+        engine.record_hit("a", "lnx2ps")
+        engine.record_hits([("a", "lnx2ps")])
+        engine.flush()
+        self.assertEqual(len(engine.journal_file.read_text().splitlines()), 1)
+        self.assertEqual(engine.patterns["lnx2ps:a"].success_count, 1)
+
+    def test_set_capacity_evicts_down(self):
+        engine = self.new_engine()
+        for i in range(10):
+            self.learn(engine, f"cmd{i}", successes=i + 1)
+        self.assertIsNone(engine.get_eviction_stats()["max_patterns"])
+        engine.set_capacity(4)
+        self.assertEqual(self.commands(engine), ["cmd6", "cmd7", "cmd8", "cmd9"])
+        self.assertEqual(engine.evictions, 6)
+        engine.compact()
+        self.assertEqual(len(self.new_engine().patterns), 4)
+        with self.assertRaises(ValueError):
+            engine.set_capacity(0)
+
+    def test_listeners_told_about_evictions(self):
+        engine = self.new_engine(max_patterns=1)
+        self.learn(engine, "a")
+        listener = mock.Mock()
+        engine.add_change_listener(listener)
+        self.learn(engine, "b")
+        listener.assert_any_call("lnx2ps", "a")
+        listener.assert_any_call("lnx2ps", "b")
+
+    def test_configured_from_environment(self):
+        with mock.patch.object(Path, "home", return_value=Path(self.home)):
+            with mock.patch.dict("os.environ", {"SHELLROSETTA_ML_MAX_PATTERNS": "7"}):
+                engine = create_ml_engine("json")
+                self.addCleanup(engine.close)
+                with self.assertRaises(ValueError):
+                    create_ml_engine("sqlite")
+        self.assertEqual(engine.max_patterns, 7)
+
+
+class TestFrequencyBuckets(unittest.TestCase):
+    def test_victim_order(self):
+        buckets = FrequencyBuckets()
+        for key, frequency in [("a", 2), ("b", 1), ("c", 1), ("d", 0)]:
+            buckets.touch(key, frequency)
+        buckets.touch("b", 1)
+        buckets.touch("d", 3)
+        buckets.discard("a")
+        self.assertEqual(len(buckets), 3)
+        self.assertEqual([buckets.pop_victim() for _ in range(3)], ["c", "b", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
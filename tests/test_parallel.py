@@ -0,0 +1,42 @@
+# tests/test_parallel.py
+
+
+import unittest
+from unittest import mock
+
+from shellrosetta import core
+from shellrosetta.core import lnx2ps_many, ps2lnx_many
+from shellrosetta.parallel import translate_corpus
+
+
+class TestTranslateCorpus(unittest.TestCase):
+    """Test process-pool corpus translation"""
+
+    def test_matches_serial_translation_in_order(self):
+        commands = [f"ls -la dir{i % 7} | grep x{i % 3}" for i in range(60)] + ["", "ps aux"]
+        expected = lnx2ps_many(commands, use_ml=False, use_plugins=False)
+        result = translate_corpus(
+            commands, "lnx2ps", workers=2, use_ml=False, use_plugins=False, chunk_size=5
+        )
+        self.assertEqual(result, expected)
+
+    def test_ps2lnx(self):
+        commands = ["Get-ChildItem -Force", "Get-Process", "Get-ChildItem -Force"]
+        result = translate_corpus(commands, "ps2lnx", workers=2, use_ml=False, chunk_size=1)
+        self.assertEqual(result, ps2lnx_many(commands, use_ml=False))
+
+    def test_learning_is_merged_once_in_parent(self):
+        commands = [f"paralleltest{i}" for i in range(10)]
+        with mock.patch.object(core.ml_engine, "learn_patterns") as learn_patterns:
+            translate_corpus(commands, "lnx2ps", workers=2, use_plugins=False, chunk_size=3)
+        learn_patterns.assert_called_once()
+        learned = learn_patterns.call_args[0][0]
+        self.assertEqual(sorted(event[0] for event in learned), sorted(commands))
+
+    def test_unknown_direction(self):
+        with self.assertRaises(ValueError):
+            translate_corpus(["ls"], "bash2cmd")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_script.py
+
+
+import io
+import unittest
+
+from shellrosetta.script import translate_script, direction_for_path
+
+
+class TestTranslateScript(unittest.TestCase):
+    """Test streaming script translation"""
+
+    def translate(self, text, direction="lnx2ps"):
+        return list(translate_script(io.StringIO(text), direction, use_ml=False))
+
+    def test_comments_and_blank_lines_pass_through(self):
+        lines = self.translate("#!/bin/bash\n\n# list files\nls -la\n")
+        self.assertEqual(
+            [line.translation for line in lines[:3]], ["#!/bin/bash", "", "# list files"]
+        )
+        self.assertFalse(any(line.translated for line in lines[:3]))
+        self.assertEqual(lines[3].translation, "Get-ChildItem -Force | Format-List")
+
+    def test_line_continuations_are_joined(self):
+        lines = self.translate("rm -rf \\\n    build \\\n    dist\nls\n")
+        self.assertEqual(len(lines), 2)
+        self.assertEqual((lines[0].start_line, lines[0].end_line), (1, 3))
+        self.assertEqual(lines[0].translation, "Remove-Item -Recurse -Force build dist")
+        self.assertEqual((lines[1].start_line, lines[1].end_line), (4, 4))
+
+    def test_escaped_backslash_is_not_a_continuation(self):
+        lines = self.translate("cat a\\\\\nls\n")
+        self.assertEqual(len(lines), 2)
+
+    def test_indentation_is_preserved(self):
+        lines = self.translate("    ps aux\n")
+        self.assertEqual(lines[0].translation, "    Get-Process")
+
+    def test_trailing_continuation_at_eof(self):
+        lines = self.translate("ls \\")
+        self.assertEqual(lines[0].translation, "Get-ChildItem")
+
+    def test_powershell_script(self):
+        text = "<#\n  header\n#>\nGet-ChildItem -Force `\n  | Select-String x\n"
+        lines = self.translate(text, "ps2lnx")
+        self.assertEqual([line.translated for line in lines], [False, False, False, True])
+        self.assertEqual((lines[3].start_line, lines[3].end_line), (4, 5))
+        self.assertEqual(lines[3].translation, "ls -a | grep x")
+
+    def test_is_lazy(self):
+        def source():
+            yield "ls\n"
+            raise AssertionError("read past the first line")
+
+        lines = translate_script(source(), "lnx2ps", use_ml=False)
+        self.assertEqual(next(lines).translation, "Get-ChildItem")
+
+    def test_unknown_direction(self):
+        with self.assertRaises(ValueError):
+            list(translate_script(io.StringIO("ls"), "bash2cmd"))
+
+    def test_direction_for_path(self):
+        self.assertEqual(direction_for_path("deploy.sh"), "lnx2ps")
+        self.assertEqual(direction_for_path("Deploy.PS1"), "ps2lnx")
+        self.assertIsNone(direction_for_path("notes.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()